@@ -5,9 +5,10 @@ from rest_framework import generics, status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
 from django_ratelimit.decorators import ratelimit
 from django.utils.decorators import method_decorator
+from apps.orders.cart_store import merge_guest_cart
 from .models import Address
 from .serializers import (
     CustomTokenObtainPairSerializer, RegisterSerializer,
@@ -47,6 +48,7 @@ class LoginView(TokenObtainPairView):
             refresh_token = response.data.get('refresh')
             if access_token:
                 response.set_cookie('access_token', access_token, max_age=15 * 60, httponly=True, samesite='Lax')
+                merge_guest_cart(request.session.session_key, AccessToken(access_token)['user_id'])
             if refresh_token:
                 response.set_cookie('refresh_token', refresh_token, max_age=7 * 24 * 60 * 60, httponly=True, samesite='Lax')
             response.data.pop('access', None)
@@ -66,6 +68,7 @@ class RegisterView(generics.CreateAPIView):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
+        merge_guest_cart(request.session.session_key, user.pk)
         refresh = RefreshToken.for_user(user)
         access_token = str(refresh.access_token)
         refresh_token = str(refresh)
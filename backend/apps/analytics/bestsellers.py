@@ -0,0 +1,132 @@
+"""Bestsellers — per-product units and revenue over 1, 7 and 30-day sliding windows.
+
+Each day has one Redis sorted set per metric (``bestsellers:units:20250101``) that
+``apply_order_change`` bumps as orders enter or leave a paid status. A window is the
+``ZUNIONSTORE`` of its day sets, cached for a minute, so ranking reads never touch
+``orders_item``. ``rebuild`` refills the day sets from ``DailyProductSales`` and runs
+with the nightly rollup reconciliation.
+
+Without Redis (e.g. LocMemCache in development) rankings are aggregated from
+``DailyProductSales`` instead.
+"""
+from datetime import timedelta
+from django.db.models import Sum
+from django.utils import timezone
+from utils.redis_cache import redis_client, redis_key
+from .models import DailyProductSales
+
+UNITS = 'units'
+REVENUE = 'revenue'
+METRICS = (UNITS, REVENUE)
+WINDOWS = (1, 7, 30)
+DEFAULT_WINDOW = 7
+
+DAY_KEY = 'bestsellers:{metric}:{day:%Y%m%d}'
+WINDOW_KEY = 'bestsellers:{metric}:{window}d'
+DAY_TIMEOUT = 60 * 60 * 24 * (max(WINDOWS) + 2)
+WINDOW_TIMEOUT = 60
+
+
+def _days(window, today=None):
+    today = today or timezone.localdate()
+    return [today - timedelta(days=offset) for offset in range(window)]
+
+
+def clean_window(value, default=DEFAULT_WINDOW):
+    try:
+        window = int(value)
+    except (TypeError, ValueError):
+        return default
+    return window if window in WINDOWS else default
+
+
+def record(day, rows, sign=1):
+    """Add (or with ``sign=-1`` subtract) ``[(product_id, units, revenue)]`` to ``day``'s sets."""
+    client = redis_client()
+    if client is None or not rows:
+        return
+    pipe = client.pipeline(transaction=False)
+    for metric, position in ((UNITS, 1), (REVENUE, 2)):
+        key = redis_key(DAY_KEY.format(metric=metric, day=day))
+        for row in rows:
+            pipe.zincrby(key, sign * float(row[position]), str(row[0]))
+        pipe.expire(key, DAY_TIMEOUT)
+    pipe.execute()
+
+
+def _window_key(client, metric, window):
+    """Cache key of the window's union, recomputing it if it has expired."""
+    key = redis_key(WINDOW_KEY.format(metric=metric, window=window))
+    if not client.exists(key):
+        day_keys = [redis_key(DAY_KEY.format(metric=metric, day=day)) for day in _days(window)]
+        pipe = client.pipeline(transaction=True)
+        pipe.zunionstore(key, day_keys)
+        pipe.expire(key, WINDOW_TIMEOUT)
+        pipe.execute()
+    return key
+
+
+def _db_scores(metric, window):
+    return (
+        DailyProductSales.objects.filter(day__gte=_days(window)[-1])
+        .values('product_id')
+        .annotate(score=Sum(metric))
+        .filter(score__gt=0)
+    )
+
+
+def top_products(window=DEFAULT_WINDOW, metric=UNITS, limit=10):
+    """``[(product_id, score), ...]`` best first for the window; products with no sales are omitted."""
+    client = redis_client()
+    if client is None:
+        rows = _db_scores(metric, window).order_by('-score', 'product_id')[:limit]
+        return [(str(row['product_id']), float(row['score'])) for row in rows]
+    key = _window_key(client, metric, window)
+    return [
+        (member.decode(), score)
+        for member, score in client.zrevrangebyscore(key, '+inf', '(0', start=0, num=limit, withscores=True)
+    ]
+
+
+def scores(product_ids, window=DEFAULT_WINDOW, metric=UNITS):
+    """``{product_id: score}`` of ``metric`` for the given products."""
+    product_ids = [str(product_id) for product_id in product_ids]
+    client = redis_client()
+    if client is None:
+        rows = _db_scores(metric, window).filter(product_id__in=product_ids)
+        return {str(row['product_id']): float(row['score']) for row in rows}
+    key = _window_key(client, metric, window)
+    pipe = client.pipeline(transaction=False)
+    for product_id in product_ids:
+        pipe.zscore(key, product_id)
+    return {product_id: score or 0.0 for product_id, score in zip(product_ids, pipe.execute())}
+
+
+def rebuild(today=None):
+    """Refill every day set inside the widest window from ``DailyProductSales``."""
+    client = redis_client()
+    if client is None:
+        return
+    days = _days(max(WINDOWS), today)
+    rows = (
+        DailyProductSales.objects.filter(day__gte=days[-1])
+        .values_list('day', 'product_id', 'units', 'revenue')
+    )
+    by_day = {day: [] for day in days}
+    for day, product_id, units, revenue in rows.iterator():
+        if day in by_day:
+            by_day[day].append((product_id, units, revenue))
+
+    pipe = client.pipeline(transaction=True)
+    for day, day_rows in by_day.items():
+        for metric, position in ((UNITS, 1), (REVENUE, 2)):
+            key = redis_key(DAY_KEY.format(metric=metric, day=day))
+            pipe.delete(key)
+            members = {str(row[0]): float(row[position]) for row in day_rows if row[position] > 0}
+            if members:
+                pipe.zadd(key, members)
+                pipe.expire(key, DAY_TIMEOUT)
+    for metric in METRICS:
+        for window in WINDOWS:
+            pipe.delete(redis_key(WINDOW_KEY.format(metric=metric, window=window)))
+    pipe.execute()
@@ -0,0 +1,29 @@
+"""
+rebuild_rollups.py — Recomputes dashboard rollups and bestseller windows from orders and users.
+Usage: python manage.py rebuild_rollups [--days 7]
+Without --days every bucket is rebuilt; use it to backfill or after bulk edits.
+"""
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from apps.analytics import bestsellers
+from apps.analytics.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = "Rebuild analytics rollup tables (all history, or the last --days days)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None)
+
+    def handle(self, *args, **options):
+        days = options['days']
+        if days:
+            today = timezone.localdate()
+            hours = rebuild(today - timedelta(days=days - 1), today)
+            scope = f'the last {days} days'
+        else:
+            hours = rebuild()
+            scope = 'all history'
+        bestsellers.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"✅  Rebuilt rollups for {scope} ({hours} hourly buckets)."))
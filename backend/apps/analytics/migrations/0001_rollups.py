@@ -0,0 +1,70 @@
+# Generated by Django 4.2.30 on 2026-10-18 01:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('catalog', '0004_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyCustomerRollup',
+            fields=[
+                ('day', models.DateField(primary_key=True, serialize=False)),
+                ('new_customers', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'analytics_customer_daily',
+            },
+        ),
+        migrations.CreateModel(
+            name='HourlyOrderRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(max_length=20)),
+                ('order_count', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('hour', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'analytics_order_hourly',
+                'unique_together': {('hour', 'status')},
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyOrderRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(max_length=20)),
+                ('order_count', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('day', models.DateField()),
+            ],
+            options={
+                'db_table': 'analytics_order_daily',
+                'indexes': [models.Index(fields=['status', 'day'], name='analytics_o_status_7189af_idx')],
+                'unique_together': {('day', 'status')},
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyProductSales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('order_count', models.IntegerField(default=0)),
+                ('units', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='catalog.product')),
+            ],
+            options={
+                'db_table': 'analytics_product_daily',
+                'unique_together': {('day', 'product')},
+            },
+        ),
+    ]
@@ -1,3 +1,67 @@
+"""Analytics app models — rollup fact tables behind the admin dashboard.
+
+Rows are bucketed by the order's (or user's) creation time in ``TIME_ZONE`` and kept
+current by ``apps.analytics.rollups``; the nightly reconciliation rewrites recent
+buckets from the source tables.
+"""
 from django.db import models
 
-# Create your models here.
+
+class OrderRollup(models.Model):
+    """Orders created in a bucket, split by their current status."""
+    status = models.CharField(max_length=20)
+    order_count = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        abstract = True
+
+
+class DailyOrderRollup(OrderRollup):
+    day = models.DateField()
+
+    class Meta:
+        db_table = 'analytics_order_daily'
+        unique_together = ('day', 'status')
+        indexes = [models.Index(fields=['status', 'day'])]
+
+    def __str__(self):
+        return f'{self.day} {self.status}: {self.order_count} orders'
+
+
+class HourlyOrderRollup(OrderRollup):
+    hour = models.DateTimeField()
+
+    class Meta:
+        db_table = 'analytics_order_hourly'
+        unique_together = ('hour', 'status')
+
+    def __str__(self):
+        return f'{self.hour:%Y-%m-%d %H}:00 {self.status}: {self.order_count} orders'
+
+
+class DailyProductSales(models.Model):
+    """Units and revenue of paid orders per product and day."""
+    day = models.DateField()
+    product = models.ForeignKey('catalog.Product', on_delete=models.CASCADE, related_name='daily_sales')
+    order_count = models.IntegerField(default=0)
+    units = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        db_table = 'analytics_product_daily'
+        unique_together = ('day', 'product')
+
+    def __str__(self):
+        return f'{self.day} {self.product_id}: {self.units} units'
+
+
+class DailyCustomerRollup(models.Model):
+    day = models.DateField(primary_key=True)
+    new_customers = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'analytics_customer_daily'
+
+    def __str__(self):
+        return f'{self.day}: {self.new_customers} new customers'
@@ -0,0 +1,214 @@
+"""Rollups — incremental order, product and customer facts for the admin dashboard.
+
+Every order save or status transition applies a signed delta to the bucket of the
+order's creation hour and day (``apply_order_change``), so dashboard reads cost the
+same whatever the size of ``orders_order``. Paths that bypass signals (``.update()``,
+raw SQL, fixtures) are repaired by ``rebuild``, which the nightly task runs over the
+last few days and ``manage.py rebuild_rollups`` can run over any range.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from functools import partial
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate, TruncHour
+from django.utils import timezone
+from . import bestsellers
+from .models import DailyCustomerRollup, DailyOrderRollup, DailyProductSales, HourlyOrderRollup
+
+# Orders that count towards revenue and product sales
+PAID_STATUSES = ('CONFIRMED', 'PROCESSING', 'SHIPPED', 'DELIVERED')
+
+
+def day_bucket(moment):
+    return timezone.localdate(moment)
+
+
+def hour_bucket(moment):
+    return timezone.localtime(moment).replace(minute=0, second=0, microsecond=0)
+
+
+def _bump(model, key, **deltas):
+    """Add ``deltas`` to the row at ``key`` with one UPDATE, creating the row on first use."""
+    deltas = {field: value for field, value in deltas.items() if value}
+    if not deltas:
+        return
+    increments = {field: F(field) + value for field, value in deltas.items()}
+    if model.objects.filter(**key).update(**increments):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**key, **deltas)
+    except IntegrityError:
+        # Another writer created the row first
+        model.objects.filter(**key).update(**increments)
+
+
+def _product_sales(order_id):
+    from apps.orders.models import OrderItem
+    return (
+        OrderItem.objects.filter(order_id=order_id, variant__isnull=False)
+        .order_by()
+        .values('variant__product_id')
+        .annotate(units=Sum('quantity'), revenue=Sum('total_price'))
+    )
+
+
+def apply_order_change(order, before, after):
+    """Move an order between rollup states; ``before``/``after`` are ``(status, grand_total)`` or None."""
+    if before == after:
+        return
+    day, hour = day_bucket(order.created_at), hour_bucket(order.created_at)
+    for state, sign in ((before, -1), (after, 1)):
+        if state is None:
+            continue
+        status, total = state
+        _bump(DailyOrderRollup, {'day': day, 'status': status}, order_count=sign, revenue=sign * total)
+        _bump(HourlyOrderRollup, {'hour': hour, 'status': status}, order_count=sign, revenue=sign * total)
+
+    was_paid = before is not None and before[0] in PAID_STATUSES
+    is_paid = after is not None and after[0] in PAID_STATUSES
+    if was_paid != is_paid:
+        sign = 1 if is_paid else -1
+        sales = [
+            (row['variant__product_id'], row['units'], row['revenue']) for row in _product_sales(order.pk)
+        ]
+        for product_id, units, revenue in sales:
+            _bump(
+                DailyProductSales, {'day': day, 'product_id': product_id},
+                order_count=sign, units=sign * units, revenue=sign * revenue,
+            )
+        transaction.on_commit(partial(bestsellers.record, day, sales, sign))
+
+
+def apply_status_changes(orders, status):
+    """``apply_order_change`` for many orders moving to ``status`` at once, one UPDATE per bucket.
+
+    ``orders`` are ``(order_id, created_at, previous_status, grand_total)``; used by bulk
+    transitions, which write with ``.update()`` and so bypass the Order signals.
+    """
+    from apps.orders.models import OrderItem
+    daily, hourly = defaultdict(lambda: [0, Decimal('0')]), defaultdict(lambda: [0, Decimal('0')])
+    flipped = {}
+    for order_id, created_at, previous, total in orders:
+        if previous == status:
+            continue
+        for bucket_status, sign in ((previous, -1), (status, 1)):
+            for buckets, bucket in ((daily, day_bucket(created_at)), (hourly, hour_bucket(created_at))):
+                deltas = buckets[(bucket, bucket_status)]
+                deltas[0] += sign
+                deltas[1] += sign * total
+        if (previous in PAID_STATUSES) != (status in PAID_STATUSES):
+            flipped[order_id] = day_bucket(created_at)
+    for (day, bucket_status), (count, revenue) in daily.items():
+        _bump(DailyOrderRollup, {'day': day, 'status': bucket_status}, order_count=count, revenue=revenue)
+    for (hour, bucket_status), (count, revenue) in hourly.items():
+        _bump(HourlyOrderRollup, {'hour': hour, 'status': bucket_status}, order_count=count, revenue=revenue)
+
+    if not flipped:
+        return
+    sign = 1 if status in PAID_STATUSES else -1
+    product_deltas = defaultdict(lambda: [0, 0, Decimal('0')])
+    rows = (
+        OrderItem.objects.filter(order_id__in=list(flipped), variant__isnull=False).order_by()
+        .values('order_id', 'variant__product_id')
+        .annotate(units=Sum('quantity'), revenue=Sum('total_price'))
+    )
+    for row in rows:
+        deltas = product_deltas[(flipped[row['order_id']], row['variant__product_id'])]
+        deltas[0] += 1
+        deltas[1] += row['units']
+        deltas[2] += row['revenue']
+    sales = defaultdict(list)
+    for (day, product_id), (count, units, revenue) in product_deltas.items():
+        _bump(
+            DailyProductSales, {'day': day, 'product_id': product_id},
+            order_count=sign * count, units=sign * units, revenue=sign * revenue,
+        )
+        sales[day].append((product_id, units, revenue))
+    for day, day_sales in sales.items():
+        transaction.on_commit(partial(bestsellers.record, day, day_sales, sign))
+
+
+def record_new_customer(user):
+    _bump(DailyCustomerRollup, {'day': day_bucket(user.date_joined)}, new_customers=1)
+
+
+def _bounds(start_day, end_day):
+    start = timezone.make_aware(datetime.combine(start_day, time.min))
+    end = timezone.make_aware(datetime.combine(end_day + timedelta(days=1), time.min))
+    return start, end
+
+
+def rebuild(start_day=None, end_day=None):
+    """Recompute every rollup in ``[start_day, end_day]`` (all history when omitted) from source rows."""
+    from apps.accounts.models import CustomUser
+    from apps.orders.models import Order, OrderItem
+
+    orders = Order.objects.order_by()
+    items = OrderItem.objects.filter(order__status__in=PAID_STATUSES, variant__isnull=False).order_by()
+    users = CustomUser.objects.filter(role=CustomUser.Role.CUSTOMER).order_by()
+    scopes = [model.objects.all() for model in
+              (DailyOrderRollup, HourlyOrderRollup, DailyProductSales, DailyCustomerRollup)]
+    if start_day is not None:
+        end_day = end_day or timezone.localdate()
+        start, end = _bounds(start_day, end_day)
+        orders = orders.filter(created_at__gte=start, created_at__lt=end)
+        items = items.filter(order__created_at__gte=start, order__created_at__lt=end)
+        users = users.filter(date_joined__gte=start, date_joined__lt=end)
+        days = {'day__gte': start_day, 'day__lte': end_day}
+        scopes = [
+            DailyOrderRollup.objects.filter(**days),
+            HourlyOrderRollup.objects.filter(hour__gte=start, hour__lt=end),
+            DailyProductSales.objects.filter(**days),
+            DailyCustomerRollup.objects.filter(**days),
+        ]
+
+    hourly, daily = [], defaultdict(lambda: [0, Decimal('0')])
+    rows = (
+        orders.annotate(hour=TruncHour('created_at'))
+        .values('hour', 'status')
+        .annotate(order_count=Count('id'), revenue=Sum('grand_total'))
+    )
+    for row in rows.iterator():
+        hourly.append(HourlyOrderRollup(**row))
+        totals = daily[(day_bucket(row['hour']), row['status'])]
+        totals[0] += row['order_count']
+        totals[1] += row['revenue']
+
+    products = (
+        items.annotate(day=TruncDate('order__created_at'))
+        .values('day', product_id=F('variant__product_id'))
+        .annotate(order_count=Count('order_id', distinct=True), units=Sum('quantity'), revenue=Sum('total_price'))
+    )
+    customers = (
+        users.annotate(day=TruncDate('date_joined')).values('day').annotate(new_customers=Count('id'))
+    )
+
+    with transaction.atomic():
+        for scope in scopes:
+            scope.delete()
+        HourlyOrderRollup.objects.bulk_create(hourly, batch_size=1000)
+        DailyOrderRollup.objects.bulk_create([
+            DailyOrderRollup(day=day, status=status, order_count=count, revenue=revenue)
+            for (day, status), (count, revenue) in daily.items()
+        ], batch_size=1000)
+        DailyProductSales.objects.bulk_create(
+            [DailyProductSales(**row) for row in products.iterator()], batch_size=1000
+        )
+        DailyCustomerRollup.objects.bulk_create(
+            [DailyCustomerRollup(**row) for row in customers.iterator()], batch_size=1000
+        )
+    return len(hourly)
+
+
+def reconcile(days=None):
+    """Rebuild the most recent ``days`` and drop hourly rows past their retention."""
+    days = days or settings.ANALYTICS_RECONCILE_DAYS
+    today = timezone.localdate()
+    rebuild(today - timedelta(days=days - 1), today)
+    bestsellers.rebuild(today)
+    cutoff = hour_bucket(timezone.now() - timedelta(days=settings.ANALYTICS_HOURLY_RETENTION_DAYS))
+    HourlyOrderRollup.objects.filter(hour__lt=cutoff).delete()
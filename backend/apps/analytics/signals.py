@@ -0,0 +1,38 @@
+"""Analytics signals — apply order and customer changes to the rollup tables."""
+from django.db.models.signals import pre_save, post_save, pre_delete
+from django.dispatch import receiver
+from apps.accounts.models import CustomUser
+from apps.orders.models import Order
+from .rollups import apply_order_change, record_new_customer
+
+
+@receiver(pre_save, sender=Order)
+def remember_previous_order_state(sender, instance, **kwargs):
+    instance._rollup_state = None
+    if not instance._state.adding:
+        instance._rollup_state = (
+            Order.objects.filter(pk=instance.pk).values_list('status', 'grand_total').first()
+        )
+
+
+@receiver(post_save, sender=Order)
+def update_order_rollups(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    apply_order_change(
+        instance, getattr(instance, '_rollup_state', None), (instance.status, instance.grand_total)
+    )
+
+
+@receiver(pre_delete, sender=Order)
+def remove_order_from_rollups(sender, instance, **kwargs):
+    # pre_delete so the order's items are still there to subtract product sales
+    previous = Order.objects.filter(pk=instance.pk).values_list('status', 'grand_total').first()
+    if previous is not None:
+        apply_order_change(instance, previous, None)
+
+
+@receiver(post_save, sender=CustomUser)
+def count_new_customer(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw and instance.role == CustomUser.Role.CUSTOMER:
+        record_new_customer(instance)
@@ -0,0 +1,9 @@
+"""Analytics Celery tasks."""
+from celery import shared_task
+from .rollups import reconcile
+
+
+@shared_task
+def reconcile_rollups(days=None):
+    """Nightly repair of recent rollup buckets from orders and users."""
+    reconcile(days=days)
@@ -1,74 +1,79 @@
-"""Analytics views — admin dashboard metrics."""
-from django.db.models import Sum, Count, Avg
-from django.db.models.functions import TruncDate
+"""Analytics views — admin dashboard metrics, read from the rollup tables."""
+from django.db.models import Q, Sum
 from django.utils import timezone
 from datetime import timedelta
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from apps.orders.models import Order
 from apps.catalog.models import Product
-from apps.accounts.models import CustomUser
 from utils.permissions import IsStaffOrAdmin
+from . import bestsellers
+from .models import DailyCustomerRollup, DailyOrderRollup, HourlyOrderRollup
+from .rollups import PAID_STATUSES, day_bucket, hour_bucket
 
 
 @api_view(['GET'])
 @permission_classes([IsStaffOrAdmin])
 def dashboard_metrics(request):
-    """Admin dashboard summary."""
+    """Admin dashboard summary. Every figure comes from rollups, so cost does not grow with order history."""
     now = timezone.now()
     thirty_days_ago = now - timedelta(days=30)
     seven_days_ago = now - timedelta(days=7)
 
-    total_revenue = Order.objects.filter(
-        status__in=['CONFIRMED', 'PROCESSING', 'SHIPPED', 'DELIVERED']
-    ).aggregate(total=Sum('grand_total'))['total'] or 0
-
-    monthly_revenue = Order.objects.filter(
-        status__in=['CONFIRMED', 'PROCESSING', 'SHIPPED', 'DELIVERED'],
-        created_at__gte=thirty_days_ago
-    ).aggregate(total=Sum('grand_total'))['total'] or 0
+    totals = DailyOrderRollup.objects.aggregate(
+        total_revenue=Sum('revenue', filter=Q(status__in=PAID_STATUSES)),
+        pending_orders=Sum('order_count', filter=Q(status='PENDING')),
+        processing_orders=Sum('order_count', filter=Q(status='PROCESSING')),
+    )
 
-    pending_orders = Order.objects.filter(status='PENDING').count()
-    processing_orders = Order.objects.filter(status='PROCESSING').count()
+    monthly_revenue = HourlyOrderRollup.objects.filter(
+        status__in=PAID_STATUSES, hour__gte=hour_bucket(thirty_days_ago)
+    ).aggregate(total=Sum('revenue'))['total'] or 0
 
-    new_customers = CustomUser.objects.filter(
-        date_joined__gte=thirty_days_ago, role='CUSTOMER'
-    ).count()
+    customers = DailyCustomerRollup.objects.aggregate(
+        total=Sum('new_customers'),
+        recent=Sum('new_customers', filter=Q(day__gte=day_bucket(thirty_days_ago))),
+    )
 
     # Sales over last 7 days
     daily_sales = (
-        Order.objects.filter(
-            status__in=['CONFIRMED', 'PROCESSING', 'SHIPPED', 'DELIVERED'],
-            created_at__gte=seven_days_ago
-        )
-        .annotate(date=TruncDate('created_at'))
-        .values('date')
-        .annotate(revenue=Sum('grand_total'), orders=Count('id'))
-        .order_by('date')
+        DailyOrderRollup.objects.filter(status__in=PAID_STATUSES, day__gte=day_bucket(seven_days_ago))
+        .values('day')
+        .annotate(revenue=Sum('revenue'), orders=Sum('order_count'))
+        .order_by('day')
     )
 
-    # Top products by order count
-    top_products = (
-        Product.objects.filter(is_active=True)
-        .annotate(order_count=Count('variants__order_items'))
-        .order_by('-order_count')[:5]
-        .values('name', 'slug', 'order_count')
+    # Best sellers by units over the requested window (30 days by default)
+    window = bestsellers.clean_window(request.query_params.get('window'), default=30)
+    ranked = bestsellers.top_products(window=window, metric=bestsellers.UNITS, limit=10)
+    products = Product.objects.filter(pk__in=[product_id for product_id, _ in ranked], is_active=True).in_bulk(
+        field_name='pk'
     )
+    products = {str(pk): product for pk, product in products.items()}
+    ranked = [(product_id, units) for product_id, units in ranked if product_id in products][:5]
+    revenue = bestsellers.scores([product_id for product_id, _ in ranked], window=window, metric=bestsellers.REVENUE)
 
     return Response({
-        'total_revenue': float(total_revenue),
+        'total_revenue': float(totals['total_revenue'] or 0),
         'monthly_revenue': float(monthly_revenue),
-        'pending_orders': pending_orders,
-        'processing_orders': processing_orders,
+        'pending_orders': totals['pending_orders'] or 0,
+        'processing_orders': totals['processing_orders'] or 0,
         'total_products': Product.objects.filter(is_active=True).count(),
-        'total_customers': CustomUser.objects.filter(role='CUSTOMER').count(),
-        'new_customers_30d': new_customers,
+        'total_customers': customers['total'] or 0,
+        'new_customers_30d': customers['recent'] or 0,
         'daily_sales': [
             {
-                'date': str(day['date']),
+                'date': str(day['day']),
                 'revenue': float(day['revenue']),
                 'orders': day['orders']
             } for day in daily_sales
         ],
-        'top_products': list(top_products),
+        'top_products': [
+            {
+                'name': products[product_id].name,
+                'slug': products[product_id].slug,
+                'units': int(units),
+                'revenue': revenue.get(product_id, 0.0),
+            } for product_id, units in ranked
+        ],
+        'top_products_window': window,
     })
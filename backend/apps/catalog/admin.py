@@ -33,6 +33,7 @@ class ProductAdmin(admin.ModelAdmin):
     list_filter = ['is_active', 'is_featured', 'is_new_arrival', 'category', 'brand']
     search_fields = ['name', 'slug']
     prepopulated_fields = {'slug': ('name',)}
+    readonly_fields = ['primary_image']
     inlines = [ProductImageInline, ProductVariantInline]
 
 
@@ -0,0 +1,126 @@
+"""Category tree cache — the active tree built in one query and cached as a versioned blob.
+
+Any Category save/delete bumps the version once its transaction commits (see
+``apps.catalog.signals``), so readers never see a stale tree and no blind TTL is needed.
+
+Cached image URLs are storage URLs; ``with_absolute_images`` makes them absolute for
+the request, as ``CategorySerializer``'s ImageField does.
+"""
+import time
+from django.core.cache import cache
+from .models import Category
+
+VERSION_KEY = 'catalog:category_tree:version'
+TREE_KEY = 'catalog:category_tree:{version}'
+TREE_TIMEOUT = 60 * 60 * 24
+
+
+def _tree_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Seed from the clock so an evicted version key can never resurrect an old blob
+        cache.add(VERSION_KEY, int(time.time() * 1000), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def invalidate_category_tree():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, int(time.time() * 1000), None)
+
+
+def build_category_tree():
+    """Load every active category in a single query and assemble the tree in memory."""
+    rows = Category.objects.filter(is_active=True).values(
+        'id', 'name', 'slug', 'image', 'description', 'sort_order', 'parent_id'
+    )
+    storage = Category._meta.get_field('image').storage
+    nodes, parents = {}, {}
+    for row in rows:
+        key = str(row['id'])
+        nodes[key] = {
+            'id': key,
+            'name': row['name'],
+            'slug': row['slug'],
+            'image': storage.url(row['image']) if row['image'] else None,
+            'description': row['description'],
+            'children': [],
+            'sort_order': row['sort_order'],
+        }
+        parents[key] = str(row['parent_id']) if row['parent_id'] else None
+
+    roots = []
+    for key, node in nodes.items():  # rows arrive in Meta.ordering, so siblings stay sorted
+        parent = parents[key]
+        if parent is None:
+            roots.append(node)
+        elif parent in nodes:
+            nodes[parent]['children'].append(node)
+
+    return {
+        'roots': roots,
+        'nodes': nodes,
+        'parents': parents,
+        'slugs': {node['slug']: key for key, node in nodes.items()},
+    }
+
+
+def get_category_tree():
+    key = TREE_KEY.format(version=_tree_version())
+    tree = cache.get(key)
+    if tree is None:
+        tree = build_category_tree()
+        cache.set(key, tree, TREE_TIMEOUT)
+    return tree
+
+
+def with_absolute_images(nodes, request):
+    """Copies of ``nodes`` and their children with image URLs made absolute for ``request``."""
+    if request is None:
+        return nodes
+    return [
+        {
+            **node,
+            'image': request.build_absolute_uri(node['image']) if node['image'] else None,
+            'children': with_absolute_images(node['children'], request),
+        }
+        for node in nodes
+    ]
+
+
+def get_children(category_id):
+    """Serialized active children (recursively nested) of a category."""
+    node = get_category_tree()['nodes'].get(str(category_id))
+    return node['children'] if node else []
+
+
+def get_descendant_ids(slug):
+    """IDs of the category with ``slug`` and all of its active subcategories."""
+    tree = get_category_tree()
+    root = tree['slugs'].get(slug)
+    if root is None:
+        return []
+    ids, stack, seen = [], [tree['nodes'][root]], set()
+    while stack:
+        node = stack.pop()
+        if node['id'] in seen:
+            continue
+        seen.add(node['id'])
+        ids.append(node['id'])
+        stack.extend(node['children'])
+    return ids
+
+
+def get_ancestor_ids(slug):
+    """IDs from the category's parent up to its root, nearest first."""
+    tree = get_category_tree()
+    current = tree['slugs'].get(slug)
+    ids = []
+    while current is not None:
+        current = tree['parents'].get(current)
+        if current is None or current in ids:
+            break
+        ids.append(current)
+    return ids
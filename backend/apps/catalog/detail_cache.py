@@ -0,0 +1,171 @@
+"""Product detail cache — the rendered JSON of the detail page, one Redis string per slug.
+
+A hit is a single GET whose bytes are returned as the response body, with no ORM
+access and no re-rendering. A miss renders ``ProductDetailSerializer`` once and stores
+the bytes for ``PRODUCT_DETAIL_CACHE_TIMEOUT`` seconds.
+
+Edits to the product, its variants, images, category, brand, reviews or price (flash
+sales included) delete the document (``invalidate_products``; wired in
+``apps.catalog.signals`` and ``apps.catalog.pricing``). Stock moves far more often, so
+``patch_stock`` rewrites only the ``stock`` object of the affected variants in place,
+inside a WATCH/MULTI so a concurrent rebuild or patch is never overwritten.
+
+Documents are shared by every request, so file URLs are made absolute against
+``MEDIA_ORIGIN`` rather than the requesting host, matching the absolute URLs of the
+list endpoints.
+
+Without Redis (e.g. LocMemCache in development) the same API runs on the plain cache,
+without the atomic patch.
+"""
+import json
+from urllib.parse import urljoin
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.renderers import JSONRenderer
+from utils.redis_cache import redis_client, redis_key
+
+DETAIL_KEY = 'catalog:product_detail:{slug}'
+PATCH_RETRIES = 3
+
+
+class RedisDetailBackend:
+    def __init__(self, client):
+        self.client = client
+
+    def make_key(self, name):
+        return redis_key(name)
+
+    def get(self, key):
+        return self.client.get(key)
+
+    def set(self, key, document, timeout):
+        self.client.set(key, document, ex=timeout)
+
+    def delete(self, keys):
+        if keys:
+            self.client.delete(*keys)
+
+    def patch(self, key, update):
+        """Replace the document at ``key`` with ``update(document)`` unless it changes meanwhile."""
+        from redis.exceptions import WatchError
+        for _ in range(PATCH_RETRIES):
+            with self.client.pipeline(transaction=True) as pipe:
+                try:
+                    pipe.watch(key)
+                    document, ttl = pipe.get(key), pipe.ttl(key)
+                    if document is None:
+                        return
+                    pipe.multi()
+                    pipe.set(key, update(document), ex=ttl if ttl and ttl > 0 else None)
+                    pipe.execute()
+                    return
+                except WatchError:
+                    continue
+        # Still contended: drop the document and let the next read rebuild it
+        self.client.delete(key)
+
+
+class CacheDetailBackend:
+    """Plain cache documents; a stock patch can race a rebuild and keep the older copy."""
+
+    def make_key(self, name):
+        return name
+
+    def get(self, key):
+        return cache.get(key)
+
+    def set(self, key, document, timeout):
+        cache.set(key, document, timeout)
+
+    def delete(self, keys):
+        cache.delete_many(keys)
+
+    def patch(self, key, update):
+        document = cache.get(key)
+        if document is not None:
+            cache.set(key, update(document), settings.PRODUCT_DETAIL_CACHE_TIMEOUT)
+
+
+def get_backend():
+    client = redis_client()
+    return RedisDetailBackend(client) if client is not None else CacheDetailBackend()
+
+
+def _key(backend, slug):
+    return backend.make_key(DETAIL_KEY.format(slug=slug))
+
+
+def detail_queryset():
+    from .models import Product
+    return (
+        Product.objects.filter(is_active=True)
+        .select_related('category', 'brand', 'rating')
+        .prefetch_related('images', 'variants__attributes__attribute', 'variants__stock')
+    )
+
+
+class MediaOrigin:
+    """Stands in for the request in serializer context: absolute URLs on ``MEDIA_ORIGIN``."""
+
+    def build_absolute_uri(self, location):
+        return urljoin(settings.MEDIA_ORIGIN, location)
+
+
+def render_detail(product):
+    from .serializers import ProductDetailSerializer
+    return JSONRenderer().render(ProductDetailSerializer(product, context={'request': MediaOrigin()}).data)
+
+
+def get_product_detail(slug):
+    """The detail document of the active product ``slug`` as JSON bytes; None if there is none."""
+    backend = get_backend()
+    key = _key(backend, slug)
+    document = backend.get(key)
+    if document is not None:
+        return document
+    product = detail_queryset().filter(slug=slug).first()
+    if product is None:
+        return None
+    document = render_detail(product)
+    backend.set(key, document, settings.PRODUCT_DETAIL_CACHE_TIMEOUT)
+    return document
+
+
+def warm_product_details(product_ids):
+    backend = get_backend()
+    for product in detail_queryset().filter(pk__in=list(product_ids)):
+        backend.set(_key(backend, product.slug), render_detail(product), settings.PRODUCT_DETAIL_CACHE_TIMEOUT)
+
+
+def invalidate_slugs(slugs):
+    backend = get_backend()
+    backend.delete([_key(backend, slug) for slug in set(slugs) if slug])
+
+
+def invalidate_products(product_ids):
+    from .models import Product
+    product_ids = list(product_ids)
+    if product_ids:
+        invalidate_slugs(Product.objects.filter(pk__in=product_ids).values_list('slug', flat=True))
+
+
+def patch_stock(variant_ids):
+    """Rewrite the ``stock`` of these variants in their products' cached documents."""
+    from apps.inventory.models import Stock
+    from .serializers import StockSerializer
+    rows = Stock.objects.filter(variant_id__in=list(variant_ids)).select_related('variant__product').only(
+        'variant_id', 'quantity', 'reserved_quantity', 'low_stock_threshold', 'variant__product__slug'
+    )
+    by_slug = {}
+    for stock in rows:
+        by_slug.setdefault(stock.variant.product.slug, {})[str(stock.variant_id)] = StockSerializer(stock).data
+
+    backend = get_backend()
+    for slug, stocks in by_slug.items():
+        def update(document, stocks=stocks):
+            data = json.loads(document)
+            for variant in data.get('variants', ()):
+                if variant['id'] in stocks:
+                    variant['stock'] = stocks[variant['id']]
+            return JSONRenderer().render(data)
+        backend.patch(_key(backend, slug), update)
@@ -0,0 +1,315 @@
+"""Facet engine — per-value product bitmaps intersected in memory.
+
+Every active product gets a bit position; each facet value (brand, category, price
+bucket, on-sale, in-stock and every attribute such as size or colour) holds a Python
+int used as a bitmap of the products carrying it. Counts for a filtered listing are
+popcounts of bitmap intersections, so no GROUP BY runs per request.
+
+The index lives in process memory. Changes are published to a short journal in the
+shared cache (``mark_products_changed``); each process replays the journal and patches
+only the affected products, falling back to a full rebuild if it has fallen too far
+behind. Rebuilds run outside the lock: one thread builds while the others keep serving
+the previous index, and the new one is swapped in whole.
+"""
+import threading
+import time
+from collections import defaultdict
+from django.core.cache import cache
+from django.db.models import F
+from .models import Brand, Category, AttributeValue, Product, ProductVariant
+
+SEQ_KEY = 'catalog:facets:seq'
+JOURNAL_KEY = 'catalog:facets:journal:{seq}'
+JOURNAL_TIMEOUT = 60 * 60
+MAX_REPLAY = 500
+
+# (key, lower bound inclusive, upper bound exclusive) on the current price in LKR
+PRICE_BUCKETS = [
+    ('0-2500', 0, 2500),
+    ('2500-5000', 2500, 5000),
+    ('5000-10000', 5000, 10000),
+    ('10000-20000', 10000, 20000),
+    ('20000+', 20000, None),
+]
+
+
+# Dimensions whose values are their own labels
+BOOLEAN_DIMENSIONS = ('price', 'on_sale', 'in_stock')
+FIXED_DIMENSIONS = ('category', 'brand') + BOOLEAN_DIMENSIONS
+
+
+def price_bucket(price):
+    for key, low, high in PRICE_BUCKETS:
+        if price >= low and (high is None or price < high):
+            return key
+    return None
+
+
+def _bitmap(positions):
+    """An int with ``positions`` set, built in one pass rather than one big-int copy per bit."""
+    if not positions:
+        return 0
+    buffer = bytearray(max(positions) // 8 + 1)
+    for position in positions:
+        buffer[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+def _load_rows(product_ids=None):
+    """Return ``{product_id: {dimension: {values}}}`` for active products, in three queries."""
+    products = Product.objects.filter(is_active=True)
+    variants = ProductVariant.objects.filter(is_active=True, product__is_active=True)
+    if product_ids is not None:
+        products = products.filter(pk__in=product_ids)
+        variants = variants.filter(product_id__in=product_ids)
+
+    rows = {}
+    for pk, brand_id, category_id, current_price, base_price in products.values_list(
+        'pk', 'brand_id', 'category_id', 'current_price', 'base_price'
+    ).iterator(chunk_size=5000):
+        row = defaultdict(set)
+        row['category'].add(str(category_id))
+        if brand_id:
+            row['brand'].add(str(brand_id))
+        row['price'].add(price_bucket(current_price))
+        # Same definition as Product.is_on_sale and ProductFilter.on_sale
+        row['on_sale'].add('true' if current_price < base_price else 'false')
+        row['in_stock'].add('false')
+        rows[pk] = row
+
+    attributes = (
+        ProductVariant.attributes.through.objects.filter(productvariant__in=variants)
+        .values_list('productvariant__product_id', 'attributevalue_id', 'attributevalue__attribute__slug')
+        .distinct()
+    )
+    for product_id, value_id, dimension in attributes.iterator(chunk_size=5000):
+        if product_id in rows:
+            rows[product_id][dimension].add(str(value_id))
+
+    in_stock = (
+        variants.filter(stock__quantity__gt=F('stock__reserved_quantity'))
+        .values_list('product_id', flat=True)
+        .distinct()
+    )
+    for product_id in in_stock.iterator(chunk_size=5000):
+        if product_id in rows:
+            rows[product_id]['in_stock'] = {'true'}
+
+    return rows
+
+
+def _load_labels():
+    labels = {
+        'category': dict(Category.objects.values_list('pk', 'name')),
+        'brand': dict(Brand.objects.values_list('pk', 'name')),
+    }
+    for pk, slug, value in AttributeValue.objects.values_list('pk', 'attribute__slug', 'value'):
+        labels.setdefault(slug, {})[pk] = value
+    return {
+        dimension: {str(pk): label for pk, label in values.items()}
+        for dimension, values in labels.items()
+    }
+
+
+class FacetIndex:
+    def __init__(self, seq):
+        self.seq = seq
+        self.positions = {}   # product_id -> bit position
+        self.products = []    # bit position -> product_id
+        self.rows = {}        # bit position -> {dimension: {values}}
+        self.bitmaps = defaultdict(lambda: defaultdict(int))
+        self.active = 0       # bitmap of indexed (active) products
+        self.labels = {}
+
+    @classmethod
+    def build(cls, seq):
+        index = cls(seq)
+        members = defaultdict(lambda: defaultdict(list))
+        for position, (product_id, row) in enumerate(_load_rows().items()):
+            index.positions[product_id] = position
+            index.products.append(product_id)
+            index.rows[position] = row
+            for dimension, values in row.items():
+                for value in values:
+                    members[dimension][value].append(position)
+        for dimension, values in members.items():
+            for value, positions in values.items():
+                index.bitmaps[dimension][value] = _bitmap(positions)
+        index.active = (1 << len(index.products)) - 1
+        index.labels = _load_labels()
+        return index
+
+    def _set(self, product_id, row):
+        position = self.positions.get(product_id)
+        if position is None:
+            position = len(self.products)
+            self.positions[product_id] = position
+            self.products.append(product_id)
+        bit = 1 << position
+        self._clear(position)
+        for dimension, values in row.items():
+            for value in values:
+                self.bitmaps[dimension][value] |= bit
+        self.rows[position] = row
+        self.active |= bit
+
+    def _clear(self, position):
+        bit = 1 << position
+        for dimension, values in self.rows.pop(position, {}).items():
+            for value in values:
+                self.bitmaps[dimension][value] &= ~bit
+        self.active &= ~bit
+
+    def patch(self, product_ids, seq, labels=False):
+        rows = _load_rows(product_ids) if product_ids else {}
+        for product_id in product_ids:
+            if product_id in rows:
+                self._set(product_id, rows[product_id])
+            elif product_id in self.positions:
+                self._clear(self.positions[product_id])
+        unlabelled = any(
+            value not in self.labels.get(dimension, {})
+            for row in rows.values()
+            for dimension, values in row.items() if dimension not in BOOLEAN_DIMENSIONS
+            for value in values
+        )
+        if labels or unlabelled:
+            self.labels = _load_labels()
+        self.seq = seq
+
+    def ids_to_bitmap(self, product_ids):
+        positions = self.positions
+        return _bitmap([positions[product_id] for product_id in product_ids if product_id in positions])
+
+    def dimensions(self):
+        """Every facet dimension, including attributes no active product carries yet."""
+        return set(FIXED_DIMENSIONS) | set(self.bitmaps) | set(self.labels)
+
+    def _selection_bitmap(self, dimension, values):
+        bitmap = 0
+        for value in values:
+            bitmap |= self.bitmaps.get(dimension, {}).get(value, 0)
+        return bitmap
+
+    def counts(self, selected, base=None):
+        """Facet counts for a selection ``{dimension: {values}}``.
+
+        Values within a dimension are OR'd and dimensions are AND'd. Each dimension's
+        counts ignore its own selection so shoppers still see their alternatives. Keys that
+        are not facet dimensions (query parameters such as ``cursor``) are ignored.
+        """
+        base = self.active if base is None else base & self.active
+        dimensions = self.dimensions()
+        masks = {
+            dimension: self._selection_bitmap(dimension, values)
+            for dimension, values in selected.items() if values and dimension in dimensions
+        }
+        total = base
+        for mask in masks.values():
+            total &= mask
+
+        facets = {}
+        for dimension, bitmaps in self.bitmaps.items():
+            scope = base
+            for other, mask in masks.items():
+                if other != dimension:
+                    scope &= mask
+            chosen = selected.get(dimension, set())
+            labels = self.labels.get(dimension, {})
+            entries = []
+            for value, bitmap in bitmaps.items():
+                count = (bitmap & scope).bit_count()
+                if count or value in chosen:
+                    entries.append({
+                        'value': value,
+                        'label': labels.get(value, value),
+                        'count': count,
+                        'selected': value in chosen,
+                    })
+            entries.sort(key=lambda entry: (-entry['count'], str(entry['label'])))
+            facets[dimension] = entries
+        return {'total': total.bit_count(), 'facets': facets}
+
+
+_index = None
+_lock = threading.Lock()          # guards reads and in-place patches of _index
+_build_lock = threading.Lock()    # one full rebuild at a time
+
+
+def _seed_seq():
+    # Clock-based so an evicted counter restarts ahead of every process's index
+    return int(time.time() * 1000)
+
+
+def _current_seq():
+    seq = cache.get(SEQ_KEY)
+    if seq is None:
+        cache.add(SEQ_KEY, _seed_seq(), None)
+        seq = cache.get(SEQ_KEY)
+    return seq
+
+
+def mark_products_changed(product_ids, labels=False):
+    """Publish changed products so every process patches its facet index on next read.
+
+    Pass ``labels=True`` when display names (brand, category, attribute value) changed.
+    """
+    product_ids = [product_id for product_id in set(product_ids) if product_id]
+    if not product_ids and not labels:
+        return
+    _current_seq()
+    try:
+        seq = cache.incr(SEQ_KEY)
+    except ValueError:
+        seq = _seed_seq()
+        cache.set(SEQ_KEY, seq, None)
+    cache.set(JOURNAL_KEY.format(seq=seq), {'products': product_ids, 'labels': labels}, JOURNAL_TIMEOUT)
+
+
+def _rebuild(seq, stale):
+    """Build a fresh index without holding ``_lock`` and swap it in.
+
+    While another thread is already rebuilding, callers that have a ``stale`` index get
+    it back rather than queueing behind the build; only a cold start waits.
+    """
+    global _index
+    if not _build_lock.acquire(blocking=stale is None):
+        return stale
+    try:
+        if _index is not stale:
+            # Another thread swapped in a fresh index while this one waited
+            return _index
+        index = FacetIndex.build(seq)
+        with _lock:
+            _index = index
+        return index
+    finally:
+        _build_lock.release()
+
+
+def get_facet_index():
+    seq = _current_seq()
+    with _lock:
+        index = _index
+        if index is not None and index.seq == seq:
+            return index
+        if index is not None and index.seq < seq <= index.seq + MAX_REPLAY:
+            keys = [JOURNAL_KEY.format(seq=n) for n in range(index.seq + 1, seq + 1)]
+            entries = cache.get_many(keys)
+            # A partly expired journal leaves a full rebuild as the only safe option
+            if len(entries) == len(keys):
+                changed, labels = set(), False
+                for entry in entries.values():
+                    changed.update(entry['products'])
+                    labels = labels or entry['labels']
+                index.patch(changed, seq, labels=labels)
+                return index
+    return _rebuild(seq, index)
+
+
+def facet_counts(selected, product_ids=None):
+    """Counts for ``selected``, optionally restricted to ``product_ids`` (e.g. search hits)."""
+    index = get_facet_index()
+    with _lock:
+        base = index.ids_to_bitmap(product_ids) if product_ids is not None else None
+        return index.counts(selected, base=base)
@@ -0,0 +1,131 @@
+"""
+benchmark_facets.py — Times facet index builds, patches and counts.
+Usage: python manage.py benchmark_facets [--products 100000] [--iterations 50]
+Without --products it runs against the current catalog. --products N first adds N
+generated products (brand, category, price, two attributes and stock each) inside a
+transaction that is rolled back at the end. The index is built directly, so the
+process-wide facet index and the shared journal are left alone.
+"""
+import random
+import statistics
+import time
+import uuid
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from apps.catalog.facets import FIXED_DIMENSIONS, PRICE_BUCKETS, FacetIndex
+from apps.catalog.models import AttributeValue, Brand, Category, Product, ProductAttribute, ProductVariant
+from apps.inventory.models import Stock
+
+SIZES = ['XS', 'S', 'M', 'L', 'XL', 'XXL']
+COLOURS = ['Red', 'Blue', 'Green', 'Black', 'White', 'Maroon', 'Saffron', 'Teal', 'Ivory', 'Indigo']
+PRICES = [Decimal(price) for price in ('1500.00', '3200.00', '7800.00', '14500.00', '26000.00')]
+CHUNK_SIZE = 1000
+PATCH_SIZE = 500
+
+
+def _timings(func, iterations):
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        'p50': statistics.median(samples),
+        'p95': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        'max': samples[-1],
+    }
+
+
+class Command(BaseCommand):
+    help = "Benchmark facet index builds and bitmap counts."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=0, help='Generate this many products first')
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--builds', type=int, default=3)
+
+    def handle(self, *args, **options):
+        if not options['products']:
+            return self.run(options)
+        with transaction.atomic():
+            self.seed(options['products'])
+            self.run(options)
+            transaction.set_rollback(True)
+
+    def seed(self, total):
+        started = time.perf_counter()
+        rng = random.Random(total)
+        tag = uuid.uuid4().hex[:8]
+        categories = [
+            Category.objects.create(name=f'Bench {tag} {n}', slug=f'bench-{tag}-{n}') for n in range(20)
+        ]
+        brands = [Brand.objects.create(name=f'Bench {tag} {n}', slug=f'bench-{tag}-{n}') for n in range(50)]
+        values = {}
+        for name, choices in (('Size', SIZES), ('Colour', COLOURS)):
+            attribute = ProductAttribute.objects.create(name=f'{name} {tag}', slug=f'{name.lower()}-{tag}')
+            values[name] = AttributeValue.objects.bulk_create(
+                AttributeValue(attribute=attribute, value=value) for value in choices
+            )
+        Through = ProductVariant.attributes.through
+
+        for start in range(0, total, CHUNK_SIZE):
+            products = []
+            for n in range(start, min(start + CHUNK_SIZE, total)):
+                base_price = rng.choice(PRICES)
+                products.append(Product(
+                    name=f'Bench {tag} {n}', slug=f'bench-{tag}-{n}', description='Benchmark fixture',
+                    category=rng.choice(categories), brand=rng.choice(brands), base_price=base_price,
+                    current_price=base_price * Decimal('0.8') if rng.random() < 0.2 else base_price,
+                ))
+            products = Product.objects.bulk_create(products)
+            variants = ProductVariant.objects.bulk_create(
+                ProductVariant(product=product, sku=f'BF-{tag}-{product.pk}') for product in products
+            )
+            Through.objects.bulk_create(
+                Through(productvariant_id=variant.pk, attributevalue_id=rng.choice(values[name]).pk)
+                for variant in variants for name in values
+            )
+            Stock.objects.bulk_create(
+                Stock(variant=variant, quantity=rng.choice([0, 3, 20])) for variant in variants
+            )
+        self.stdout.write(f"  Seeded {total} products in {time.perf_counter() - started:.1f}s")
+
+    def run(self, options):
+        iterations = options['iterations']
+        products = Product.objects.filter(is_active=True).count()
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"⏱  Facet index over {products} active products ({iterations} iterations)"
+        ))
+
+        builds = _timings(lambda: FacetIndex.build(seq=0), options['builds'])
+        self.stdout.write(
+            f"  {'build':<14} p50={builds['p50']:.2f}ms  p95={builds['p95']:.2f}ms  max={builds['max']:.2f}ms"
+        )
+
+        index = FacetIndex.build(seq=0)
+        rng = random.Random(products)
+        patch_ids = rng.sample(index.products, min(PATCH_SIZE, len(index.products)))
+        search_ids = rng.sample(index.products, len(index.products) // 8)
+        brand = next(iter(index.bitmaps.get('brand', {})), None)
+        attribute = next((dimension for dimension in index.bitmaps if dimension not in FIXED_DIMENSIONS), None)
+        selections = {
+            'counts': {},
+            'counts+brand': {'brand': {brand}} if brand else {},
+            'counts+filters': {
+                'price': {PRICE_BUCKETS[1][0], PRICE_BUCKETS[2][0]},
+                'in_stock': {'true'},
+                **({attribute: set(list(index.bitmaps[attribute])[:2])} if attribute else {}),
+            },
+        }
+        cases = {
+            f'patch {len(patch_ids)}': lambda: index.patch(patch_ids, seq=0),
+            **{name: (lambda selected=selected: index.counts(selected)) for name, selected in selections.items()},
+            'counts+search': lambda: index.counts({}, base=index.ids_to_bitmap(search_ids)),
+        }
+        for name, func in cases.items():
+            stats = _timings(func, iterations if not name.startswith('patch') else max(1, iterations // 10))
+            self.stdout.write(
+                f"  {name:<14} p50={stats['p50']:.2f}ms  p95={stats['p95']:.2f}ms  max={stats['max']:.2f}ms"
+            )
@@ -0,0 +1,103 @@
+"""
+benchmark_search.py — Compares search index latency against the legacy LIKE path.
+Usage: python manage.py benchmark_search [--products 100000] [--iterations 50] [--query "linen shirt" ...]
+Without --products it runs against the current catalog. --products N first adds N
+generated, indexed products inside a transaction that is rolled back at the end.
+"""
+import random
+import statistics
+import time
+import uuid
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from apps.catalog.models import Category, Product
+from apps.catalog.search import index_products, search_product_ids
+
+DEFAULT_QUERIES = ['linen', 'batik shirt', 'silk', 'sar', 'kandy heritage', 'cotton dress']
+FABRICS = ['linen', 'batik', 'silk', 'cotton', 'denim', 'satin', 'chiffon', 'jersey']
+GARMENTS = ['shirt', 'dress', 'saree', 'sarong', 'kurta', 'skirt', 'blouse', 'trousers']
+STYLES = ['kandy', 'heritage', 'galle', 'coastal', 'classic', 'festive', 'everyday', 'tropical']
+FILLER = ['soft', 'breathable', 'handwoven', 'tailored', 'relaxed', 'bright', 'light', 'durable',
+          'printed', 'embroidered', 'summer', 'evening', 'island', 'weave', 'pattern', 'colour']
+CHUNK_SIZE = 1000
+
+
+def _like_search(query, limit):
+    """The previous SearchFilter behaviour: every term ILIKE'd across name, description and brand."""
+    queryset = Product.objects.filter(is_active=True)
+    for term in query.split():
+        queryset = queryset.filter(
+            Q(name__icontains=term) | Q(description__icontains=term) | Q(brand__name__icontains=term)
+        )
+    return list(queryset.values_list('pk', flat=True)[:limit])
+
+
+def _timings(func, queries, iterations, limit):
+    samples = []
+    for _ in range(iterations):
+        for query in queries:
+            started = time.perf_counter()
+            func(query, limit)
+            samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        'p50': statistics.median(samples),
+        'p95': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        'max': samples[-1],
+    }
+
+
+class Command(BaseCommand):
+    help = "Benchmark the inverted search index against LIKE scans."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=0, help='Generate this many products first')
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--limit', type=int, default=24)
+        parser.add_argument('--query', action='append', dest='queries')
+
+    def handle(self, *args, **options):
+        if not options['products']:
+            return self.run(options)
+        with transaction.atomic():
+            self.seed(options['products'])
+            self.run(options)
+            transaction.set_rollback(True)
+
+    def seed(self, total):
+        started = time.perf_counter()
+        rng = random.Random(total)
+        tag = uuid.uuid4().hex[:8]
+        category = Category.objects.create(name=f'Bench {tag}', slug=f'bench-{tag}')
+        for start in range(0, total, CHUNK_SIZE):
+            products = Product.objects.bulk_create([
+                Product(
+                    name=f'{rng.choice(STYLES).title()} {rng.choice(FABRICS)} {rng.choice(GARMENTS)}',
+                    slug=f'bench-{tag}-{n}', category=category,
+                    description=' '.join(rng.choices(FILLER + FABRICS, k=12)),
+                    base_price=Decimal('2500.00'), current_price=Decimal('2500.00'),
+                )
+                for n in range(start, min(start + CHUNK_SIZE, total))
+            ])
+            index_products([product.pk for product in products])
+        self.stdout.write(f"  Seeded and indexed {total} products in {time.perf_counter() - started:.1f}s")
+
+    def run(self, options):
+        queries = options['queries'] or DEFAULT_QUERIES
+        iterations, limit = options['iterations'], options['limit']
+        products = Product.objects.filter(is_active=True).count()
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"⏱  {len(queries)} queries × {iterations} iterations over {products} active products"
+        ))
+
+        paths = {
+            'index': lambda query, n: search_product_ids(query, limit=n),
+            'like': _like_search,
+        }
+        for name, func in paths.items():
+            stats = _timings(func, queries, iterations, limit)
+            self.stdout.write(
+                f"  {name:<6} p50={stats['p50']:.2f}ms  p95={stats['p95']:.2f}ms  max={stats['max']:.2f}ms"
+            )
@@ -0,0 +1,19 @@
+"""
+rebuild_search_index.py — Rebuilds the catalog search token index.
+Usage: python manage.py rebuild_search_index [--chunk-size 500]
+Safe to re-run; products are reindexed chunk by chunk.
+"""
+from django.core.management.base import BaseCommand
+from apps.catalog.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the inverted search index for all active products."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.MIGRATE_HEADING("🔎  Rebuilding search index…"))
+        total = rebuild_index(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"✅  Indexed {total} products."))
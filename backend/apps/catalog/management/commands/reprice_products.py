@@ -0,0 +1,15 @@
+"""
+reprice_products.py — Re-materializes current prices, applying live flash sales.
+Usage: python manage.py reprice_products
+Safe to re-run; use it after bulk price imports or to repair drift.
+"""
+from django.core.management.base import BaseCommand
+from apps.catalog.pricing import reprice_all
+
+
+class Command(BaseCommand):
+    help = "Recompute Product/ProductVariant current_price including live flash sales."
+
+    def handle(self, *args, **options):
+        changed = reprice_all()
+        self.stdout.write(self.style.SUCCESS(f"✅  Repriced {len(changed)} products."))
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-18 00:47
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_primary_image(apps, schema_editor):
+    Product = apps.get_model('catalog', 'Product')
+    ProductImage = apps.get_model('catalog', 'ProductImage')
+    for image in ProductImage.objects.filter(is_primary=True).only('id', 'product_id'):
+        Product.objects.filter(pk=image.product_id).update(primary_image=image.pk)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='primary_image',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='catalog.productimage'),
+        ),
+        migrations.RunPython(backfill_primary_image, migrations.RunPython.noop),
+    ]
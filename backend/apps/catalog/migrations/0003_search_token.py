@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-18 00:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0002_product_primary_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=64)),
+                ('weight', models.PositiveSmallIntegerField(default=1)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='catalog.product')),
+            ],
+            options={
+                'db_table': 'catalog_search_token',
+                'indexes': [models.Index(fields=['token', 'product'], name='catalog_sea_token_0a4a94_idx')],
+                'unique_together': {('product', 'token')},
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.30 on 2026-10-18 01:06
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_current_price(apps, schema_editor):
+    # Flash sales are applied by the first pricing sweep, which reprices everything
+    Product = apps.get_model('catalog', 'Product')
+    ProductVariant = apps.get_model('catalog', 'ProductVariant')
+    Product.objects.update(current_price=Coalesce('sale_price', 'base_price'))
+    ProductVariant.objects.update(current_price=Coalesce(
+        'price_override',
+        Subquery(Product.objects.filter(pk=OuterRef('product_id')).values('current_price')[:1]),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0004_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='current_price',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='flash_discount',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='productvariant',
+            name='current_price',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', 'current_price', 'id'], name='catalog_pro_is_acti_dcdfd4_idx'),
+        ),
+        migrations.RunPython(backfill_current_price, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0005_current_price'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='searchtoken',
+            name='catalog_sea_token_0a4a94_idx',
+        ),
+        migrations.AddIndex(
+            model_name='searchtoken',
+            index=models.Index(fields=['token', '-weight', 'product'], name='catalog_sea_token_45f625_idx'),
+        ),
+    ]
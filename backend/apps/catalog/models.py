@@ -62,9 +62,16 @@ class Product(models.Model):
     short_description = models.CharField(max_length=500, blank=True)
     base_price = models.DecimalField(max_digits=12, decimal_places=2)
     sale_price = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    # Materialized price paid right now, flash sale included — maintained by apps.catalog.pricing
+    current_price = models.DecimalField(max_digits=12, decimal_places=2, default=0, editable=False)
+    flash_discount = models.PositiveSmallIntegerField(default=0, editable=False)
     is_active = models.BooleanField(default=True, db_index=True)
     is_featured = models.BooleanField(default=False)
     is_new_arrival = models.BooleanField(default=False)
+    # Denormalized primary image for listings — kept in sync by ProductImage.save(), cleared on delete
+    primary_image = models.ForeignKey(
+        'ProductImage', on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
     # SEO
     meta_title = models.CharField(max_length=200, blank=True)
     meta_description = models.CharField(max_length=300, blank=True)
@@ -79,24 +86,50 @@ class Product(models.Model):
             models.Index(fields=['category', 'is_active']),
             models.Index(fields=['is_featured', 'is_active']),
             models.Index(fields=['is_new_arrival', 'is_active']),
+            # Keyset pagination over the listing orderings, pk as tiebreaker
+            models.Index(fields=['is_active', 'created_at', 'id']),
+            models.Index(fields=['is_active', 'base_price', 'id']),
+            models.Index(fields=['is_active', 'current_price', 'id']),
+            models.Index(fields=['is_active', 'name', 'id']),
         ]
 
     def __str__(self):
         return self.name
 
     @property
-    def effective_price(self):
+    def list_price(self):
+        """Sale or base price, before any flash sale."""
         return self.sale_price if self.sale_price else self.base_price
 
+    @property
+    def effective_price(self):
+        return self.current_price
+
     @property
     def is_on_sale(self):
-        return self.sale_price is not None and self.sale_price < self.base_price
+        return self.current_price < self.base_price
 
     def save(self, *args, **kwargs):
+        from .pricing import discounted, variant_price
         if not self.slug:
             self.slug = slugify(self.name)
+        self.current_price = discounted(self.list_price, self.flash_discount)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'base_price', 'sale_price'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'current_price'}
         super().save(*args, **kwargs)
 
+        # Variants without an override follow the product; the rest keep their own discounted price
+        self.variants.filter(price_override__isnull=True).exclude(current_price=self.current_price).update(
+            current_price=self.current_price
+        )
+        overrides = list(
+            self.variants.filter(price_override__isnull=False).only('id', 'price_override', 'current_price')
+        )
+        for variant in overrides:
+            variant.current_price = variant_price(variant.price_override, self.current_price, self.flash_discount)
+        ProductVariant.objects.bulk_update(overrides, ['current_price'])
+
 
 class ProductAttribute(models.Model):
     """e.g. Color, Size, Material"""
@@ -132,6 +165,7 @@ class ProductVariant(models.Model):
     sku = models.CharField(max_length=100, unique=True, db_index=True)
     attributes = models.ManyToManyField(AttributeValue, blank=True, related_name='variants')
     price_override = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    current_price = models.DecimalField(max_digits=12, decimal_places=2, default=0, editable=False)
     primary_image = models.ForeignKey(
         'ProductImage', on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
     )
@@ -147,7 +181,16 @@ class ProductVariant(models.Model):
 
     @property
     def effective_price(self):
-        return self.price_override if self.price_override else self.product.effective_price
+        return self.current_price
+
+    def save(self, *args, **kwargs):
+        from .pricing import variant_price
+        product = self.product
+        self.current_price = variant_price(self.price_override, product.current_price, product.flash_discount)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'price_override' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'current_price'}
+        super().save(*args, **kwargs)
 
 
 class ProductImage(models.Model):
@@ -169,3 +212,23 @@ class ProductImage(models.Model):
         if self.is_primary:
             ProductImage.objects.filter(product=self.product).exclude(pk=self.pk).update(is_primary=False)
         super().save(*args, **kwargs)
+        if self.is_primary:
+            Product.objects.filter(pk=self.product_id).update(primary_image=self)
+        else:
+            Product.objects.filter(pk=self.product_id, primary_image=self).update(primary_image=None)
+
+
+class SearchToken(models.Model):
+    """Inverted-index posting: one weighted token per product, maintained by apps.catalog.search."""
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='search_tokens')
+    token = models.CharField(max_length=64)
+    weight = models.PositiveSmallIntegerField(default=1)
+
+    class Meta:
+        db_table = 'catalog_search_token'
+        unique_together = ('product', 'token')
+        # Weight order lets ranked searches read a term's heaviest postings first
+        indexes = [models.Index(fields=['token', '-weight', 'product'])]
+
+    def __str__(self):
+        return f'{self.token} → {self.product_id} ({self.weight})'
@@ -0,0 +1,121 @@
+"""Pricing — the materialized effective price of products and variants.
+
+``Product.current_price`` and ``ProductVariant.current_price`` hold the price a shopper
+pays right now: the sale price (or base price), or the variant's override, less the
+discount of any live ``FlashSale``. Listings filter and sort on the indexed column and
+carts and checkout read the same value, so price is never recomputed per request.
+
+Model saves keep the column in step with base/sale/override edits; flash sales are
+applied by ``reprice_products`` when a sale is edited and by ``apply_due_boundaries``,
+which the scheduler runs to catch every ``starts_at``/``ends_at`` that has passed.
+"""
+from datetime import timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from functools import partial
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+CENT = Decimal('0.01')
+SWEEP_KEY = 'catalog:pricing:last_sweep'
+
+
+def discounted(price, discount):
+    """``price`` less ``discount`` percent, rounded to the cent."""
+    if not discount:
+        return price
+    return (price * (100 - discount) / 100).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def variant_price(price_override, product_price, discount):
+    """A variant's price: its own override (discounted) or the product's current price."""
+    if price_override:
+        return discounted(price_override, discount)
+    return product_price
+
+
+def live_discounts(product_ids=None, now=None):
+    """``{product_id: percent}`` of the best live flash sale per product."""
+    from apps.promotions.models import FlashSale
+    now = now or timezone.now()
+    sales = FlashSale.objects.filter(is_active=True, starts_at__lte=now, ends_at__gt=now)
+    if product_ids is not None:
+        sales = sales.filter(product_id__in=product_ids)
+    return dict(sales.order_by().values('product_id').annotate(best=Max('discount_percentage')).values_list(
+        'product_id', 'best'
+    ))
+
+
+def _prices_changed(product_ids):
+    from .detail_cache import invalidate_products
+    from .facets import mark_products_changed
+    from .variant_cache import invalidate_variant_summaries
+    mark_products_changed(product_ids)
+    invalidate_variant_summaries(product_ids=product_ids)
+    invalidate_products(product_ids)
+
+
+def reprice_products(product_ids, now=None):
+    """Re-evaluate flash-sale discounts for ``product_ids``; returns the ids whose price changed."""
+    from .models import Product, ProductVariant
+    product_ids = list(product_ids)
+    if not product_ids:
+        return []
+    discounts = live_discounts(product_ids, now)
+
+    products, prices = [], {}
+    for product in Product.objects.filter(pk__in=product_ids).only(
+        'id', 'base_price', 'sale_price', 'current_price', 'flash_discount'
+    ):
+        discount = discounts.get(product.pk, 0)
+        price = discounted(product.list_price, discount)
+        prices[product.pk] = (price, discount)
+        if (product.current_price, product.flash_discount) != (price, discount):
+            product.current_price, product.flash_discount = price, discount
+            products.append(product)
+
+    variants = []
+    for variant in ProductVariant.objects.filter(product_id__in=prices).only(
+        'id', 'product_id', 'price_override', 'current_price'
+    ):
+        price = variant_price(variant.price_override, *prices[variant.product_id])
+        if variant.current_price != price:
+            variant.current_price = price
+            variants.append(variant)
+
+    changed = sorted({product.pk for product in products} | {variant.product_id for variant in variants})
+    with transaction.atomic():
+        Product.objects.bulk_update(products, ['current_price', 'flash_discount'], batch_size=500)
+        ProductVariant.objects.bulk_update(variants, ['current_price'], batch_size=500)
+        if changed:
+            transaction.on_commit(partial(_prices_changed, changed))
+    return changed
+
+
+def reprice_all(now=None, chunk_size=500):
+    from .models import Product
+    ids = list(Product.objects.order_by('pk').values_list('pk', flat=True))
+    changed = []
+    for start in range(0, len(ids), chunk_size):
+        changed.extend(reprice_products(ids[start:start + chunk_size], now=now))
+    return changed
+
+
+def apply_due_boundaries(now=None):
+    """Reprice products whose flash sales started or ended since the previous sweep.
+
+    Without a record of the previous sweep (first run, evicted cache) every product is
+    repriced, so a boundary can never be missed.
+    """
+    from apps.promotions.models import FlashSale
+    now = now or timezone.now()
+    since = cache.get(SWEEP_KEY)
+    if since is None:
+        changed = reprice_all(now=now)
+    else:
+        crossed = Q(starts_at__gt=since, starts_at__lte=now) | Q(ends_at__gt=since, ends_at__lte=now)
+        product_ids = FlashSale.objects.filter(crossed).values_list('product_id', flat=True).distinct()
+        changed = reprice_products(list(product_ids), now=now)
+    cache.set(SWEEP_KEY, now, int(timedelta(days=1).total_seconds()))
+    return changed
@@ -0,0 +1,196 @@
+"""Catalog search — a token-level inverted index over products.
+
+Each active product is broken into weighted tokens (name, brand, category, attribute
+values, descriptions) stored in ``catalog_search_token``. Lookups are indexed equality
+or prefix range scans on ``token``, so no ``LIKE '%term%'`` scan is ever needed; the
+last term of a query is prefix-matched to support typeahead.
+
+Ranked searches never group a term's full posting list: they start from the rarest
+term's heaviest postings (``token, weight`` index order), score at most
+``MAX_CANDIDATES`` products and cut to the page in Python.
+"""
+import re
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import Q
+from .models import AttributeValue, Product, SearchToken
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+MAX_TOKEN_LENGTH = 64
+MIN_TOKEN_LENGTH = 2
+MAX_QUERY_TERMS = 8
+# Postings of the rarest term that are ranked per search
+MAX_CANDIDATES = 1000
+# Term frequencies are only compared up to this many postings
+RARITY_CAP = 10000
+STOPWORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is',
+    'it', 'of', 'on', 'or', 'the', 'this', 'to', 'with',
+})
+
+# Relevance weight contributed by a token depending on where it appears
+FIELD_WEIGHTS = {
+    'name': 10,
+    'brand': 6,
+    'category': 4,
+    'attributes': 3,
+    'short_description': 2,
+    'description': 1,
+}
+
+
+def tokenize(text):
+    tokens = []
+    for token in TOKEN_RE.findall((text or '').lower()):
+        if len(token) >= MIN_TOKEN_LENGTH and token not in STOPWORDS:
+            tokens.append(token[:MAX_TOKEN_LENGTH])
+    return tokens
+
+
+def _document_tokens(fields):
+    """Collapse ``{field: text}`` into ``{token: weight}``, counting each field once per token."""
+    weights = defaultdict(int)
+    for field, text in fields.items():
+        for token in set(tokenize(text)):
+            weights[token] += FIELD_WEIGHTS[field]
+    return weights
+
+
+def index_products(product_ids):
+    """(Re)index the given products; inactive or missing products are dropped from the index."""
+    product_ids = list(product_ids)
+    if not product_ids:
+        return 0
+
+    products = (
+        Product.objects.filter(pk__in=product_ids, is_active=True)
+        .select_related('brand', 'category')
+        .only('id', 'name', 'short_description', 'description', 'brand__name', 'category__name')
+    )
+    attributes = defaultdict(list)
+    rows = (
+        AttributeValue.objects.filter(variants__product_id__in=product_ids, variants__is_active=True)
+        .values_list('variants__product_id', 'value')
+        .distinct()
+    )
+    for product_id, value in rows:
+        attributes[product_id].append(value)
+
+    tokens = []
+    for product in products:
+        weights = _document_tokens({
+            'name': product.name,
+            'brand': product.brand.name if product.brand else '',
+            'category': product.category.name,
+            'attributes': ' '.join(attributes[product.pk]),
+            'short_description': product.short_description,
+            'description': product.description,
+        })
+        tokens.extend(
+            SearchToken(product_id=product.pk, token=token, weight=weight)
+            for token, weight in weights.items()
+        )
+
+    with transaction.atomic():
+        SearchToken.objects.filter(product_id__in=product_ids).delete()
+        SearchToken.objects.bulk_create(tokens, batch_size=2000)
+    return len(tokens)
+
+
+def rebuild_index(chunk_size=500):
+    """Reindex the whole catalog in chunks; returns the number of products indexed."""
+    SearchToken.objects.filter(product__is_active=False).delete()
+    ids = Product.objects.filter(is_active=True).order_by('pk').values_list('pk', flat=True)
+    total, chunk = 0, []
+    for product_id in ids.iterator(chunk_size=chunk_size):
+        chunk.append(product_id)
+        if len(chunk) >= chunk_size:
+            index_products(chunk)
+            total += len(chunk)
+            chunk = []
+    if chunk:
+        index_products(chunk)
+        total += len(chunk)
+    return total
+
+
+def _conditions(query, prefix=True):
+    """``[(term, Q, is_prefix), ...]`` for the query; the last term is prefix-matched when ``prefix`` is set."""
+    terms = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+    conditions = [(term, Q(token=term), False) for term in terms]
+    if prefix and terms:
+        # A range rather than startswith, which is LIKE BINARY on MySQL; tokens are lowercase
+        conditions[-1] = (terms[-1], Q(token__gte=terms[-1], token__lt=terms[-1] + '\uffff'), True)
+    return conditions
+
+
+def _by_rarity(conditions):
+    """Order conditions rarest first, counting postings only up to ``RARITY_CAP``."""
+    sizes = [SearchToken.objects.filter(condition)[:RARITY_CAP].count() for _, condition, _ in conditions]
+    # Among equally common terms an exact one beats a prefix, which can only match more
+    order = sorted(range(len(conditions)), key=lambda i: (sizes[i], conditions[i][2]))
+    return [conditions[i] for i in order]
+
+
+def matching_products(query, prefix=True):
+    """``product_id`` values subquery for products matching every term, or ``None`` for an empty query.
+
+    One semi-join per term, rarest first; nothing is grouped or ranked.
+    """
+    conditions = _conditions(query, prefix=prefix)
+    if not conditions:
+        return None
+    (_, seed, _), *rest = _by_rarity(conditions)
+    matches = SearchToken.objects.filter(seed)
+    for _, condition, _ in rest:
+        matches = matches.filter(product_id__in=SearchToken.objects.filter(condition).values('product_id'))
+    return matches.values('product_id').distinct()
+
+
+def search_product_ids(query, limit=24, prefix=True):
+    """Return ``[(product_id, score), ...]`` for products matching every query term, best first.
+
+    Ranking is bounded: candidates are the ``MAX_CANDIDATES`` heaviest postings of the
+    rarest term, and only those products' postings for the other terms are read and
+    summed. A product that carries the rarest term only lightly may therefore be missed
+    when that term is very common; every product returned matches every term.
+    """
+    conditions = _conditions(query, prefix=prefix)
+    if not conditions or not limit:
+        return []
+    (_, seed, _), *rest = _by_rarity(conditions)
+    scores = defaultdict(int)
+    seed_rows = (
+        SearchToken.objects.filter(seed).order_by('-weight', 'product_id')
+        .values_list('product_id', 'weight')[:MAX_CANDIDATES]
+    )
+    for product_id, weight in seed_rows:
+        scores[product_id] += weight
+
+    if rest:
+        other = Q()
+        for _, condition, _ in rest:
+            other |= condition
+        matched = defaultdict(set)
+        rows = (
+            SearchToken.objects.filter(other, product_id__in=list(scores))
+            .values_list('product_id', 'token', 'weight')
+        )
+        for product_id, token, weight in rows:
+            for term, _, is_prefix in rest:
+                if token == term or (is_prefix and token.startswith(term)):
+                    matched[product_id].add(term)
+                    scores[product_id] += weight
+                    break
+        scores = {product_id: score for product_id, score in scores.items() if len(matched[product_id]) == len(rest)}
+
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+    return ranked[:limit]
+
+
+def filter_products(queryset, query, prefix=True):
+    """Restrict a Product queryset to index matches (unranked; the caller keeps its ordering)."""
+    matches = matching_products(query, prefix=prefix)
+    if matches is None:
+        return queryset
+    return queryset.filter(pk__in=matches)
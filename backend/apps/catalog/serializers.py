@@ -1,7 +1,9 @@
 """Catalog serializers."""
 from rest_framework import serializers
 from .models import Category, Brand, Product, ProductVariant, ProductImage, AttributeValue, ProductAttribute
+from .category_tree import get_children, with_absolute_images
 from apps.inventory.models import Stock
+from apps.reviews.models import ProductRating
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -12,9 +14,8 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'slug', 'image', 'description', 'children', 'sort_order']
 
     def get_children(self, obj):
-        if obj.children.exists():
-            return CategorySerializer(obj.children.filter(is_active=True), many=True).data
-        return []
+        # Served from the cached category tree instead of one query per node
+        return with_absolute_images(get_children(obj.id), self.context.get('request'))
 
 
 class BrandSerializer(serializers.ModelSerializer):
@@ -64,12 +65,13 @@ class ProductListSerializer(serializers.ModelSerializer):
         model = Product
         fields = [
             'id', 'name', 'slug', 'category_name', 'primary_image',
-            'base_price', 'sale_price', 'effective_price', 'is_on_sale',
+            'base_price', 'sale_price', 'effective_price', 'flash_discount', 'is_on_sale',
             'is_new_arrival', 'is_featured'
         ]
 
     def get_primary_image(self, obj):
-        img = obj.images.filter(is_primary=True).first()
+        # Reads the denormalized pointer; callers should select_related('primary_image')
+        img = obj.primary_image
         if img:
             request = self.context.get('request')
             return request.build_absolute_uri(img.image.url) if request else img.image.url
@@ -86,24 +88,37 @@ class ProductDetailSerializer(serializers.ModelSerializer):
     is_on_sale = serializers.BooleanField(read_only=True)
     avg_rating = serializers.SerializerMethodField()
     review_count = serializers.SerializerMethodField()
+    rating_histogram = serializers.SerializerMethodField()
 
     class Meta:
         model = Product
         fields = [
             'id', 'name', 'slug', 'category', 'brand', 'description', 'short_description',
-            'base_price', 'sale_price', 'effective_price', 'is_on_sale',
+            'base_price', 'sale_price', 'effective_price', 'flash_discount', 'is_on_sale',
             'images', 'variants', 'is_new_arrival', 'is_featured',
-            'meta_title', 'meta_description', 'avg_rating', 'review_count'
+            'meta_title', 'meta_description', 'avg_rating', 'review_count', 'rating_histogram'
         ]
 
+    def _rating(self, obj):
+        # Materialized summary from apps.reviews; select_related('rating') to avoid a query
+        try:
+            return obj.rating
+        except ProductRating.DoesNotExist:
+            return None
+
     def get_avg_rating(self, obj):
-        reviews = obj.reviews.filter(is_approved=True)
-        if reviews.exists():
-            return round(reviews.aggregate(__import__('django.db.models', fromlist=['Avg']).Avg('rating'))['rating__avg'], 1)
+        rating = self._rating(obj)
+        if rating and rating.avg_rating is not None:
+            return round(float(rating.avg_rating), 1)
         return None
 
     def get_review_count(self, obj):
-        return obj.reviews.filter(is_approved=True).count()
+        rating = self._rating(obj)
+        return rating.review_count if rating else 0
+
+    def get_rating_histogram(self, obj):
+        rating = self._rating(obj)
+        return rating.histogram if rating else {star: 0 for star in range(1, 6)}
 
 
 class ProductWriteSerializer(serializers.ModelSerializer):
@@ -0,0 +1,109 @@
+"""Catalog signals — cache invalidation, search indexing and facet updates for derived catalog data."""
+from functools import partial
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from apps.inventory.models import Stock
+from apps.reviews.models import Review
+from .models import AttributeValue, Brand, Category, Product, ProductImage, ProductVariant
+from .category_tree import invalidate_category_tree
+from .detail_cache import invalidate_products, invalidate_slugs, patch_stock
+from .facets import mark_products_changed
+from .search import index_products
+from .variant_cache import invalidate_variant_summaries
+
+
+def _refresh_products(product_ids, labels=False, chunk_size=500):
+    for start in range(0, len(product_ids), chunk_size):
+        index_products(product_ids[start:start + chunk_size])
+        invalidate_products(product_ids[start:start + chunk_size])
+    mark_products_changed(product_ids, labels=labels)
+
+
+def _products_changed(product_ids, labels=False):
+    # After commit so cascades (e.g. a product deleted with its variants) have settled
+    product_ids = list(product_ids)
+    if product_ids or labels:
+        transaction.on_commit(partial(_refresh_products, product_ids, labels=labels))
+
+
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_category_tree_on_change(sender, **kwargs):
+    # After commit, or a concurrent reader could re-cache the old tree under the new version
+    transaction.on_commit(invalidate_category_tree)
+
+
+@receiver(post_save, sender=Category)
+def refresh_category_products(sender, instance, raw=False, created=False, **kwargs):
+    if not raw and not created:
+        _products_changed(instance.products.values_list('pk', flat=True), labels=True)
+
+
+@receiver(post_save, sender=Brand)
+def refresh_brand_products(sender, instance, raw=False, created=False, **kwargs):
+    if not raw and not created:
+        _products_changed(instance.products.values_list('pk', flat=True), labels=True)
+
+
+@receiver(post_save, sender=AttributeValue)
+def refresh_attribute_value_products(sender, instance, raw=False, created=False, **kwargs):
+    if not raw and not created:
+        product_ids = instance.variants.values_list('product_id', flat=True).distinct()
+        _products_changed(product_ids, labels=True)
+
+
+@receiver(pre_save, sender=Product)
+def remember_previous_slug(sender, instance, **kwargs):
+    instance._previous_slug = None
+    if not instance._state.adding:
+        instance._previous_slug = Product.objects.filter(pk=instance.pk).values_list('slug', flat=True).first()
+
+
+@receiver([post_save, post_delete], sender=Product)
+def refresh_product(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _products_changed([instance.pk])
+        transaction.on_commit(partial(invalidate_variant_summaries, product_ids=[instance.pk]))
+        # By slug: on commit the row may be gone or renamed
+        slugs = [instance.slug, getattr(instance, '_previous_slug', None)]
+        transaction.on_commit(partial(invalidate_slugs, slugs))
+
+
+@receiver([post_save, post_delete], sender=ProductVariant)
+def refresh_variant_product(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _products_changed([instance.product_id])
+        transaction.on_commit(partial(invalidate_variant_summaries, variant_ids=[instance.pk]))
+
+
+@receiver(m2m_changed, sender=ProductVariant.attributes.through)
+def refresh_variant_attributes(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove'):
+        return
+    if reverse:
+        # instance is an AttributeValue and pk_set holds variant ids
+        product_ids = ProductVariant.objects.filter(pk__in=pk_set).values_list('product_id', flat=True)
+        _products_changed(set(product_ids))
+    else:
+        _products_changed([instance.product_id])
+
+
+@receiver([post_save, post_delete], sender=ProductImage)
+def refresh_image_product(sender, instance, raw=False, **kwargs):
+    if not raw:
+        transaction.on_commit(partial(invalidate_products, [instance.product_id]))
+
+
+@receiver([post_save, post_delete], sender=Review)
+def refresh_reviewed_product(sender, instance, raw=False, **kwargs):
+    # Rating aggregates are part of the detail document
+    if not raw:
+        transaction.on_commit(partial(invalidate_products, [instance.product_id]))
+
+
+@receiver([post_save, post_delete], sender=Stock)
+def refresh_stock_product(sender, instance, raw=False, **kwargs):
+    if not raw:
+        product_id = ProductVariant.objects.filter(pk=instance.variant_id).values_list('product_id', flat=True).first()
+        transaction.on_commit(partial(mark_products_changed, [product_id]))
+        transaction.on_commit(partial(patch_stock, [instance.variant_id]))
@@ -0,0 +1,9 @@
+"""Catalog Celery tasks."""
+from celery import shared_task
+from .pricing import apply_due_boundaries
+
+
+@shared_task
+def reprice_flash_sale_boundaries():
+    """Apply flash sales that have started or ended since the last run to current prices."""
+    return len(apply_due_boundaries())
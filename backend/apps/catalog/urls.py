@@ -6,6 +6,8 @@ urlpatterns = [
     path('categories/', views.CategoryListView.as_view(), name='category-list'),
     path('brands/', views.BrandListView.as_view(), name='brand-list'),
     path('products/', views.ProductListView.as_view(), name='product-list'),
+    path('products/search/', views.ProductSearchView.as_view(), name='product-search'),
+    path('products/facets/', views.ProductFacetView.as_view(), name='product-facets'),
     path('products/<slug:slug>/', views.ProductDetailView.as_view(), name='product-detail'),
     # Admin
     path('admin/products/', views.AdminProductListCreateView.as_view(), name='admin-product-list'),
@@ -0,0 +1,60 @@
+"""Variant summary cache — name, price and image of variants for carts, fetched in batches.
+
+Summaries are cached per variant so a cart of any size is hydrated with one
+``get_many``; misses are loaded together in one query and written back with
+``set_many``. Catalog signals drop the entries of changed products and variants.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from .models import ProductVariant
+
+SUMMARY_KEY = 'catalog:variant:{id}'
+SUMMARY_TIMEOUT = 60 * 10
+
+
+def _summarize(variant):
+    product = variant.product
+    image = variant.primary_image or product.primary_image
+    return {
+        'variant': str(variant.pk),
+        'sku': variant.sku,
+        'product_id': str(product.pk),
+        'product_name': product.name,
+        'product_slug': product.slug,
+        'image': f'{settings.MEDIA_URL}{image.image}' if image and image.image else None,
+        'unit_price': str(variant.effective_price),
+        'is_active': variant.is_active and product.is_active,
+    }
+
+
+def get_variant_summaries(variant_ids):
+    """``{variant_id: summary}`` for the given ids; unknown ids are simply missing."""
+    variant_ids = [str(variant_id) for variant_id in variant_ids]
+    if not variant_ids:
+        return {}
+    keys = {SUMMARY_KEY.format(id=variant_id): variant_id for variant_id in variant_ids}
+    cached = cache.get_many(list(keys))
+    summaries = {keys[key]: summary for key, summary in cached.items()}
+
+    missing = [variant_id for variant_id in variant_ids if variant_id not in summaries]
+    if missing:
+        variants = ProductVariant.objects.filter(pk__in=missing).select_related(
+            'product__primary_image', 'primary_image'
+        )
+        loaded = {str(variant.pk): _summarize(variant) for variant in variants}
+        cache.set_many(
+            {SUMMARY_KEY.format(id=variant_id): summary for variant_id, summary in loaded.items()},
+            SUMMARY_TIMEOUT,
+        )
+        summaries.update(loaded)
+    return summaries
+
+
+def invalidate_variant_summaries(variant_ids=(), product_ids=()):
+    variant_ids = {str(variant_id) for variant_id in variant_ids}
+    if product_ids:
+        variant_ids.update(
+            str(pk) for pk in ProductVariant.objects.filter(product_id__in=product_ids).values_list('pk', flat=True)
+        )
+    if variant_ids:
+        cache.delete_many([SUMMARY_KEY.format(id=variant_id) for variant_id in variant_ids])
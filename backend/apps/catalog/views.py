@@ -1,38 +1,121 @@
 """Catalog views — Product listing, detail, categories."""
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
 from rest_framework import generics, filters, permissions
+from rest_framework.response import Response
+from django.http import Http404, HttpResponse
+from django.core.exceptions import ValidationError
+from django.db.models import Case, F, IntegerField, Q, Value, When
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Category, Brand, Product
+from .models import Category, Brand, Product, ProductVariant, AttributeValue
 from .serializers import (
     CategorySerializer, BrandSerializer,
     ProductListSerializer, ProductDetailSerializer, ProductWriteSerializer
 )
+from .category_tree import get_category_tree, get_descendant_ids, with_absolute_images
+from .detail_cache import detail_queryset, get_product_detail
+from .facets import facet_counts
+from .search import filter_products, matching_products, search_product_ids
+from apps.analytics import bestsellers
+from utils.pagination import KeysetPagination
 from utils.permissions import IsAdminUser
 import django_filters
 
 
 class ProductFilter(django_filters.FilterSet):
-    min_price = django_filters.NumberFilter(field_name='base_price', lookup_expr='gte')
-    max_price = django_filters.NumberFilter(field_name='base_price', lookup_expr='lte')
-    on_sale = django_filters.BooleanFilter(field_name='sale_price', lookup_expr='isnull', exclude=True)
-    category_slug = django_filters.CharFilter(field_name='category__slug', lookup_expr='exact')
+    # Materialized price (sale and flash sale included), indexed with is_active
+    min_price = django_filters.NumberFilter(field_name='current_price', lookup_expr='gte')
+    max_price = django_filters.NumberFilter(field_name='current_price', lookup_expr='lte')
+    on_sale = django_filters.BooleanFilter(method='filter_on_sale')
+    category_slug = django_filters.CharFilter(method='filter_category_slug')
+    attribute = django_filters.CharFilter(method='filter_attribute')
+    in_stock = django_filters.BooleanFilter(method='filter_in_stock')
 
     class Meta:
         model = Product
         fields = ['category', 'brand', 'is_new_arrival', 'is_featured', 'min_price', 'max_price']
 
+    def filter_category_slug(self, queryset, name, value):
+        """Match the category and all of its subcategories via the cached tree."""
+        category_ids = get_descendant_ids(value)
+        if not category_ids:
+            return queryset.filter(category__slug=value)
+        return queryset.filter(category_id__in=category_ids)
+
+    def filter_attribute(self, queryset, name, value):
+        """Comma-separated AttributeValue ids: OR within an attribute, AND across attributes."""
+        ids = [part.strip() for part in value.split(',') if part.strip()]
+        try:
+            rows = list(AttributeValue.objects.filter(pk__in=ids).values_list('pk', 'attribute_id'))
+        except ValidationError:
+            return queryset.none()
+        groups = {}
+        for value_id, attribute_id in rows:
+            groups.setdefault(attribute_id, []).append(value_id)
+        for value_ids in groups.values():
+            variants = ProductVariant.objects.filter(is_active=True, attributes__in=value_ids)
+            queryset = queryset.filter(pk__in=variants.values('product_id'))
+        return queryset
+
+    def filter_on_sale(self, queryset, name, value):
+        # Same definition as Product.is_on_sale and the on_sale facet: sale and flash sale prices alike
+        on_sale = Q(current_price__lt=F('base_price'))
+        return queryset.filter(on_sale) if value else queryset.exclude(on_sale)
+
+    def filter_in_stock(self, queryset, name, value):
+        in_stock = ProductVariant.objects.filter(
+            is_active=True, stock__quantity__gt=F('stock__reserved_quantity')
+        ).values('product_id')
+        if value:
+            return queryset.filter(pk__in=in_stock)
+        return queryset.exclude(pk__in=in_stock)
+
+
+class ProductSearchFilter(filters.SearchFilter):
+    """``?search=`` backed by the catalog inverted index instead of ``LIKE '%term%'`` scans."""
+
+    def filter_queryset(self, request, queryset, view):
+        query = ' '.join(self.get_search_terms(request))
+        if not query:
+            return queryset
+        return filter_products(queryset, query)
+
+
+class ProductOrderingFilter(filters.OrderingFilter):
+    """Adds ``?ordering=best_selling`` (units over ``?window=1|7|30`` days) to the field orderings.
+
+    Ranks come from the bestseller sorted sets. Unranked products share the last rank and
+    follow in primary-key order, the tiebreaker keyset pagination pages on, so their
+    order is stable but arbitrary.
+    """
+    best_selling = 'best_selling'
+    max_ranked = 500
+
+    def filter_queryset(self, request, queryset, view):
+        if request.query_params.get(self.ordering_param) != self.best_selling:
+            return super().filter_queryset(request, queryset, view)
+        window = bestsellers.clean_window(request.query_params.get('window'))
+        ranked = bestsellers.top_products(window=window, limit=self.max_ranked)
+        rank = Case(
+            *[When(pk=product_id, then=Value(position)) for position, (product_id, _) in enumerate(ranked)],
+            default=Value(self.max_ranked),
+            output_field=IntegerField(),
+        ) if ranked else Value(self.max_ranked, output_field=IntegerField())
+        return queryset.annotate(bestseller_rank=rank).order_by('bestseller_rank')
+
 
 class CategoryListView(generics.ListAPIView):
     serializer_class = CategorySerializer
     permission_classes = [permissions.AllowAny]
 
-    @method_decorator(cache_page(60 * 15))  # Cache 15 min
-    def dispatch(self, *args, **kwargs):
-        return super().dispatch(*args, **kwargs)
-
     def get_queryset(self):
-        return Category.objects.filter(is_active=True, parent=None).prefetch_related('children')
+        return Category.objects.filter(is_active=True, parent=None)
+
+    def list(self, request, *args, **kwargs):
+        # Root nodes come pre-serialized from the versioned tree cache
+        roots = get_category_tree()['roots']
+        page = self.paginate_queryset(roots)
+        if page is not None:
+            return self.get_paginated_response(with_absolute_images(page, request))
+        return Response(with_absolute_images(roots, request))
 
 
 class BrandListView(generics.ListAPIView):
@@ -44,18 +127,68 @@ class BrandListView(generics.ListAPIView):
 class ProductListView(generics.ListAPIView):
     serializer_class = ProductListSerializer
     permission_classes = [permissions.AllowAny]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, ProductSearchFilter, ProductOrderingFilter]
     filterset_class = ProductFilter
-    search_fields = ['name', 'description', 'brand__name']
-    ordering_fields = ['base_price', 'created_at', 'name']
+    pagination_class = KeysetPagination
+    ordering_fields = ['current_price', 'base_price', 'created_at', 'name']
     ordering = ['-created_at']
 
     def get_queryset(self):
         return (
             Product.objects.filter(is_active=True)
-            .select_related('category', 'brand')
-            .prefetch_related('images')
+            .select_related('category', 'brand', 'primary_image')
+        )
+
+
+class ProductSearchView(generics.GenericAPIView):
+    """Relevance-ranked search; the last term is prefix-matched so it also serves typeahead."""
+    serializer_class = ProductListSerializer
+    permission_classes = [permissions.AllowAny]
+    max_limit = 50
+
+    def get(self, request):
+        query = request.query_params.get('q', '')
+        try:
+            limit = min(int(request.query_params.get('limit', 24)), self.max_limit)
+        except ValueError:
+            limit = 24
+        ranked = search_product_ids(query, limit=max(limit, 1))
+        products = (
+            Product.objects.filter(pk__in=[product_id for product_id, _ in ranked], is_active=True)
+            .select_related('category', 'brand', 'primary_image')
+            .in_bulk()
         )
+        results = [products[product_id] for product_id, _ in ranked if product_id in products]
+        serializer = self.get_serializer(results, many=True)
+        return Response({'query': query, 'count': len(results), 'results': serializer.data})
+
+
+class ProductFacetView(generics.GenericAPIView):
+    """Facet counts for the storefront filter sidebar, served from the in-memory facet index.
+
+    Accepts ``category``, ``category_slug``, ``brand``, ``price``, ``on_sale``, ``in_stock``
+    and one parameter per attribute slug (e.g. ``size``), each comma-separated, plus ``search``.
+    Any other parameter (paging, ordering, ``format``) is ignored by the index.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        selected = {}
+        for param, raw in request.query_params.items():
+            values = {value.strip() for value in raw.split(',') if value.strip()}
+            if values:
+                selected[param] = values
+
+        slug = request.query_params.get('category_slug')
+        if slug:
+            selected['category'] = set(get_descendant_ids(slug)) or {slug}
+
+        product_ids = None
+        matches = matching_products(request.query_params.get('search', ''))
+        if matches is not None:
+            product_ids = list(matches.values_list('product_id', flat=True))
+
+        return Response(facet_counts(selected, product_ids=product_ids))
 
 
 class ProductDetailView(generics.RetrieveAPIView):
@@ -64,11 +197,14 @@ class ProductDetailView(generics.RetrieveAPIView):
     lookup_field = 'slug'
 
     def get_queryset(self):
-        return (
-            Product.objects.filter(is_active=True)
-            .select_related('category', 'brand')
-            .prefetch_related('images', 'variants__attributes__attribute', 'variants__stock')
-        )
+        return detail_queryset()
+
+    def retrieve(self, request, *args, **kwargs):
+        # Pre-rendered JSON from apps.catalog.detail_cache: a hit is one cache GET
+        document = get_product_detail(kwargs[self.lookup_field])
+        if document is None:
+            raise Http404
+        return HttpResponse(document, content_type='application/json')
 
 
 # ── Admin Views ──────────────────────────────────────────────────────────────
@@ -77,7 +213,7 @@ class AdminProductListCreateView(generics.ListCreateAPIView):
     permission_classes = [IsAdminUser]
 
     def get_queryset(self):
-        return Product.objects.all().select_related('category', 'brand')
+        return Product.objects.all().select_related('category', 'brand', 'primary_image')
 
     def get_serializer_class(self):
         if self.request.method == 'GET':
@@ -90,7 +226,7 @@ class AdminProductDetailView(generics.RetrieveUpdateDestroyAPIView):
     lookup_field = 'slug'
 
     def get_queryset(self):
-        return Product.objects.all()
+        return Product.objects.all().select_related('category', 'brand', 'rating')
 
     def get_serializer_class(self):
         if self.request.method == 'GET':
@@ -0,0 +1,15 @@
+"""Cache warm-up for products about to take a traffic spike (e.g. a flash sale opening)."""
+from .category_tree import get_category_tree
+from .detail_cache import warm_product_details
+from .models import ProductVariant
+from .variant_cache import get_variant_summaries
+
+
+def warm_products(product_ids):
+    """Fill the caches that listing, cart and detail reads of these products depend on."""
+    get_category_tree()
+    variant_ids = ProductVariant.objects.filter(product_id__in=product_ids, is_active=True).values_list(
+        'pk', flat=True
+    )
+    get_variant_summaries(list(variant_ids))
+    warm_product_details(product_ids)
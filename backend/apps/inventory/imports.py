@@ -0,0 +1,190 @@
+"""Bulk stock import — recounts and adjustments for thousands of SKUs per request.
+
+Rows come from a CSV (``sku`` plus ``quantity`` or ``delta`` columns) or JSON Lines
+stream and are read lazily, so memory is bounded by ``chunk_size`` whatever the file
+size. Each chunk resolves its SKUs with one query and is applied in its own transaction:
+the stock rows are locked, new quantities are written with one ``UPDATE`` per distinct
+value (missing rows are inserted) and one ``StockMovement`` per change is inserted with
+``bulk_create``, so the ledger (``apps.inventory.ledger``) stays complete.
+
+``quantity`` sets the counted on-hand quantity, ``delta`` adds to it. Bad rows (unknown
+SKUs, or a result below zero or below the quantity reserved for unpaid orders) are
+reported with their line number and skipped; the rest of the chunk still applies.
+"""
+import csv
+import json
+from collections import defaultdict
+from dataclasses import dataclass, field
+from functools import partial
+from django.db import transaction
+from django.utils import timezone
+from apps.catalog.detail_cache import patch_stock
+from apps.catalog.facets import mark_products_changed
+from apps.catalog.models import ProductVariant
+from .low_stock import refresh_levels
+from .models import Stock, StockMovement
+
+CHUNK_SIZE = 1000
+# Errors kept in the result; later ones are only counted
+MAX_ERRORS = 1000
+REASONS = (
+    StockMovement.Reason.ADJUSTMENT, StockMovement.Reason.PURCHASE,
+    StockMovement.Reason.RETURN, StockMovement.Reason.DAMAGE,
+)
+
+
+class ImportFormatError(Exception):
+    pass
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    created: int = 0
+    error_count: int = 0
+    errors: list = field(default_factory=list)
+
+    def error(self, line, sku, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append({'line': line, 'sku': sku, 'error': message})
+
+    def as_dict(self):
+        return {
+            'rows': self.rows, 'changed': self.changed, 'unchanged': self.unchanged, 'created': self.created,
+            'error_count': self.error_count, 'errors': sorted(self.errors, key=lambda error: error['line'] or 0),
+        }
+
+
+def read_csv(lines):
+    """Yield ``(line, record)`` from CSV text lines with a header row."""
+    reader = csv.DictReader(lines)
+    if reader.fieldnames is None or 'sku' not in reader.fieldnames or not (
+        {'quantity', 'delta'} & set(reader.fieldnames)
+    ):
+        raise ImportFormatError('Expected a sku column and a quantity or delta column')
+    for record in reader:
+        yield reader.line_num, record
+
+
+def read_jsonl(lines):
+    """Yield ``(line, record)`` from JSON Lines; unparseable lines become records with an error."""
+    for number, text in enumerate(lines, start=1):
+        if not text.strip():
+            continue
+        try:
+            record = json.loads(text)
+        except ValueError:
+            record = None
+        yield number, record if isinstance(record, dict) else {'_error': 'Not a JSON object'}
+
+
+def _parse(record):
+    """``(sku, quantity, delta)`` from one record; raises ValueError with a message."""
+    if '_error' in record:
+        raise ValueError(record['_error'])
+    sku = str(record.get('sku') or '').strip()
+    if not sku:
+        raise ValueError('Missing sku')
+    quantity, delta = record.get('quantity'), record.get('delta')
+    quantity = None if quantity in (None, '') else quantity
+    delta = None if delta in (None, '') else delta
+    if (quantity is None) == (delta is None):
+        raise ValueError('Give exactly one of quantity or delta')
+    try:
+        value = int(str(quantity if quantity is not None else delta).strip())
+    except ValueError:
+        raise ValueError('Not a whole number')
+    if quantity is not None and value < 0:
+        raise ValueError('Quantity cannot be negative')
+    return sku, (value if quantity is not None else None), (value if delta is not None else None)
+
+
+def import_stock(records, reason=StockMovement.Reason.ADJUSTMENT, reference='', note='', user=None,
+                 chunk_size=CHUNK_SIZE, dry_run=False):
+    """Apply ``(line, record)`` pairs (see ``read_csv``/``read_jsonl``) chunk by chunk."""
+    result = ImportResult()
+    chunk = []
+    try:
+        for line, record in records:
+            result.rows += 1
+            try:
+                chunk.append((line, *_parse(record)))
+            except ValueError as exc:
+                result.error(line, str(record.get('sku') or ''), str(exc))
+            if len(chunk) >= chunk_size:
+                _apply_chunk(chunk, reason, reference, note, user, dry_run, result)
+                chunk = []
+    except (UnicodeDecodeError, csv.Error) as exc:
+        # Rows read before the damage still apply
+        result.error(None, '', f'Stopped reading the file: {exc}')
+    if chunk:
+        _apply_chunk(chunk, reason, reference, note, user, dry_run, result)
+    return result
+
+
+def _apply_chunk(rows, reason, reference, note, user, dry_run, result):
+    variants = dict(
+        ProductVariant.objects.filter(sku__in={sku for _, sku, _, _ in rows})
+        .values_list('sku', 'pk')
+    )
+    with transaction.atomic():
+        locked = (
+            Stock.objects.select_for_update().filter(variant_id__in=list(variants.values()))
+            .order_by('variant_id').values_list('variant_id', 'quantity', 'reserved_quantity')
+        )
+        current, reserved = {}, {}
+        for variant_id, quantity, reserved_quantity in locked:
+            current[variant_id], reserved[variant_id] = quantity, reserved_quantity
+        before = dict(current)
+        changes = []
+        for line, sku, quantity, delta in rows:
+            variant_id = variants.get(sku)
+            if variant_id is None:
+                result.error(line, sku, 'Unknown SKU')
+                continue
+            old = current.get(variant_id, 0)
+            new = quantity if quantity is not None else old + delta
+            if new < 0:
+                result.error(line, sku, f'Quantity would drop below zero ({old} {delta:+d})')
+                continue
+            # Unpaid orders hold these units; settling them needs quantity >= reserved
+            if new < reserved.get(variant_id, 0):
+                result.error(line, sku, f'Quantity {new} is below the {reserved[variant_id]} reserved')
+                continue
+            if new == old:
+                result.unchanged += 1
+                continue
+            current[variant_id] = new
+            changes.append((variant_id, new - old))
+
+        changed = {variant_id for variant_id, _ in changes}
+        missing = [variant_id for variant_id in changed if variant_id not in before]
+        result.changed += len(changes)
+        result.created += len(missing)
+        if dry_run or not changes:
+            return
+
+        # Recounts repeat the same few quantities, so one UPDATE per distinct value
+        by_quantity = defaultdict(list)
+        for variant_id in changed:
+            if variant_id in before:
+                by_quantity[current[variant_id]].append(variant_id)
+        now = timezone.now()
+        for quantity, variant_ids in by_quantity.items():
+            Stock.objects.filter(variant_id__in=variant_ids).update(quantity=quantity, updated_at=now)
+        # bulk writes bypass the Stock signals, so movements, levels and cache refreshes are done here
+        Stock.objects.bulk_create([Stock(variant_id=variant_id, quantity=current[variant_id]) for variant_id in missing])
+        refresh_levels(changed)
+        StockMovement.objects.bulk_create([
+            StockMovement(
+                variant_id=variant_id, quantity_change=change, reason=reason,
+                reference_id=reference, note=note, created_by=user,
+            )
+            for variant_id, change in changes
+        ])
+        product_ids = ProductVariant.objects.filter(pk__in=changed).values_list('product_id', flat=True).distinct()
+        transaction.on_commit(partial(mark_products_changed, list(product_ids)))
+        transaction.on_commit(partial(patch_stock, list(changed)))
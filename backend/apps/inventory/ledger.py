@@ -0,0 +1,126 @@
+"""Stock ledger — checkpoints so a variant's quantity never needs its whole movement history.
+
+``StockMovement`` is append-only. Only the reasons in ``QUANTITY_REASONS`` change
+``Stock.quantity``; reservations and releases move stock between available and reserved
+and are left out of quantity sums.
+
+``checkpoint`` (run hourly) writes, for every variant with quantity movements since the
+previous run, its ledger quantity just before the run's ``as_of``. Variants without
+movements keep their older checkpoint, so for any run the latest checkpoint of each
+variant at or before it is that variant's quantity at that moment. ``as_of`` trails the
+clock by ``LAG`` so transactions still open when the run starts cannot add movements
+behind it.
+
+``quantities`` (optionally as of a past moment) and ``reconcile`` therefore only read
+movements since the latest checkpoint run, through the ``(variant, created_at)`` index.
+``reconcile(full=True)`` instead sums the whole ledger in one grouped pass.
+"""
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Max, OuterRef, Subquery, Sum
+from django.utils import timezone
+from .models import Stock, StockCheckpoint, StockMovement
+
+Reason = StockMovement.Reason
+
+QUANTITY_REASONS = (Reason.PURCHASE, Reason.SALE, Reason.RETURN, Reason.ADJUSTMENT, Reason.DAMAGE)
+LAG = timedelta(minutes=10)
+BATCH_SIZE = 1000
+
+
+def quantity_movements():
+    return StockMovement.objects.filter(reason__in=QUANTITY_REASONS).order_by()
+
+
+def _totals(movements):
+    rows = movements.values('variant_id').annotate(total=Sum('quantity_change')).values_list('variant_id', 'total')
+    return dict(rows.iterator(chunk_size=BATCH_SIZE))
+
+
+def latest_run(at=None):
+    """``as_of`` of the latest checkpoint run (at or before ``at``); None before the first run."""
+    runs = StockCheckpoint.objects.order_by()
+    if at is not None:
+        runs = runs.filter(as_of__lte=at)
+    return runs.aggregate(latest=Max('as_of'))['latest']
+
+
+def checkpoints(before, variant_ids=None):
+    """``{variant_id: quantity}`` from each variant's latest checkpoint at or before ``before``."""
+    rows = StockCheckpoint.objects.filter(as_of__lte=before).order_by()
+    if variant_ids is not None:
+        rows = rows.filter(variant_id__in=list(variant_ids))
+    latest = (
+        StockCheckpoint.objects.filter(variant_id=OuterRef('variant_id'), as_of__lte=before)
+        .order_by('-as_of').values('as_of')[:1]
+    )
+    rows = rows.filter(as_of=Subquery(latest)).values_list('variant_id', 'quantity')
+    return dict(rows.iterator(chunk_size=BATCH_SIZE))
+
+
+def quantities(variant_ids=None, at=None):
+    """``{variant_id: quantity}`` according to the ledger, now or just before ``at``."""
+    start = latest_run(at)
+    result = checkpoints(start, variant_ids) if start is not None else {}
+    movements = quantity_movements()
+    if start is not None:
+        movements = movements.filter(created_at__gte=start)
+    if at is not None:
+        movements = movements.filter(created_at__lt=at)
+    if variant_ids is not None:
+        movements = movements.filter(variant_id__in=list(variant_ids))
+    for variant_id, total in _totals(movements).items():
+        result[variant_id] = result.get(variant_id, 0) + total
+    return result
+
+
+def checkpoint(now=None):
+    """Checkpoint every variant with quantity movements since the last run; returns how many."""
+    as_of = (now or timezone.now()) - LAG
+    with transaction.atomic():
+        previous = latest_run()
+        if previous is not None and previous >= as_of:
+            return 0
+        movements = quantity_movements().filter(created_at__lt=as_of)
+        if previous is not None:
+            movements = movements.filter(created_at__gte=previous)
+        deltas = _totals(movements)
+        variant_ids = list(deltas)
+        for start in range(0, len(variant_ids), BATCH_SIZE):
+            batch = variant_ids[start:start + BATCH_SIZE]
+            # Based on the previous run, not on a concurrent run that may have landed since
+            base = checkpoints(previous, batch) if previous is not None else {}
+            StockCheckpoint.objects.bulk_create([
+                StockCheckpoint(variant_id=variant_id, as_of=as_of, quantity=base.get(variant_id, 0) + deltas[variant_id])
+                for variant_id in batch
+            ])
+    return len(variant_ids)
+
+
+def reconcile(full=False):
+    """Yield ``(variant_id, stock_quantity, ledger_quantity)`` wherever ``Stock.quantity`` disagrees.
+
+    ``stock_quantity`` is None for variants with movements but no stock row.
+    """
+    ledger = _totals(quantity_movements()) if full else quantities()
+    rows = Stock.objects.order_by().values_list('variant_id', 'quantity')
+    for variant_id, quantity in rows.iterator(chunk_size=BATCH_SIZE):
+        expected = ledger.pop(variant_id, 0)
+        if expected != quantity:
+            yield variant_id, quantity, expected
+    for variant_id, expected in ledger.items():
+        if expected:
+            yield variant_id, None, expected
+
+
+def adjust(mismatches, user=None, note='Ledger reconciliation'):
+    """Record ADJUSTMENT movements bringing the ledger in line with ``Stock.quantity``."""
+    movements = [
+        StockMovement(
+            variant_id=variant_id, quantity_change=quantity - expected, reason=Reason.ADJUSTMENT,
+            note=note, created_by=user,
+        )
+        for variant_id, quantity, expected in mismatches if quantity is not None
+    ]
+    StockMovement.objects.bulk_create(movements, batch_size=BATCH_SIZE)
+    return len(movements)
@@ -0,0 +1,97 @@
+"""Low-stock levels and alerts — find short variants without loading every stock row.
+
+``Stock.level`` (OK / LOW / OUT) is a stored, indexed copy of ``LEVEL``, the rule behind
+``Stock.is_low_stock`` written as a SQL expression. Stock mostly changes through guarded
+``.update()``s that bypass ``save()``, so every write path calls ``refresh_levels`` for
+the variants it touched: one ``UPDATE`` that rewrites the level only where it differs
+and flags those rows ``alert_pending``.
+
+``send_alerts`` (run every minute) reads only flagged rows. A row alerts when its level
+is worse than ``alerted_level`` (OK → LOW, OK/LOW → OUT); a recovery only lowers
+``alerted_level`` so the next drop alerts again, and a level that bounced back before
+the run alerts nothing. Flagged rows are locked with ``SKIP LOCKED`` and cleared in the
+transaction that queues the email, so each crossing is reported once.
+
+Comparisons add to ``reserved_quantity`` rather than subtract from ``quantity``: the
+columns are unsigned on MySQL, where a negative difference is an error.
+"""
+import logging
+from collections import defaultdict
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Case, CharField, F, Value, When
+from apps.notifications.mail import queue_email
+from .models import Stock
+
+logger = logging.getLogger(__name__)
+
+Level = Stock.Level
+
+LEVEL = Case(
+    When(quantity__lte=F('reserved_quantity'), then=Value(Level.OUT.value)),
+    When(quantity__lte=F('reserved_quantity') + F('low_stock_threshold'), then=Value(Level.LOW.value)),
+    default=Value(Level.OK.value),
+    output_field=CharField(),
+)
+SEVERITY = {Level.OK: 0, Level.LOW: 1, Level.OUT: 2}
+BATCH_SIZE = 500
+
+
+def level_of(stock):
+    """``LEVEL`` evaluated in Python for an in-memory row."""
+    if stock.quantity <= stock.reserved_quantity:
+        return Level.OUT
+    if stock.quantity <= stock.reserved_quantity + stock.low_stock_threshold:
+        return Level.LOW
+    return Level.OK
+
+
+def refresh_levels(variant_ids):
+    """Bring ``Stock.level`` up to date for ``variant_ids``; returns how many rows changed level."""
+    return (
+        Stock.objects.filter(variant_id__in=list(variant_ids)).exclude(level=LEVEL)
+        .update(level=LEVEL, alert_pending=True)
+    )
+
+
+def recipients():
+    """``STOCK_ALERT_EMAILS``, or every active admin when it is empty."""
+    if settings.STOCK_ALERT_EMAILS:
+        return list(settings.STOCK_ALERT_EMAILS)
+    User = get_user_model()
+    return list(
+        User.objects.filter(role=User.Role.ADMIN, is_active=True).exclude(email='').values_list('email', flat=True)
+    )
+
+
+def _queue_alerts(stock_ids):
+    rows = (
+        Stock.objects.filter(pk__in=stock_ids).order_by('-level', 'variant__sku')
+        .values_list('variant__sku', 'variant__product__name', 'level', 'quantity', 'reserved_quantity')
+    )
+    items = [
+        {'sku': sku, 'product': product, 'level': Level(level).label, 'available': max(0, quantity - reserved)}
+        for sku, product, level, quantity, reserved in rows
+    ]
+    logger.warning('Low-stock alert for %d variant(s)', len(items))
+    for to in recipients():
+        queue_email('low_stock', to, {'count': len(items), 'items': items})
+
+
+def send_alerts(batch_size=BATCH_SIZE):
+    """Settle up to ``batch_size`` flagged rows, alerting on the crossings; returns how many were settled."""
+    with transaction.atomic():
+        rows = list(
+            Stock.objects.select_for_update(skip_locked=True).filter(alert_pending=True)
+            .order_by('id').values_list('id', 'level', 'alerted_level')[:batch_size]
+        )
+        crossed = [pk for pk, level, alerted in rows if SEVERITY[level] > SEVERITY[alerted]]
+        by_level = defaultdict(list)
+        for pk, level, _ in rows:
+            by_level[level].append(pk)
+        for level, stock_ids in by_level.items():
+            Stock.objects.filter(pk__in=stock_ids).update(alerted_level=level, alert_pending=False)
+        if crossed:
+            _queue_alerts(crossed)
+    return len(rows)
@@ -0,0 +1,97 @@
+"""
+benchmark_reservations.py — Hammers a single hot SKU with concurrent reservations.
+Usage: python manage.py benchmark_reservations [--orders 400] [--workers 32] [--stock 200]
+Each worker thread reserves one unit per order on its own connection. The run checks
+that exactly ``--stock`` reservations succeed (no oversell) and reports throughput,
+latency and any deadlocks. Fixtures are committed for the run and deleted afterwards.
+"""
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, close_old_connections
+from apps.catalog.models import Category, Product, ProductVariant
+from apps.inventory.models import Stock, StockMovement
+from apps.inventory.reservations import InsufficientStock, reserve_order
+from apps.orders.models import Order
+
+
+class Command(BaseCommand):
+    help = "Benchmark concurrent stock reservations on one SKU (fixtures are deleted afterwards)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=400)
+        parser.add_argument('--workers', type=int, default=32)
+        parser.add_argument('--stock', type=int, default=200)
+
+    def handle(self, *args, **options):
+        total, workers, stock = options['orders'], options['workers'], options['stock']
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"🔒  Reservation benchmark ({total} orders, {workers} workers, {stock} units on one SKU)"
+        ))
+
+        tag = uuid.uuid4().hex[:8]
+        category = Category.objects.create(name=f'Bench {tag}', slug=f'bench-{tag}')
+        product = Product.objects.create(
+            name=f'Bench {tag}', slug=f'bench-{tag}', category=category,
+            description='Benchmark fixture', base_price=Decimal('1000.00'),
+        )
+        variant = ProductVariant.objects.create(product=product, sku=f'BENCH-{tag}')
+        Stock.objects.create(variant=variant, quantity=stock)
+        # Saved one by one so the analytics rollups record them; deleting them afterwards
+        # subtracts exactly what was added (the worker threads rule out a rolled-back transaction)
+        orders = [
+            Order.objects.create(
+                order_number=f'BR{tag}{n:05d}', shipping_address={'district': 'Colombo'},
+                subtotal=Decimal('1000.00'), grand_total=Decimal('1000.00'),
+            )
+            for n in range(total)
+        ]
+
+        def reserve(order):
+            started = time.perf_counter()
+            try:
+                reserve_order(order, [(variant.pk, 1)])
+                outcome = 'reserved'
+            except InsufficientStock:
+                outcome = 'rejected'
+            except OperationalError:
+                outcome = 'error'
+            finally:
+                close_old_connections()
+            return outcome, (time.perf_counter() - started) * 1000
+
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(reserve, orders))
+            elapsed = time.perf_counter() - started
+
+            outcomes = [outcome for outcome, _ in results]
+            timings = sorted(timing for _, timing in results)
+            reserved = outcomes.count('reserved')
+            row = Stock.objects.get(variant=variant)
+
+            self.stdout.write(
+                f"  reserved={reserved}  rejected={outcomes.count('rejected')}  "
+                f"errors={outcomes.count('error')}  throughput={total / elapsed:.0f}/s"
+            )
+            self.stdout.write(
+                f"  p50={statistics.median(timings):.2f}ms  "
+                f"p95={timings[int(len(timings) * 0.95) - 1]:.2f}ms  max={timings[-1]:.2f}ms"
+            )
+            if row.reserved_quantity != reserved or row.reserved_quantity > row.quantity:
+                raise CommandError(
+                    f"Inconsistent stock: reserved_quantity={row.reserved_quantity}, "
+                    f"quantity={row.quantity}, successful reservations={reserved}"
+                )
+            self.stdout.write(self.style.SUCCESS(
+                f"  ✅ No oversell: {row.reserved_quantity}/{row.quantity} units reserved"
+            ))
+        finally:
+            StockMovement.objects.filter(variant=variant).delete()
+            Order.objects.filter(pk__in=[order.pk for order in orders]).delete()
+            product.delete()
+            category.delete()
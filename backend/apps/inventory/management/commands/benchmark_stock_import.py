@@ -0,0 +1,71 @@
+"""
+benchmark_stock_import.py — Times a full recount of many SKUs through the bulk importer.
+Usage: python manage.py benchmark_stock_import [--rows 100000] [--chunk-size 1000] [--trace-memory]
+Generates the CSV on the fly (every SKU gets a new count, 1% of rows are bad) and
+creates all fixtures inside a transaction that is rolled back at the end.
+--trace-memory reports peak Python allocations (tracemalloc slows the run about 3x).
+Run with DEBUG off: the debug query log alone grows with every chunk.
+"""
+import time
+import tracemalloc
+import uuid
+from decimal import Decimal
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from apps.catalog.models import Category, Product, ProductVariant
+from apps.inventory.imports import CHUNK_SIZE, import_stock, read_csv
+from apps.inventory.models import Stock, StockMovement
+
+
+class Command(BaseCommand):
+    help = "Benchmark the bulk stock importer (fixtures are rolled back)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100_000)
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+        parser.add_argument('--trace-memory', action='store_true')
+
+    def handle(self, *args, **options):
+        total = options['rows']
+        self.stdout.write(self.style.MIGRATE_HEADING(f"📦  Stock import benchmark ({total} rows)"))
+
+        with transaction.atomic():
+            tag = uuid.uuid4().hex[:8]
+            category = Category.objects.create(name=f'Bench {tag}', slug=f'bench-{tag}')
+            product = Product.objects.create(
+                name=f'Bench {tag}', slug=f'bench-{tag}', category=category,
+                description='Benchmark fixture', base_price=Decimal('1000.00'),
+            )
+            variants = ProductVariant.objects.bulk_create(
+                [ProductVariant(product=product, sku=f'BENCH-{tag}-{n}') for n in range(total)], batch_size=5000
+            )
+            Stock.objects.bulk_create([Stock(variant=variant, quantity=10) for variant in variants], batch_size=5000)
+            del variants
+
+            def lines():
+                yield 'sku,quantity\n'
+                for n in range(total):
+                    # Every hundredth row names an unknown SKU
+                    yield f'BENCH-{tag}-{n}{"-X" if n % 100 == 99 else ""},{n % 50 + 11}\n'
+
+            if options['trace_memory']:
+                tracemalloc.start()
+            started = time.perf_counter()
+            result = import_stock(read_csv(lines()), reference=f'bench-{tag}', chunk_size=options['chunk_size'])
+            elapsed = time.perf_counter() - started
+            if options['trace_memory']:
+                memory = f"  peak_memory={tracemalloc.get_traced_memory()[1] / 2 ** 20:.1f}MiB"
+                tracemalloc.stop()
+            else:
+                memory = ''
+            movements = StockMovement.objects.filter(reference_id=f'bench-{tag}').count()
+            transaction.set_rollback(True)
+
+        self.stdout.write(
+            f"  rows={result.rows}  changed={result.changed}  errors={result.error_count}  movements={movements}  "
+            f"elapsed={elapsed:.2f}s  rate={result.rows / elapsed:.0f} rows/s{memory}"
+        )
+        expected_errors = total // 100
+        if result.changed != total - expected_errors or result.error_count != expected_errors:
+            raise CommandError(f"Expected {total - expected_errors} changes and {expected_errors} errors")
+        self.stdout.write(self.style.SUCCESS(f"  ✅ {total} rows in {elapsed:.2f}s"))
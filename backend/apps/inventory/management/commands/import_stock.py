@@ -0,0 +1,58 @@
+"""
+import_stock.py — Applies a stock recount or adjustment file by SKU.
+Usage: python manage.py import_stock counts.csv [--reason ADJUSTMENT] [--reference PO-123] [--dry-run]
+CSV needs a sku column and a quantity (absolute) or delta column; files ending in .jsonl
+are read as JSON Lines of {"sku": ..., "quantity"|"delta": ...}. "-" reads CSV from stdin.
+"""
+import sys
+import time
+from contextlib import nullcontext
+from django.core.management.base import BaseCommand, CommandError
+from apps.inventory.imports import CHUNK_SIZE, REASONS, ImportFormatError, import_stock, read_csv, read_jsonl
+
+
+class Command(BaseCommand):
+    help = "Bulk-apply stock quantities or deltas from a CSV / JSON Lines file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--reason', default='ADJUSTMENT', choices=[str(reason) for reason in REASONS])
+        parser.add_argument('--reference', default='', help='Stored on every movement, e.g. a PO or count id')
+        parser.add_argument('--note', default='')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help='Validate and count without writing')
+        parser.add_argument('--show', type=int, default=20, help='Errors to list')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        try:
+            # Only close what this command opened; stdin belongs to the caller
+            handle = nullcontext(sys.stdin) if path == '-' else open(path, encoding='utf-8-sig', newline='')
+        except OSError as exc:
+            raise CommandError(str(exc))
+        reader = read_jsonl if path.lower().endswith(('.jsonl', '.ndjson')) else read_csv
+
+        started = time.perf_counter()
+        with handle as lines:
+            try:
+                result = import_stock(
+                    reader(lines), reason=options['reason'], reference=options['reference'],
+                    note=options['note'], chunk_size=options['chunk_size'], dry_run=options['dry_run'],
+                )
+            except ImportFormatError as exc:
+                raise CommandError(str(exc))
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"📦  Stock import{' (dry run)' if options['dry_run'] else ''}: {path}"
+        ))
+        self.stdout.write(
+            f"  rows={result.rows}  changed={result.changed}  unchanged={result.unchanged}  "
+            f"created={result.created}  errors={result.error_count}  elapsed={elapsed:.2f}s"
+        )
+        for error in result.errors[:options['show']]:
+            self.stdout.write(f"  line {error['line']}: {error['sku'] or '-'}  {error['error']}")
+        if result.error_count > options['show']:
+            self.stdout.write(f"  … and {result.error_count - options['show']} more")
+        if not result.error_count:
+            self.stdout.write(self.style.SUCCESS("  ✅ All rows applied" if not options['dry_run'] else "  ✅ All rows valid"))
@@ -0,0 +1,45 @@
+"""
+reconcile_stock.py — Checks every Stock.quantity against the movement ledger.
+Usage: python manage.py reconcile_stock [--checkpoint] [--full] [--adjust] [--show 50]
+--checkpoint takes a ledger checkpoint first, --full ignores checkpoints and sums the
+whole ledger, --adjust records ADJUSTMENT movements so the ledger matches Stock
+(e.g. once, for stock loaded before movements were recorded).
+"""
+import time
+from django.core.management.base import BaseCommand
+from apps.inventory import ledger
+
+
+class Command(BaseCommand):
+    help = "Reconcile stock quantities with the StockMovement ledger."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--checkpoint', action='store_true', help='Take a ledger checkpoint first')
+        parser.add_argument('--full', action='store_true', help='Sum the whole ledger instead of using checkpoints')
+        parser.add_argument('--adjust', action='store_true', help='Record adjustments for every mismatch')
+        parser.add_argument('--show', type=int, default=50, help='Mismatches to list')
+
+    def handle(self, *args, **options):
+        if options['checkpoint']:
+            self.stdout.write(f"  Checkpointed {ledger.checkpoint()} variants")
+
+        started = time.perf_counter()
+        mismatches = list(ledger.reconcile(full=options['full']))
+        elapsed = time.perf_counter() - started
+        latest = ledger.latest_run()
+        since = 'full ledger' if options['full'] or latest is None else f"movements since {latest:%Y-%m-%d %H:%M}"
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"📒  Stock reconciliation ({since}, {elapsed:.2f}s)"
+        ))
+        for variant_id, quantity, expected in mismatches[:options['show']]:
+            stock = 'no stock row' if quantity is None else f'stock={quantity}'
+            self.stdout.write(f"  variant {variant_id}: {stock}  ledger={expected}")
+        if len(mismatches) > options['show']:
+            self.stdout.write(f"  … and {len(mismatches) - options['show']} more")
+
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS("  ✅ Stock matches the ledger"))
+        elif options['adjust']:
+            self.stdout.write(self.style.SUCCESS(f"  Recorded {ledger.adjust(mismatches)} adjustments"))
+        else:
+            self.stdout.write(self.style.WARNING(f"  {len(mismatches)} variants disagree with the ledger"))
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-18 00:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_order_number_sequence'),
+        ('inventory', '0002_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockReservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('ACTIVE', 'Active'), ('RELEASED', 'Released'), ('CONVERTED', 'Converted to Sale')], default='ACTIVE', max_length=20)),
+                ('expires_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('order', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stock_reservation', to='orders.order')),
+            ],
+            options={
+                'db_table': 'inventory_reservation',
+                'indexes': [models.Index(fields=['status', 'expires_at'], name='inventory_r_status_8d1db9_idx')],
+            },
+        ),
+    ]
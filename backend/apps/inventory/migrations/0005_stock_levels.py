@@ -0,0 +1,49 @@
+# Generated by Django 4.2.30 on 2026-10-18 01:39
+
+from django.db import migrations, models
+from django.db.models import Case, F, Value, When
+
+
+def backfill_levels(apps, schema_editor):
+    # Existing shortages count as already alerted; only new crossings raise alerts
+    Stock = apps.get_model('inventory', 'Stock')
+    Stock.objects.update(level=Case(
+        When(quantity__lte=F('reserved_quantity'), then=Value('OUT')),
+        When(quantity__lte=F('reserved_quantity') + F('low_stock_threshold'), then=Value('LOW')),
+        default=Value('OK'),
+    ))
+    Stock.objects.update(alerted_level=F('level'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0004_stock_ledger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stock',
+            name='alert_pending',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='stock',
+            name='alerted_level',
+            field=models.CharField(choices=[('OK', 'In stock'), ('LOW', 'Low stock'), ('OUT', 'Out of stock')], default='OK', editable=False, max_length=3),
+        ),
+        migrations.AddField(
+            model_name='stock',
+            name='level',
+            field=models.CharField(choices=[('OK', 'In stock'), ('LOW', 'Low stock'), ('OUT', 'Out of stock')], default='OK', editable=False, max_length=3),
+        ),
+        migrations.AddIndex(
+            model_name='stock',
+            index=models.Index(fields=['level', 'id'], name='inventory_s_level_4c2ea9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stock',
+            index=models.Index(fields=['alert_pending'], name='inventory_s_alert_p_725204_idx'),
+        ),
+        migrations.RunPython(backfill_levels, migrations.RunPython.noop),
+    ]
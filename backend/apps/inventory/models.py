@@ -4,16 +4,30 @@ from django.conf import settings
 
 
 class Stock(models.Model):
+    class Level(models.TextChoices):
+        OK = 'OK', 'In stock'
+        LOW = 'LOW', 'Low stock'
+        OUT = 'OUT', 'Out of stock'
+
     variant = models.OneToOneField(
         'catalog.ProductVariant', on_delete=models.CASCADE, related_name='stock'
     )
     quantity = models.PositiveIntegerField(default=0)
     reserved_quantity = models.PositiveIntegerField(default=0)  # In-cart or unpaid orders
     low_stock_threshold = models.PositiveIntegerField(default=5)
+    # Maintained by apps.inventory.low_stock.refresh_levels after every stock write
+    level = models.CharField(max_length=3, choices=Level.choices, default=Level.OK, editable=False)
+    # Level the last alert was raised for; alert_pending marks rows whose level moved since
+    alerted_level = models.CharField(max_length=3, choices=Level.choices, default=Level.OK, editable=False)
+    alert_pending = models.BooleanField(default=False, editable=False)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = 'inventory_stock'
+        indexes = [
+            models.Index(fields=['level', 'id']),
+            models.Index(fields=['alert_pending']),
+        ]
 
     def __str__(self):
         return f'Stock: {self.variant.sku} | Available: {self.available}'
@@ -56,7 +70,54 @@ class StockMovement(models.Model):
     class Meta:
         db_table = 'inventory_movement'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['variant', 'created_at']),
+        ]
 
     def __str__(self):
         direction = '+' if self.quantity_change > 0 else ''
         return f'{self.variant.sku} {direction}{self.quantity_change} ({self.reason})'
+
+
+class StockCheckpoint(models.Model):
+    """A variant's quantity according to the ledger just before ``as_of``; see apps.inventory.ledger."""
+    variant = models.ForeignKey(
+        'catalog.ProductVariant', on_delete=models.CASCADE, related_name='stock_checkpoints'
+    )
+    as_of = models.DateTimeField()
+    quantity = models.IntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'inventory_checkpoint'
+        constraints = [
+            models.UniqueConstraint(fields=['variant', 'as_of'], name='inventory_checkpoint_variant_as_of'),
+        ]
+        indexes = [models.Index(fields=['as_of'])]
+
+    def __str__(self):
+        return f'{self.variant_id} = {self.quantity} before {self.as_of:%Y-%m-%d %H:%M}'
+
+
+class StockReservation(models.Model):
+    """Stock held for an unpaid order; see apps.inventory.reservations."""
+    class Status(models.TextChoices):
+        ACTIVE = 'ACTIVE', 'Active'
+        RELEASED = 'RELEASED', 'Released'
+        CONVERTED = 'CONVERTED', 'Converted to Sale'
+
+    order = models.OneToOneField(
+        'orders.Order', on_delete=models.CASCADE, related_name='stock_reservation'
+    )
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.ACTIVE)
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'inventory_reservation'
+        indexes = [models.Index(fields=['status', 'expires_at'])]
+
+    def __str__(self):
+        return f'Reservation for order {self.order_id} ({self.status})'
@@ -0,0 +1,187 @@
+"""Stock reservations — hold stock for unpaid orders without read-modify-write.
+
+Every change is a conditional ``UPDATE`` on ``inventory_stock`` (e.g. ``reserved_quantity
++ n WHERE quantity >= reserved_quantity + n``), so concurrent checkouts on a hot SKU
+never oversell and never hold a lock beyond their own short transaction. Stock rows
+are always touched in variant-id order, which rules out deadlocks between orders.
+
+A reservation moves ACTIVE → RELEASED (cancelled or expired) or ACTIVE → CONVERTED
+(paid) through a conditional update on its own row, so the sweeper and a payment
+callback racing on the same order can only ever apply one of them.
+"""
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from functools import partial
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from apps.catalog.detail_cache import patch_stock
+from apps.catalog.facets import mark_products_changed
+from .low_stock import refresh_levels
+from .models import Stock, StockMovement, StockReservation
+
+logger = logging.getLogger(__name__)
+
+
+class InsufficientStock(Exception):
+    def __init__(self, variant_id, requested):
+        self.variant_id = variant_id
+        self.requested = requested
+        super().__init__(f'Insufficient stock for variant {variant_id} (requested {requested})')
+
+
+def _aggregate(lines):
+    """``[(variant_id, quantity)]`` → quantities summed per variant, sorted by variant id."""
+    totals = defaultdict(int)
+    for variant_id, quantity in lines:
+        if variant_id is not None and quantity > 0:
+            totals[variant_id] += quantity
+    return sorted(totals.items(), key=lambda item: str(item[0]))
+
+
+def _order_lines(order):
+    return _aggregate(order.items.values_list('variant_id', 'quantity'))
+
+
+def _movements(lines, reason, sign, reference_id, user=None, note=''):
+    return [
+        StockMovement(
+            variant_id=variant_id, quantity_change=sign * quantity, reason=reason,
+            reference_id=reference_id, note=note, created_by=user,
+        )
+        for variant_id, quantity in lines
+    ]
+
+
+def _availability_changed(variant_ids):
+    from apps.catalog.models import ProductVariant
+    product_ids = list(
+        ProductVariant.objects.filter(pk__in=variant_ids).values_list('product_id', flat=True).distinct()
+    )
+    transaction.on_commit(partial(mark_products_changed, product_ids))
+
+
+def _stock_changed(lines):
+    # Guarded .update()s bypass the Stock signals, so refresh levels and cached product pages here
+    variant_ids = [variant_id for variant_id, _ in lines]
+    refresh_levels(variant_ids)
+    transaction.on_commit(partial(patch_stock, variant_ids))
+
+
+def reserve_order(order, lines, user=None, ttl=None):
+    """Reserve ``[(variant_id, quantity)]`` for ``order``; raises InsufficientStock and rolls back."""
+    lines = _aggregate(lines)
+    ttl = ttl or timedelta(minutes=getattr(settings, 'STOCK_RESERVATION_TTL_MINUTES', 30))
+    with transaction.atomic():
+        for variant_id, quantity in lines:
+            updated = Stock.objects.filter(
+                variant_id=variant_id, quantity__gte=F('reserved_quantity') + quantity
+            ).update(reserved_quantity=F('reserved_quantity') + quantity, updated_at=timezone.now())
+            if not updated:
+                raise InsufficientStock(variant_id, quantity)
+        StockMovement.objects.bulk_create(
+            _movements(lines, StockMovement.Reason.RESERVATION, -1, order.order_number, user)
+        )
+        reservation = StockReservation.objects.create(order=order, expires_at=timezone.now() + ttl)
+        _stock_changed(lines)
+
+        sold_out = Stock.objects.filter(
+            variant_id__in=[variant_id for variant_id, _ in lines],
+            quantity__lte=F('reserved_quantity'),
+        ).values_list('variant_id', flat=True)
+        sold_out = list(sold_out)
+        if sold_out:
+            _availability_changed(sold_out)
+    return reservation
+
+
+def _transition(order, status):
+    """Move the order's ACTIVE reservation to ``status``; False if someone else got there first."""
+    return bool(
+        StockReservation.objects.filter(order=order, status=StockReservation.Status.ACTIVE)
+        .update(status=status, updated_at=timezone.now())
+    )
+
+
+def release_order(order, user=None, note='Reservation released'):
+    """Return reserved stock to availability (cancelled or expired order). Idempotent."""
+    with transaction.atomic():
+        if not _transition(order, StockReservation.Status.RELEASED):
+            return False
+        lines = _order_lines(order)
+        for variant_id, quantity in lines:
+            updated = Stock.objects.filter(variant_id=variant_id, reserved_quantity__gte=quantity).update(
+                reserved_quantity=F('reserved_quantity') - quantity, updated_at=timezone.now()
+            )
+            if not updated:
+                logger.warning('Reserved quantity for variant %s is below %s on release of %s',
+                               variant_id, quantity, order.order_number)
+                Stock.objects.filter(variant_id=variant_id).update(reserved_quantity=0, updated_at=timezone.now())
+        StockMovement.objects.bulk_create(
+            _movements(lines, StockMovement.Reason.RELEASE, 1, order.order_number, user, note)
+        )
+        _stock_changed(lines)
+        _availability_changed([variant_id for variant_id, _ in lines])
+    return True
+
+
+def commit_order(order, user=None, note='Payment completed'):
+    """Convert the order's reservation into a sale: stock leaves both quantity and reserved.
+
+    Idempotent. Returns False when the reservation had already left ACTIVE or a line could
+    not be deducted; only deducted lines get a SALE movement, so the ledger matches Stock.
+    """
+    with transaction.atomic():
+        if not _transition(order, StockReservation.Status.CONVERTED):
+            return False
+        lines = _order_lines(order)
+        sold = []
+        for variant_id, quantity in lines:
+            updated = Stock.objects.filter(
+                variant_id=variant_id, reserved_quantity__gte=quantity, quantity__gte=quantity
+            ).update(
+                quantity=F('quantity') - quantity,
+                reserved_quantity=F('reserved_quantity') - quantity,
+                updated_at=timezone.now(),
+            )
+            if updated:
+                sold.append((variant_id, quantity))
+            else:
+                logger.warning('Stock for variant %s could not cover sale of %s for %s',
+                               variant_id, quantity, order.order_number)
+        StockMovement.objects.bulk_create(
+            _movements(sold, StockMovement.Reason.SALE, -1, order.order_number, user, note)
+        )
+        _stock_changed(lines)
+    return len(sold) == len(lines)
+
+
+def release_expired(now=None, batch_size=200):
+    """Cancel still-PENDING orders past their reservation's TTL and release their stock.
+
+    The cancellation and the release share one transaction under the order row lock that
+    payment settlement takes too, so a payment arriving afterwards finds the order
+    cancelled instead of confirming it without stock. Returns how many were released.
+    """
+    from apps.orders.models import Order, OrderStatusHistory
+    now = now or timezone.now()
+    expired = list(
+        StockReservation.objects.filter(
+            status=StockReservation.Status.ACTIVE, expires_at__lte=now, order__status=Order.Status.PENDING
+        )
+        .order_by('expires_at').values_list('order_id', flat=True)[:batch_size]
+    )
+    released = 0
+    for order_id in expired:
+        with transaction.atomic():
+            order = Order.objects.select_for_update().filter(pk=order_id, status=Order.Status.PENDING).first()
+            if order is None:
+                continue
+            order.status = Order.Status.CANCELLED
+            order.save(update_fields=['status', 'updated_at'])
+            OrderStatusHistory.objects.create(order=order, status=order.status, note='Payment not received in time')
+            if release_order(order, note='Reservation expired'):
+                released += 1
+    return released
@@ -1,4 +1,6 @@
+import io
 from rest_framework import serializers
+from .imports import REASONS, read_csv, read_jsonl
 from .models import Stock, StockMovement
 
 class StockSerializer(serializers.ModelSerializer):
@@ -6,7 +8,46 @@ class StockSerializer(serializers.ModelSerializer):
         model = Stock
         fields = '__all__'
 
+class LowStockSerializer(serializers.ModelSerializer):
+    sku = serializers.CharField(source='variant.sku')
+    product_id = serializers.UUIDField(source='variant.product_id')
+    product_name = serializers.CharField(source='variant.product.name')
+    product_slug = serializers.CharField(source='variant.product.slug')
+    available = serializers.IntegerField()
+
+    class Meta:
+        model = Stock
+        fields = [
+            'id', 'variant', 'sku', 'product_id', 'product_name', 'product_slug', 'quantity',
+            'reserved_quantity', 'available', 'low_stock_threshold', 'level', 'updated_at',
+        ]
+
 class StockMovementSerializer(serializers.ModelSerializer):
     class Meta:
         model = StockMovement
         fields = '__all__'
+
+class StockImportSerializer(serializers.Serializer):
+    """A CSV / JSON Lines ``file`` or inline ``rows`` of ``{sku, quantity | delta}``."""
+    file = serializers.FileField(required=False)
+    rows = serializers.ListField(child=serializers.DictField(), required=False)
+    reason = serializers.ChoiceField(choices=[(reason, reason.label) for reason in REASONS],
+                                     default=StockMovement.Reason.ADJUSTMENT)
+    reference = serializers.CharField(max_length=100, required=False, allow_blank=True, default='')
+    note = serializers.CharField(required=False, allow_blank=True, default='')
+    dry_run = serializers.BooleanField(default=False)
+
+    def validate(self, data):
+        if ('file' in data) == ('rows' in data):
+            raise serializers.ValidationError("Send either a file or rows")
+        return data
+
+    def records(self):
+        """``(line, record)`` pairs for ``apps.inventory.imports.import_stock``, read lazily from the file."""
+        if 'rows' in self.validated_data:
+            return enumerate(self.validated_data['rows'], start=1)
+        upload = self.validated_data['file']
+        lines = io.TextIOWrapper(upload, encoding='utf-8-sig')
+        if upload.name.lower().endswith(('.jsonl', '.ndjson')):
+            return read_jsonl(lines)
+        return read_csv(lines)
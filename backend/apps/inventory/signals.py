@@ -0,0 +1,35 @@
+"""Inventory signals — keep quantity edits on the ledger and stock levels current.
+
+Reservations are settled by the ``order.status_changed`` outbox subscriber
+(apps.orders.handlers), not here.
+"""
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+from .low_stock import level_of, refresh_levels
+from .models import Stock, StockMovement
+
+
+@receiver(pre_save, sender=Stock)
+def remember_previous_quantity(sender, instance, **kwargs):
+    instance._previous_quantity = 0
+    if not instance._state.adding:
+        previous = Stock.objects.filter(pk=instance.pk).values_list('quantity', 'level', 'alert_pending').first()
+        if previous is not None:
+            # A stale instance must not overwrite a level or pending alert written since it was loaded
+            instance._previous_quantity, instance.level, instance.alert_pending = previous
+
+
+@receiver(post_save, sender=Stock)
+def record_quantity_edit(sender, instance, created=False, raw=False, **kwargs):
+    # Reservations and sales write their own movements and never save() the row
+    change = instance.quantity - getattr(instance, '_previous_quantity', 0)
+    if raw:
+        return
+    if refresh_levels([instance.variant_id]):
+        instance.level, instance.alert_pending = level_of(instance), True
+    if not change:
+        return
+    StockMovement.objects.create(
+        variant_id=instance.variant_id, quantity_change=change, reason=StockMovement.Reason.ADJUSTMENT,
+        note='Opening stock' if created else 'Stock edited',
+    )
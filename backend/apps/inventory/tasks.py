@@ -0,0 +1,32 @@
+"""Inventory Celery tasks."""
+from celery import shared_task
+from . import ledger, low_stock
+from .reservations import release_expired
+
+
+@shared_task
+def release_expired_reservations(batch_size=200):
+    """Periodic sweeper for unpaid orders whose stock reservation has expired."""
+    total = 0
+    while True:
+        released = release_expired(batch_size=batch_size)
+        total += released
+        if released < batch_size:
+            return total
+
+
+@shared_task
+def checkpoint_stock_ledger():
+    """Hourly ledger checkpoint; keeps reconciliation and as-of queries to recent movements."""
+    return ledger.checkpoint()
+
+
+@shared_task
+def send_low_stock_alerts(batch_size=low_stock.BATCH_SIZE):
+    """Per-minute sweep of stock rows whose level moved; alerts once per threshold crossing."""
+    total = 0
+    while True:
+        settled = low_stock.send_alerts(batch_size=batch_size)
+        total += settled
+        if settled < batch_size:
+            return total
@@ -1,13 +1,103 @@
-from rest_framework import viewsets, permissions
+import uuid
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import JSONParser, MultiPartParser
+from rest_framework.response import Response
+from utils.pagination import KeysetPagination
+from . import ledger
+from .imports import ImportFormatError, import_stock
 from .models import Stock, StockMovement
-from .serializers import StockSerializer, StockMovementSerializer
+from .serializers import LowStockSerializer, StockImportSerializer, StockSerializer, StockMovementSerializer
+
+
+def _moment(request, param):
+    """``?param=`` as an aware datetime; None when absent, ValueError when unparseable."""
+    raw = request.query_params.get(param)
+    if not raw:
+        return None
+    moment = parse_datetime(raw)
+    if moment is None:
+        raise ValueError(param)
+    return timezone.make_aware(moment) if timezone.is_naive(moment) else moment
+
 
 class StockViewSet(viewsets.ModelViewSet):
     queryset = Stock.objects.all()
     serializer_class = StockSerializer
     permission_classes = [permissions.IsAdminUser]
 
+    @action(detail=False, methods=['get'])
+    def as_of(self, request):
+        """Ledger quantity of ``?variant=`` (repeatable) just before ``?at=``."""
+        try:
+            at = _moment(request, 'at')
+            variant_ids = [uuid.UUID(value) for value in request.query_params.getlist('variant')]
+        except ValueError:
+            at, variant_ids = None, None
+        if at is None or not variant_ids:
+            return Response({"error": "at and variant required"}, status=status.HTTP_400_BAD_REQUEST)
+        quantities = ledger.quantities(variant_ids, at=at)
+        return Response({
+            "at": at,
+            "stock": [{"variant": variant_id, "quantity": quantities.get(variant_id, 0)} for variant_id in variant_ids],
+        })
+
+    @action(detail=False, methods=['get'])
+    def low(self, request):
+        """Low and out-of-stock variants with their product, from the ``(level, id)`` index; ``?level=LOW|OUT``."""
+        levels = request.query_params.getlist('level') or [Stock.Level.LOW, Stock.Level.OUT]
+        if not set(levels) <= {Stock.Level.LOW, Stock.Level.OUT}:
+            return Response({"error": "level must be LOW or OUT"}, status=status.HTTP_400_BAD_REQUEST)
+        queryset = (
+            Stock.objects.filter(level__in=levels).select_related('variant__product')
+            .only('id', 'quantity', 'reserved_quantity', 'low_stock_threshold', 'level', 'updated_at',
+                  'variant__id', 'variant__sku', 'variant__product__id', 'variant__product__name',
+                  'variant__product__slug')
+            .order_by('id')
+        )
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        return paginator.get_paginated_response(LowStockSerializer(page, many=True).data)
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser, JSONParser])
+    def import_stock(self, request):
+        """Bulk recount or adjustment by SKU; see apps.inventory.imports."""
+        serializer = StockImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        try:
+            result = import_stock(
+                serializer.records(), reason=data['reason'], reference=data['reference'], note=data['note'],
+                user=request.user, dry_run=data['dry_run'],
+            )
+        except ImportFormatError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"dry_run": data['dry_run'], **result.as_dict()})
+
 class StockMovementViewSet(viewsets.ModelViewSet):
     queryset = StockMovement.objects.all()
     serializer_class = StockMovementSerializer
     permission_classes = [permissions.IsAdminUser]
+    pagination_class = KeysetPagination
+    ordering_fields = ['created_at']
+
+    def get_queryset(self):
+        """``?variant=``, ``?since=`` and ``?until=`` narrow the list along the (variant, created_at) index."""
+        queryset = self.queryset
+        if self.action != 'list':
+            return queryset
+        try:
+            since, until = _moment(self.request, 'since'), _moment(self.request, 'until')
+            variant = self.request.query_params.get('variant')
+            if variant:
+                queryset = queryset.filter(variant_id=uuid.UUID(variant))
+        except ValueError:
+            raise ValidationError({"detail": "variant must be a UUID, since/until ISO datetimes"})
+        if since is not None:
+            queryset = queryset.filter(created_at__gte=since)
+        if until is not None:
+            queryset = queryset.filter(created_at__lt=until)
+        return queryset
@@ -0,0 +1,20 @@
+from django.contrib import admin, messages
+from django.utils import timezone
+from .models import OutboundEmail
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ['id', 'template', 'to_email', 'status', 'attempts', 'available_at', 'sent_at', 'created_at']
+    list_filter = ['status', 'template']
+    search_fields = ['to_email', 'key']
+    readonly_fields = ['sent_at', 'created_at']
+    ordering = ['-id']
+    actions = ['requeue']
+
+    @admin.action(description='Requeue selected emails')
+    def requeue(self, request, queryset):
+        count = queryset.exclude(status=OutboundEmail.Status.SENT).update(
+            status=OutboundEmail.Status.QUEUED, attempts=0, available_at=timezone.now(), last_error=''
+        )
+        self.message_user(request, f'{count} emails requeued (sent emails are left alone).', messages.SUCCESS)
@@ -0,0 +1,161 @@
+"""Mail — queued email, rendered and sent in batches over one persistent SMTP connection.
+
+Callers only insert an ``OutboundEmail`` (``queue_email``) with a template name and a
+JSON context, so nothing is rendered or sent on the request thread. The worker
+(``send_batch``, run by ``apps.notifications.tasks``) claims due rows with a lease,
+renders ``notifications/<template>_subject.txt`` / ``_body.txt`` and sends them through
+a ``Mailer``: one connection per worker process, reused across batches and reopened if
+the server drops it, paced to ``EMAIL_RATE_PER_MINUTE``.
+
+Transient SMTP errors are retried with exponential backoff up to ``MAX_ATTEMPTS``;
+refused recipients, missing templates and any other error building or sending one
+message fail that message at once, leaving the rest of the batch to be recorded.
+"""
+import logging
+import smtplib
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.template import TemplateDoesNotExist
+from django.template.loader import render_to_string
+from django.utils import timezone
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 100
+MAX_ATTEMPTS = 5
+# A claimed email is retried by another worker if it is not settled within this time
+LEASE = timedelta(minutes=5)
+MAX_BACKOFF = timedelta(hours=1)
+
+
+def queue_email(template, to, context=None, key=None):
+    """Queue ``template`` rendered with ``context`` for ``to``; None if ``key`` was already queued."""
+    try:
+        with transaction.atomic():
+            return OutboundEmail.objects.create(template=template, to_email=to, context=context or {}, key=key)
+    except IntegrityError:
+        if key is None:
+            raise
+        return None
+
+
+def render(email):
+    context = {'frontend_url': settings.FRONTEND_URL, **email.context}
+    subject = render_to_string(f'notifications/{email.template}_subject.txt', context)
+    body = render_to_string(f'notifications/{email.template}_body.txt', context)
+    return EmailMessage(
+        subject=' '.join(subject.split()), body=body,
+        from_email=settings.DEFAULT_FROM_EMAIL, to=[email.to_email],
+    )
+
+
+class Mailer:
+    """An email connection kept open across sends, paced to ``rate`` messages a minute."""
+
+    def __init__(self, connection=None, rate=None):
+        self.connection = connection or get_connection()
+        rate = settings.EMAIL_RATE_PER_MINUTE if rate is None else rate
+        self.interval = 60 / rate if rate else 0
+        self._next_send = 0.0
+
+    def _pace(self):
+        now = time.monotonic()
+        if now < self._next_send:
+            time.sleep(self._next_send - now)
+        self._next_send = max(now, self._next_send) + self.interval
+
+    def send(self, message):
+        self._pace()
+        try:
+            self.connection.open()
+            return self.connection.send_messages([message])
+        except smtplib.SMTPServerDisconnected:
+            # Idle connection closed by the server; reconnect once
+            self.close()
+            self.connection.open()
+            return self.connection.send_messages([message])
+
+    def close(self):
+        try:
+            self.connection.close()
+        except (smtplib.SMTPException, OSError):
+            pass
+
+
+_mailer = None
+
+
+def get_mailer():
+    global _mailer
+    if _mailer is None:
+        _mailer = Mailer()
+    return _mailer
+
+
+def claim(batch_size=BATCH_SIZE, now=None):
+    """Lease up to ``batch_size`` due emails to this worker."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        ids = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboundEmail.Status.QUEUED, available_at__lte=now)
+            .order_by('id')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        OutboundEmail.objects.filter(pk__in=ids).update(available_at=now + LEASE, attempts=F('attempts') + 1)
+    return list(OutboundEmail.objects.filter(pk__in=ids).order_by('id'))
+
+
+def _backoff(attempts):
+    return min(timedelta(minutes=2 ** (attempts - 1)), MAX_BACKOFF)
+
+
+def send_batch(batch_size=BATCH_SIZE, mailer=None, now=None):
+    """Send one batch of due emails; returns ``(sent, claimed)``."""
+    mailer = mailer or get_mailer()
+    emails = claim(batch_size, now)
+    sent, retry, failed = [], [], []
+    for email in emails:
+        try:
+            mailer.send(render(email))
+        except (TemplateDoesNotExist, smtplib.SMTPRecipientsRefused) as exc:
+            email.last_error = str(exc)[:1000]
+            failed.append(email)
+        except (smtplib.SMTPException, OSError) as exc:
+            email.last_error = str(exc)[:1000]
+            (failed if email.attempts >= MAX_ATTEMPTS else retry).append(email)
+            # Start the next message on a fresh connection
+            mailer.close()
+        except Exception as exc:
+            # A bad header or broken template fails this email, not the messages already sent
+            logger.exception('Email %s could not be built or sent', email.pk)
+            email.last_error = f'{type(exc).__name__}: {exc}'[:1000]
+            failed.append(email)
+        else:
+            sent.append(email.pk)
+
+    finished = timezone.now()
+    if sent:
+        OutboundEmail.objects.filter(pk__in=sent).update(
+            status=OutboundEmail.Status.SENT, sent_at=finished, last_error=''
+        )
+    for email in retry:
+        email.available_at = finished + _backoff(email.attempts)
+    for email in failed:
+        email.status = OutboundEmail.Status.FAILED
+        logger.warning('Email %s to %s failed: %s', email.pk, email.to_email, email.last_error)
+    OutboundEmail.objects.bulk_update(retry + failed, ['status', 'available_at', 'last_error'])
+    return len(sent), len(emails)
+
+
+def purge(days=None, now=None):
+    """Delete emails sent more than ``days`` ago; returns how many were removed."""
+    days = settings.EMAIL_QUEUE_RETENTION_DAYS if days is None else days
+    cutoff = (now or timezone.now()) - timedelta(days=days)
+    deleted, _ = OutboundEmail.objects.filter(status=OutboundEmail.Status.SENT, sent_at__lt=cutoff).delete()
+    return deleted
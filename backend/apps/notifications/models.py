@@ -0,0 +1,32 @@
+"""Notifications app models — the outbound email queue."""
+from django.db import models
+from django.utils import timezone
+
+
+class OutboundEmail(models.Model):
+    """One queued email, rendered and sent by the mail worker (see apps.notifications.mail)."""
+
+    class Status(models.TextChoices):
+        QUEUED = 'QUEUED', 'Queued'
+        SENT = 'SENT', 'Sent'
+        FAILED = 'FAILED', 'Failed'
+
+    id = models.BigAutoField(primary_key=True)
+    template = models.CharField(max_length=100)
+    context = models.JSONField(default=dict)
+    to_email = models.EmailField()
+    # Set by callers that may run twice (outbox handlers) so the email is queued once
+    key = models.CharField(max_length=100, unique=True, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'notifications_email'
+        indexes = [models.Index(fields=['status', 'available_at', 'id'], name='notifications_email_due_idx')]
+
+    def __str__(self):
+        return f'{self.template} → {self.to_email} ({self.status})'
@@ -0,0 +1,23 @@
+"""Notifications Celery tasks — the mail worker."""
+import time
+from celery import shared_task
+from .mail import BATCH_SIZE, purge, send_batch
+
+
+@shared_task
+def send_queued_emails(batch_size=BATCH_SIZE, time_budget=50):
+    """Send due emails in batches over the worker's open connection until the queue is drained
+    or ``time_budget`` seconds have passed (the next beat tick carries on)."""
+    started, total = time.monotonic(), 0
+    while time.monotonic() - started < time_budget:
+        sent, claimed = send_batch(batch_size=batch_size)
+        total += sent
+        if claimed < batch_size:
+            break
+    return total
+
+
+@shared_task
+def purge_sent_emails(days=None):
+    """Nightly cleanup of delivered emails."""
+    return purge(days=days)
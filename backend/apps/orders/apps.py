@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class OrdersConfig(AppConfig):
     name = 'apps.orders'
     default_auto_field = 'django.db.models.BigAutoField'
+
+    def ready(self):
+        from . import handlers, signals  # noqa: F401
@@ -0,0 +1,271 @@
+"""Cart store — active carts kept as Redis hashes (variant id → quantity).
+
+Guests are keyed by their session and signed-in shoppers by user id. A cart write is
+one pipelined round-trip that also returns the whole hash, so add-to-cart never
+touches the database; names and prices are hydrated in one batch from
+``apps.catalog.variant_cache``.
+
+The database copy in ``orders_cart`` / ``orders_cart_item`` is written behind: every
+write adds the cart to a dirty set that ``persist_dirty_carts`` drains, and checkout
+persists its cart synchronously. A hash that has expired or was never loaded is
+seeded from the database on first write (the ``_seeded`` marker), so no cart is lost.
+
+When the default cache is not Redis (e.g. LocMemCache in development) the same API
+falls back to plain cache reads and writes, without the atomicity guarantees.
+"""
+from decimal import Decimal
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from apps.catalog.variant_cache import get_variant_summaries
+from utils.redis_cache import redis_client, redis_key
+from .models import Cart, CartItem
+
+CART_KEY = 'cart:{owner}'
+DIRTY_KEY = 'cart:dirty'
+SEEDED_FIELD = '_seeded'
+
+
+class RedisCartBackend:
+    def __init__(self, client):
+        self.client = client
+
+    def make_key(self, name):
+        return redis_key(name)
+
+    def write(self, key, owner, ttl, increments=None, values=None, removals=()):
+        """Apply the changes and return ``(newly_seeded, {field: quantity})`` in one round-trip."""
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hsetnx(key, SEEDED_FIELD, 1)
+        for field, quantity in (increments or {}).items():
+            pipe.hincrby(key, field, quantity)
+        if values:
+            pipe.hset(key, mapping=values)
+        if removals:
+            pipe.hdel(key, *removals)
+        pipe.expire(key, ttl)
+        pipe.sadd(self.make_key(DIRTY_KEY), owner)
+        pipe.hgetall(key)
+        results = pipe.execute()
+        return bool(results[0]), _decode(results[-1])
+
+    def read(self, key):
+        return _decode(self.client.hgetall(key))
+
+    def delete(self, key):
+        self.client.delete(key)
+
+    def pop_dirty(self, count):
+        return [owner.decode() for owner in self.client.spop(self.make_key(DIRTY_KEY), count) or []]
+
+
+class CacheCartBackend:
+    """Read-modify-write on the plain cache; concurrent writes to one cart can be lost."""
+
+    def make_key(self, name):
+        return name
+
+    def write(self, key, owner, ttl, increments=None, values=None, removals=()):
+        fields = cache.get(key) or {}
+        newly_seeded = SEEDED_FIELD not in fields
+        fields.setdefault(SEEDED_FIELD, 1)
+        for field, quantity in (increments or {}).items():
+            fields[field] = fields.get(field, 0) + quantity
+        fields.update(values or {})
+        for field in removals:
+            fields.pop(field, None)
+        cache.set(key, fields, ttl)
+        dirty = cache.get(DIRTY_KEY) or set()
+        dirty.add(owner)
+        cache.set(DIRTY_KEY, dirty, None)
+        return newly_seeded, dict(fields)
+
+    def read(self, key):
+        return cache.get(key) or {}
+
+    def delete(self, key):
+        cache.delete(key)
+
+    def pop_dirty(self, count):
+        dirty = cache.get(DIRTY_KEY) or set()
+        popped = [dirty.pop() for _ in range(min(count, len(dirty)))]
+        cache.set(DIRTY_KEY, dirty, None)
+        return popped
+
+
+def _decode(raw):
+    return {
+        (field.decode() if isinstance(field, bytes) else field): int(value)
+        for field, value in raw.items()
+    }
+
+
+def get_backend():
+    client = redis_client()
+    return RedisCartBackend(client) if client is not None else CacheCartBackend()
+
+
+class CartStore:
+    def __init__(self, owner, backend=None):
+        self.owner = owner
+        self.backend = backend or get_backend()
+        self.key = self.backend.make_key(CART_KEY.format(owner=owner))
+
+    @classmethod
+    def for_user(cls, user_id):
+        return cls(f'u:{user_id}')
+
+    @classmethod
+    def for_session(cls, session_key):
+        return cls(f's:{session_key}')
+
+    @classmethod
+    def for_request(cls, request, create=False):
+        """The shopper's cart; guests get a session (when ``create``) so their cart can be kept."""
+        if request.user.is_authenticated:
+            return cls.for_user(request.user.pk)
+        if not request.session.session_key:
+            if not create:
+                return None
+            request.session.save()
+        return cls.for_session(request.session.session_key)
+
+    # ── Writes ───────────────────────────────────────────────────────────────
+
+    def _write(self, increments=None, values=None, removals=()):
+        newly_seeded, fields = self.backend.write(
+            self.key, self.owner, settings.CART_TTL_SECONDS,
+            increments=increments, values=values, removals=removals,
+        )
+        if newly_seeded:
+            # The hash was cold: fold in the persisted cart, minus the lines just overwritten
+            touched = set(values or {}) | set(removals)
+            persisted = {
+                variant_id: quantity for variant_id, quantity in self._persisted_quantities().items()
+                if variant_id not in touched
+            }
+            if persisted:
+                _, fields = self.backend.write(self.key, self.owner, settings.CART_TTL_SECONDS, increments=persisted)
+        return _quantities(fields)
+
+    def add(self, variant_id, quantity=1):
+        return self._write(increments={str(variant_id): quantity})
+
+    def add_many(self, quantities):
+        return self._write(increments={str(variant_id): quantity for variant_id, quantity in quantities.items()})
+
+    def set_quantity(self, variant_id, quantity):
+        if quantity <= 0:
+            return self.remove(variant_id)
+        return self._write(values={str(variant_id): quantity})
+
+    def remove(self, variant_id):
+        return self._write(removals=[str(variant_id)])
+
+    def clear(self):
+        self.backend.delete(self.key)
+
+    # ── Reads ────────────────────────────────────────────────────────────────
+
+    def quantities(self):
+        fields = self.backend.read(self.key)
+        if SEEDED_FIELD not in fields:
+            return self._persisted_quantities()
+        return _quantities(fields)
+
+    def hydrate(self, quantities=None):
+        """Cart payload with names and prices from the variant cache; unknown variants are skipped."""
+        quantities = self.quantities() if quantities is None else quantities
+        summaries = get_variant_summaries(quantities)
+        items, total, count = [], Decimal('0'), 0
+        for variant_id, quantity in quantities.items():
+            summary = summaries.get(variant_id)
+            if summary is None or not summary['is_active']:
+                continue
+            line_total = Decimal(summary['unit_price']) * quantity
+            items.append({**summary, 'id': variant_id, 'quantity': quantity, 'line_total': str(line_total)})
+            total += line_total
+            count += quantity
+        items.sort(key=lambda item: (item['product_name'], item['sku']))
+        return {'items': items, 'total': str(total), 'item_count': count}
+
+    # ── Persistence ──────────────────────────────────────────────────────────
+
+    def _cart_filter(self):
+        kind, _, ident = self.owner.partition(':')
+        return {'user_id': ident} if kind == 'u' else {'user__isnull': True, 'session_key': ident}
+
+    def _persisted_quantities(self):
+        rows = CartItem.objects.filter(**{f'cart__{k}': v for k, v in self._cart_filter().items()})
+        return {str(variant_id): quantity for variant_id, quantity in rows.values_list('variant_id', 'quantity')}
+
+    def get_persisted_cart(self, create=False):
+        lookup = self._cart_filter()
+        cart = Cart.objects.filter(**lookup).order_by('created_at').first()
+        if cart is None and create:
+            cart = Cart.objects.create(**{k: v for k, v in lookup.items() if not k.endswith('__isnull')})
+        return cart
+
+    def persist(self):
+        """Write the hash through to ``orders_cart_item``; returns the Cart (None if nothing to write)."""
+        fields = self.backend.read(self.key)
+        if SEEDED_FIELD not in fields:
+            return self.get_persisted_cart()
+        quantities = _quantities(fields)
+        from apps.catalog.models import ProductVariant
+        valid = set(
+            str(pk) for pk in ProductVariant.objects.filter(pk__in=list(quantities)).values_list('pk', flat=True)
+        )
+        quantities = {variant_id: quantity for variant_id, quantity in quantities.items() if variant_id in valid}
+
+        with transaction.atomic():
+            cart = self.get_persisted_cart(create=bool(quantities))
+            if cart is None:
+                return None
+            existing = {str(item.variant_id): item for item in CartItem.objects.filter(cart=cart)}
+            stale = [item.pk for variant_id, item in existing.items() if variant_id not in quantities]
+            changed = []
+            for variant_id, quantity in quantities.items():
+                item = existing.get(variant_id)
+                if item is not None and item.quantity != quantity:
+                    item.quantity = quantity
+                    changed.append(item)
+            if stale:
+                CartItem.objects.filter(pk__in=stale).delete()
+            if changed:
+                CartItem.objects.bulk_update(changed, ['quantity'])
+            CartItem.objects.bulk_create([
+                CartItem(cart=cart, variant_id=variant_id, quantity=quantity)
+                for variant_id, quantity in quantities.items() if variant_id not in existing
+            ])
+            cart.save(update_fields=['updated_at'])
+        return cart
+
+
+def _quantities(fields):
+    return {field: quantity for field, quantity in fields.items() if field != SEEDED_FIELD and quantity > 0}
+
+
+def merge_guest_cart(session_key, user_id):
+    """Fold a guest's cart into the shopper's own cart after login or sign-up."""
+    if not session_key:
+        return
+    guest = CartStore.for_session(session_key)
+    quantities = guest.quantities()
+    if quantities:
+        CartStore.for_user(user_id).add_many(quantities)
+    guest.clear()
+    Cart.objects.filter(user__isnull=True, session_key=session_key).delete()
+
+
+def persist_dirty(batch_size=500):
+    """Drain the dirty set, writing each cart through to the database; returns carts written."""
+    backend = get_backend()
+    written = 0
+    while True:
+        owners = backend.pop_dirty(batch_size)
+        for owner in owners:
+            CartStore(owner, backend=backend).persist()
+        written += len(owners)
+        if len(owners) < batch_size:
+            return written
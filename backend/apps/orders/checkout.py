@@ -0,0 +1,90 @@
+"""Checkout pipeline — turn a cart into an order in a fixed number of queries.
+
+The cart is loaded once with every variant and product joined in, each line is priced
+exactly once, and the order, its items and the first status history row are written
+with single inserts. Query count does not grow with cart size apart from one guarded
+stock update per distinct variant (see ``apps.inventory.reservations``).
+"""
+from dataclasses import dataclass
+from decimal import Decimal
+from django.db import transaction
+from apps.inventory.reservations import reserve_order
+from apps.promotions.coupons import redeem as redeem_coupon
+from .models import CartItem, Order, OrderItem, OrderStatusHistory
+
+
+@dataclass
+class CheckoutLine:
+    variant: object
+    quantity: int
+    unit_price: Decimal
+
+    @property
+    def line_total(self):
+        return self.unit_price * self.quantity
+
+    @property
+    def snapshot(self):
+        return {
+            'name': self.variant.product.name,
+            'sku': self.variant.sku,
+        }
+
+
+def load_cart_lines(cart):
+    """All cart lines with variant, product and stock joined in one query, priced once."""
+    items = (
+        CartItem.objects.filter(cart=cart)
+        .select_related('variant__product', 'variant__stock')
+        .order_by('added_at')
+    )
+    return [
+        CheckoutLine(variant=item.variant, quantity=item.quantity, unit_price=item.variant.effective_price)
+        for item in items
+    ]
+
+
+def place_order(*, user, cart, lines, order_number, shipping_address, shipping_method,
+                shipping_cost, notes='', coupon=None, discount_total=Decimal('0')):
+    """Write the order, its items, stock reservation and initial history, then empty the cart.
+
+    Runs in one transaction; ``InsufficientStock`` or ``CouponError`` (coupon used up
+    by a parallel checkout) rolls the whole order back.
+    """
+    subtotal = sum((line.line_total for line in lines), Decimal('0'))
+    shipping_cost = Decimal(shipping_cost)
+    discount_total = Decimal(discount_total)
+
+    with transaction.atomic():
+        order = Order.objects.create(
+            order_number=order_number,
+            user=user,
+            status=Order.Status.PENDING,
+            shipping_address=shipping_address,
+            shipping_method=shipping_method,
+            shipping_cost=shipping_cost,
+            subtotal=subtotal,
+            discount_total=discount_total,
+            grand_total=subtotal + shipping_cost - discount_total,
+            coupon=coupon,
+            notes=notes,
+        )
+        if coupon is not None:
+            redeem_coupon(coupon, user, order)
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order,
+                variant=line.variant,
+                product_snapshot=line.snapshot,
+                quantity=line.quantity,
+                unit_price=line.unit_price,
+                total_price=line.line_total,
+            )
+            for line in lines
+        ])
+        reserve_order(order, [(line.variant.pk, line.quantity) for line in lines], user=user)
+        OrderStatusHistory.objects.create(
+            order=order, status=Order.Status.PENDING, note='Order placed', changed_by=user
+        )
+        CartItem.objects.filter(cart=cart).delete()
+    return order
@@ -0,0 +1,45 @@
+"""Customer emails about orders and refunds, queued for the mail worker (see apps.notifications.mail)."""
+from apps.notifications.mail import queue_email
+
+STATUS_SUBJECTS = {
+    'PENDING': "We've received your order {number}",
+    'CONFIRMED': 'Order {number} is confirmed',
+    'PROCESSING': "We're preparing order {number}",
+    'SHIPPED': 'Order {number} is on its way',
+    'DELIVERED': 'Order {number} has been delivered',
+    'CANCELLED': 'Order {number} has been cancelled',
+    'REFUNDED': 'Order {number} has been refunded',
+}
+
+
+def recipient(order):
+    return (order.user.email if order.user_id else '') or order.guest_email
+
+
+def queue_order_status_email(order, status, note='', key=None):
+    """Queue the email for ``order`` entering ``status``; None when there is no one to send it to."""
+    to = recipient(order)
+    if not to:
+        return None
+    return queue_email('order_status', to, {
+        'headline': STATUS_SUBJECTS[status].format(number=order.order_number),
+        'order_id': str(order.pk),
+        'order_number': order.order_number,
+        'status_label': order.Status(status).label,
+        'grand_total': str(order.grand_total),
+        'tracking_number': order.tracking_number if status == 'SHIPPED' else '',
+        'note': note,
+    }, key=key)
+
+
+def queue_refund_email(refund, key=None):
+    order = refund.payment.order
+    to = recipient(order)
+    if not to:
+        return None
+    return queue_email('refund_update', to, {
+        'order_id': str(order.pk),
+        'order_number': order.order_number,
+        'amount': str(refund.amount),
+        'status_label': refund.get_status_display(),
+    }, key=key)
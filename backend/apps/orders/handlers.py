@@ -0,0 +1,18 @@
+"""Outbox subscribers for order events (see apps.orders.outbox)."""
+from apps.inventory.reservations import commit_order, release_order
+from .emails import queue_order_status_email
+from .models import Order
+from .outbox import subscriber
+
+
+@subscriber('order.status_changed')
+def on_status_changed(payload):
+    order = Order.objects.select_related('user').filter(pk=payload['order_id']).first()
+    if order is None:
+        return
+    # Both are no-ops once the reservation has left ACTIVE, so redelivery is safe
+    if payload['status'] == Order.Status.CANCELLED:
+        release_order(order, note='Order cancelled')
+    elif payload['status'] == Order.Status.CONFIRMED:
+        commit_order(order, note='Order confirmed')
+    queue_order_status_email(order, payload['status'], key=f"order_status:{order.pk}:{payload['status']}")
@@ -0,0 +1,69 @@
+"""
+benchmark_checkout.py — Measures checkout queries and latency for 1, 10 and 50 line carts.
+Usage: python manage.py benchmark_checkout [--sizes 1 10 50] [--iterations 20]
+All fixtures are created inside a transaction that is rolled back at the end.
+"""
+import statistics
+import time
+import uuid
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from apps.accounts.models import CustomUser
+from apps.catalog.models import Category, Product, ProductVariant
+from apps.inventory.models import Stock
+from apps.orders.checkout import load_cart_lines, place_order
+from apps.orders.models import Cart, CartItem
+from apps.orders.sequences import next_order_number
+
+
+class Command(BaseCommand):
+    help = "Benchmark the checkout pipeline across cart sizes (fixtures are rolled back)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1, 10, 50])
+        parser.add_argument('--iterations', type=int, default=20)
+
+    def handle(self, *args, **options):
+        sizes, iterations = options['sizes'], options['iterations']
+        self.stdout.write(self.style.MIGRATE_HEADING(f"🛒  Checkout benchmark ({iterations} iterations per size)"))
+
+        with transaction.atomic():
+            tag = uuid.uuid4().hex[:8]
+            user = CustomUser.objects.create_user(
+                f'bench-{tag}@example.com', None, first_name='Bench', last_name='User'
+            )
+            category = Category.objects.create(name=f'Bench {tag}', slug=f'bench-{tag}')
+            product = Product.objects.create(
+                name=f'Bench {tag}', slug=f'bench-{tag}', category=category,
+                description='Benchmark fixture', base_price=Decimal('1000.00'),
+            )
+            variants = ProductVariant.objects.bulk_create([
+                ProductVariant(product=product, sku=f'BENCH-{tag}-{n}') for n in range(max(sizes))
+            ])
+            Stock.objects.bulk_create([Stock(variant=variant, quantity=10 ** 6) for variant in variants])
+            cart = Cart.objects.create(user=user)
+
+            for size in sizes:
+                timings, queries = [], []
+                for _ in range(iterations):
+                    CartItem.objects.bulk_create([
+                        CartItem(cart=cart, variant=variant, quantity=2) for variant in variants[:size]
+                    ])
+                    started = time.perf_counter()
+                    with CaptureQueriesContext(connection) as captured:
+                        place_order(
+                            user=user, cart=cart, lines=load_cart_lines(cart),
+                            order_number=next_order_number(),
+                            shipping_address={'district': 'Colombo'}, shipping_method='standard',
+                            shipping_cost=450,
+                        )
+                    timings.append((time.perf_counter() - started) * 1000)
+                    queries.append(len(captured))
+                self.stdout.write(
+                    f"  {size:>3} lines  queries={max(queries)}  "
+                    f"p50={statistics.median(timings):.2f}ms  max={max(timings):.2f}ms"
+                )
+
+            transaction.set_rollback(True)
@@ -0,0 +1,82 @@
+"""
+benchmark_order_numbers.py — Fires parallel order-number allocations at one day's counter.
+Usage: python manage.py benchmark_order_numbers [--allocations 500] [--workers 32]
+Runs twice on its own connections: once allocating inside a transaction (the checkout
+path, one number at a time) and once outside (per-process blocks). Both runs must hand
+out unique numbers; the transactional run must also leave no gaps, the block run none
+beyond the unused tail of its last block. Numbers are drawn for a far-future day whose
+counter row is deleted afterwards.
+"""
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, close_old_connections, transaction
+from apps.orders import sequences
+from apps.orders.models import OrderNumberSequence
+
+
+class Command(BaseCommand):
+    help = "Benchmark concurrent order-number allocation and check for duplicates and gaps."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--allocations', type=int, default=500)
+        parser.add_argument('--workers', type=int, default=32)
+
+    def handle(self, *args, **options):
+        total, workers = options['allocations'], options['workers']
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"🔢  Order number benchmark ({total} allocations, {workers} workers)"
+        ))
+        block_size = max(1, getattr(settings, 'ORDER_NUMBER_BLOCK_SIZE', 1))
+        day = date(2999, 1, 1)
+        while OrderNumberSequence.objects.filter(day__in=[day, day + timedelta(days=1)]).exists():
+            day += timedelta(days=2)
+        try:
+            self.run(day, total, workers, in_transaction=True, allowed_gap=0)
+            self.run(day + timedelta(days=1), total, workers, in_transaction=False, allowed_gap=block_size - 1)
+        finally:
+            OrderNumberSequence.objects.filter(day__in=[day, day + timedelta(days=1)]).delete()
+
+    def run(self, day, total, workers, in_transaction, allowed_gap):
+        def allocate(_):
+            started = time.perf_counter()
+            try:
+                if in_transaction:
+                    with transaction.atomic():
+                        number = sequences.next_order_number(day)
+                else:
+                    number = sequences.next_order_number(day)
+            except OperationalError:
+                number = None
+            finally:
+                close_old_connections()
+            return number, (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(allocate, range(total)))
+        elapsed = time.perf_counter() - started
+
+        numbers = [number for number, _ in results if number is not None]
+        timings = sorted(timing for _, timing in results)
+        values = sorted(int(number.rsplit('-', 1)[1]) for number in numbers)
+        last_value = OrderNumberSequence.objects.filter(day=day).values_list('last_value', flat=True).first() or 0
+        duplicates = len(values) - len(set(values))
+        gaps = last_value - len(set(values))
+        label = 'in transaction' if in_transaction else 'from blocks'
+        self.stdout.write(
+            f"  {label:<15} allocated={len(numbers)}  errors={total - len(numbers)}  duplicates={duplicates}  "
+            f"gaps={gaps}  throughput={total / elapsed:.0f}/s  p50={statistics.median(timings):.2f}ms  "
+            f"max={timings[-1]:.2f}ms"
+        )
+        if duplicates or gaps > allowed_gap or (values and values[-1] > last_value):
+            raise CommandError(
+                f"Order numbers {label}: {duplicates} duplicates, {gaps} gaps (allowed {allowed_gap}), "
+                f"counter at {last_value}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"  ✅ {len(numbers)} unique numbers {label}, counter at {last_value}"
+        ))
@@ -0,0 +1,55 @@
+"""
+benchmark_transitions.py — Times a bulk PROCESSING → SHIPPED move with tracking numbers.
+Usage: python manage.py benchmark_transitions [--orders 5000]
+All fixtures are created inside a transaction that is rolled back at the end.
+"""
+import time
+import uuid
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from apps.orders.models import Order, OrderStatusHistory, OutboxEvent
+from apps.orders.transitions import bulk_transition
+
+
+class Command(BaseCommand):
+    help = "Benchmark bulk order status transitions (fixtures are rolled back)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        total = options['orders']
+        self.stdout.write(self.style.MIGRATE_HEADING(f"🚚  Bulk transition benchmark ({total} orders)"))
+
+        with transaction.atomic():
+            tag = uuid.uuid4().hex[:6].upper()
+            orders = Order.objects.bulk_create([
+                Order(
+                    order_number=f'BT{tag}{n:06d}', status=Order.Status.PROCESSING,
+                    shipping_address={'district': 'Colombo'}, subtotal=1000, grand_total=1000,
+                )
+                for n in range(total)
+            ], batch_size=1000)
+            tracking_numbers = {order.order_number: f'TRK{tag}{n:06d}' for n, order in enumerate(orders)}
+            events_before = OutboxEvent.objects.count()
+
+            started = time.perf_counter()
+            with CaptureQueriesContext(connection) as captured:
+                result = bulk_transition(Order.Status.SHIPPED, tracking_numbers=tracking_numbers, note='Benchmark')
+            elapsed = time.perf_counter() - started
+
+            shipped = Order.objects.filter(
+                order_number__startswith=f'BT{tag}', status=Order.Status.SHIPPED, tracking_number__startswith='TRK'
+            ).count()
+            history = OrderStatusHistory.objects.filter(order__order_number__startswith=f'BT{tag}').count()
+            events = OutboxEvent.objects.count() - events_before
+            self.stdout.write(
+                f"  transitioned={len(result.transitioned)}  rejected={len(result.rejected)}  shipped={shipped}  "
+                f"history={history}  outbox={events}  queries={len(captured)}  elapsed={elapsed:.2f}s"
+            )
+            transaction.set_rollback(True)
+
+        if not shipped == history == events == total:
+            raise CommandError(f"Expected {total} orders moved with history and events")
+        self.stdout.write(self.style.SUCCESS(f"  ✅ {total} orders shipped in {elapsed:.2f}s"))
@@ -0,0 +1,45 @@
+"""
+outbox_status.py — Shows the transactional outbox backlog and per-topic worker metrics.
+Usage: python manage.py outbox_status [--dispatch] [--requeue-failed]
+--dispatch publishes every due event first (useful when beat is not running).
+--requeue-failed puts dead-lettered events (handler failed after every retry) back in the queue.
+"""
+from django.core.management.base import BaseCommand
+from django.db.models import Min
+from django.utils import timezone
+from apps.orders import outbox
+from apps.orders.models import OutboxEvent
+
+
+class Command(BaseCommand):
+    help = "Report outbox backlog and handler metrics."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dispatch', action='store_true', help='Publish due events before reporting')
+        parser.add_argument('--requeue-failed', action='store_true', help='Queue dead-lettered events again')
+
+    def handle(self, *args, **options):
+        if options['requeue_failed']:
+            self.stdout.write(f"♻️  Requeued {outbox.requeue_failed()} failed events")
+        if options['dispatch']:
+            total = 0
+            while True:
+                published = outbox.dispatch()
+                total += published
+                if published < outbox.BATCH_SIZE:
+                    break
+            self.stdout.write(f"📤  Published {total} events")
+
+        oldest = OutboxEvent.objects.filter(dispatched_at__isnull=True).aggregate(oldest=Min('created_at'))['oldest']
+        lag = f"{(timezone.now() - oldest).total_seconds():.0f}s" if oldest else '—'
+        self.stdout.write(self.style.MIGRATE_HEADING(f"📬  Outbox (oldest pending: {lag})"))
+        for topic, row in sorted(outbox.metrics().items()):
+            avg = f"{row['avg_ms']}ms" if row['avg_ms'] is not None else '—'
+            self.stdout.write(
+                f"  {topic:<32} pending={row['pending']:<6} ok={row['succeeded']:<8} "
+                f"failed={row['failed']:<6} dead={row['dead']:<6} avg={avg}"
+            )
+            if row['dead']:
+                self.stdout.write(self.style.ERROR(
+                    f"    {row['dead']} {topic} events failed after every retry; see last_error, then --requeue-failed"
+                ))
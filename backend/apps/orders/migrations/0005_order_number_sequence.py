@@ -0,0 +1,43 @@
+# Generated by Django 4.2.30 on 2026-10-18 00:55
+
+import datetime
+from django.db import migrations, models
+
+
+def seed_sequences(apps, schema_editor):
+    """Start each day's counter at the highest number already issued that day."""
+    Order = apps.get_model('orders', 'Order')
+    OrderNumberSequence = apps.get_model('orders', 'OrderNumberSequence')
+    highest = {}
+    for number in Order.objects.values_list('order_number', flat=True).iterator():
+        try:
+            _, date_str, value = number.split('-')
+            day = datetime.datetime.strptime(date_str, '%Y%m%d').date()
+            value = int(value)
+        except ValueError:
+            continue
+        highest[day] = max(highest.get(day, 0), value)
+    OrderNumberSequence.objects.bulk_create(
+        [OrderNumberSequence(day=day, last_value=value) for day, value in highest.items()]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderNumberSequence',
+            fields=[
+                ('day', models.DateField(primary_key=True, serialize=False)),
+                ('last_value', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'orders_number_sequence',
+            },
+        ),
+        migrations.RunPython(seed_sequences, migrations.RunPython.noop),
+    ]
@@ -2,6 +2,7 @@
 import uuid
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 
 class Cart(models.Model):
@@ -93,7 +94,9 @@ class Order(models.Model):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['user', 'status', 'created_at']),
+            models.Index(fields=['user', 'created_at', 'id']),
             models.Index(fields=['order_number']),
+            models.Index(fields=['created_at', 'id']),
         ]
 
     def __str__(self):
@@ -101,14 +104,23 @@ class Order(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.order_number:
-            import datetime
-            prefix = 'ISL'
-            date_str = datetime.date.today().strftime('%Y%m%d')
-            last = Order.objects.filter(order_number__startswith=f'{prefix}-{date_str}').count()
-            self.order_number = f'{prefix}-{date_str}-{last + 1:04d}'
+            from .sequences import next_order_number
+            self.order_number = next_order_number()
         super().save(*args, **kwargs)
 
 
+class OrderNumberSequence(models.Model):
+    """Per-day counter behind ISL-YYYYMMDD-NNNN order numbers (see apps.orders.sequences)."""
+    day = models.DateField(primary_key=True)
+    last_value = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'orders_number_sequence'
+
+    def __str__(self):
+        return f'{self.day:%Y%m%d}: {self.last_value}'
+
+
 class OrderItem(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items')
@@ -143,3 +155,30 @@ class OrderStatusHistory(models.Model):
 
     def __str__(self):
         return f'{self.order.order_number} → {self.status}'
+
+
+class OutboxEvent(models.Model):
+    """A side effect written in the same transaction as the change that caused it.
+
+    Published to Celery by the dispatcher in ``apps.orders.outbox``.
+    """
+    id = models.BigAutoField(primary_key=True)
+    topic = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    dispatched_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    # Set when the handler still failed after its last retry; see outbox.requeue_failed
+    failed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'orders_outbox'
+        indexes = [
+            models.Index(fields=['dispatched_at', 'available_at', 'id'], name='orders_outbox_pending_idx'),
+            models.Index(fields=['failed_at'], name='orders_outbox_failed_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.topic} #{self.pk}'
@@ -0,0 +1,175 @@
+"""Transactional outbox — side effects of order, payment and refund changes.
+
+Request paths never talk to SMTP or the broker. They call ``emit`` inside the
+transaction that changes the order, so the event exists exactly when the change does.
+``dispatch`` (run every few seconds by Celery beat) claims pending rows in batches,
+publishes one ``handle_outbox_events`` task per topic per batch and marks them sent;
+a publish failure leaves the rows pending with an exponential backoff.
+
+Workers run the handler registered for the topic with ``@subscriber`` and keep per-topic
+counters (``metrics``) in the cache. Handlers must be idempotent: an event can be
+delivered more than once if a worker dies mid-batch. Events whose handler still fails
+after the task's last retry are marked ``failed_at`` (``mark_failed``); they are kept by
+``purge``, counted by ``metrics`` and put back in the queue by ``requeue_failed``.
+"""
+import logging
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+from .models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 200
+MAX_BACKOFF = timedelta(minutes=10)
+METRIC_KEY = 'orders:outbox:metrics:{topic}:{field}'
+METRIC_FIELDS = ('succeeded', 'failed', 'total_ms')
+METRIC_TIMEOUT = 60 * 60 * 24 * 7
+
+_subscribers = {}
+
+
+def subscriber(topic):
+    """Register the decorated ``handler(payload)`` for ``topic``."""
+    def register(handler):
+        _subscribers[topic] = handler
+        return handler
+    return register
+
+
+def topics():
+    return sorted(_subscribers)
+
+
+def emit(topic, **payload):
+    """Record an event in the current transaction; delivered once it commits."""
+    if topic not in _subscribers:
+        raise ValueError(f'No subscriber for outbox topic {topic!r}')
+    return OutboxEvent.objects.create(topic=topic, payload=payload)
+
+
+def emit_many(topic, payloads):
+    """``emit`` for many payloads with a single insert."""
+    if topic not in _subscribers:
+        raise ValueError(f'No subscriber for outbox topic {topic!r}')
+    OutboxEvent.objects.bulk_create([OutboxEvent(topic=topic, payload=payload) for payload in payloads],
+                                    batch_size=1000)
+
+
+def _backoff(attempts):
+    return min(timedelta(seconds=2 ** attempts), MAX_BACKOFF)
+
+
+def dispatch(batch_size=BATCH_SIZE, now=None):
+    """Publish one batch of due events to the workers; returns how many were published."""
+    from .tasks import handle_outbox_events
+    now = now or timezone.now()
+    with transaction.atomic():
+        events = list(
+            OutboxEvent.objects.select_for_update(skip_locked=True)
+            .filter(dispatched_at__isnull=True, available_at__lte=now)
+            .order_by('id')[:batch_size]
+        )
+        by_topic = {}
+        for event in events:
+            by_topic.setdefault(event.topic, []).append(event)
+
+        published = 0
+        for topic, batch in by_topic.items():
+            try:
+                handle_outbox_events.delay(topic, [[event.pk, event.payload] for event in batch])
+            except Exception as exc:
+                logger.warning('Could not publish %s outbox events for %s: %s', len(batch), topic, exc)
+                for event in batch:
+                    event.attempts += 1
+                    event.available_at = now + _backoff(event.attempts)
+                    event.last_error = str(exc)[:1000]
+                OutboxEvent.objects.bulk_update(batch, ['attempts', 'available_at', 'last_error'])
+                continue
+            OutboxEvent.objects.filter(pk__in=[event.pk for event in batch]).update(dispatched_at=now)
+            published += len(batch)
+    return published
+
+
+def handle(topic, events):
+    """Run the subscriber for each ``[event_id, payload]``; returns the events that failed."""
+    handler = _subscribers.get(topic)
+    if handler is None:
+        logger.error('No subscriber for outbox topic %s; dropping %s events', topic, len(events))
+        return []
+    failed = []
+    for event_id, payload in events:
+        started = time.perf_counter()
+        try:
+            handler(payload)
+        except Exception as exc:
+            logger.exception('Outbox event %s (%s) failed', event_id, topic)
+            failed.append([event_id, payload])
+            OutboxEvent.objects.filter(pk=event_id).update(attempts=F('attempts') + 1, last_error=str(exc)[:1000])
+            _count(topic, 'failed')
+        else:
+            _count(topic, 'succeeded')
+        _count(topic, 'total_ms', int((time.perf_counter() - started) * 1000))
+    return failed
+
+
+def mark_failed(events, now=None):
+    """Dead-letter ``[event_id, payload]`` pairs whose handler has run out of retries."""
+    event_ids = [event_id for event_id, _ in events]
+    logger.error('Giving up on outbox events %s', event_ids)
+    return OutboxEvent.objects.filter(pk__in=event_ids).update(failed_at=now or timezone.now())
+
+
+def requeue_failed(topic=None, now=None):
+    """Put dead-lettered events back in the queue; returns how many."""
+    events = OutboxEvent.objects.filter(failed_at__isnull=False)
+    if topic is not None:
+        events = events.filter(topic=topic)
+    return events.update(failed_at=None, dispatched_at=None, available_at=now or timezone.now())
+
+
+def _count(topic, field, amount=1):
+    key = METRIC_KEY.format(topic=topic, field=field)
+    if not cache.add(key, amount, METRIC_TIMEOUT):
+        try:
+            cache.incr(key, amount)
+        except ValueError:
+            cache.set(key, amount, METRIC_TIMEOUT)
+
+
+def metrics():
+    """``{topic: {'succeeded', 'failed', 'total_ms', 'avg_ms', 'pending', 'dead'}}`` for every subscribed topic."""
+    pending = dict(
+        OutboxEvent.objects.filter(dispatched_at__isnull=True).order_by()
+        .values('topic').annotate(count=Count('id')).values_list('topic', 'count')
+    )
+    dead = dict(
+        OutboxEvent.objects.filter(failed_at__isnull=False).order_by()
+        .values('topic').annotate(count=Count('id')).values_list('topic', 'count')
+    )
+    keys = {
+        (topic, field): METRIC_KEY.format(topic=topic, field=field)
+        for topic in set(topics()) | set(pending) | set(dead) for field in METRIC_FIELDS
+    }
+    values = cache.get_many(keys.values())
+    result = {}
+    for (topic, field), key in keys.items():
+        result.setdefault(topic, {})[field] = values.get(key, 0)
+    for topic, row in result.items():
+        runs = row['succeeded'] + row['failed']
+        row['avg_ms'] = round(row['total_ms'] / runs, 1) if runs else None
+        row['pending'] = pending.get(topic, 0)
+        row['dead'] = dead.get(topic, 0)
+    return result
+
+
+def purge(days=None, now=None):
+    """Delete events dispatched more than ``days`` ago, except dead letters; returns how many were removed."""
+    days = settings.OUTBOX_RETENTION_DAYS if days is None else days
+    cutoff = (now or timezone.now()) - timedelta(days=days)
+    deleted, _ = OutboxEvent.objects.filter(dispatched_at__lt=cutoff, failed_at__isnull=True).delete()
+    return deleted
@@ -0,0 +1,57 @@
+"""Order number allocation — ISL-YYYYMMDD-NNNN from a per-day counter row.
+
+Numbers come from ``OrderNumberSequence`` via an atomic ``UPDATE ... SET last_value =
+last_value + n``, so allocation is O(1) and two checkouts can never receive the same
+number. Outside a transaction each worker reserves a block of
+``ORDER_NUMBER_BLOCK_SIZE`` numbers at once and hands them out from memory; inside a
+transaction a single number is taken so it rolls back together with the order.
+"""
+import threading
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import OrderNumberSequence
+
+PREFIX = 'ISL'
+
+_blocks = {}  # day -> [next value, last value] reserved by this process
+_lock = threading.Lock()
+
+
+def format_order_number(day, value):
+    return f'{PREFIX}-{day:%Y%m%d}-{value:04d}'
+
+
+def allocate(day, count=1):
+    """Atomically reserve ``count`` numbers for ``day``; returns the last value reserved."""
+    with transaction.atomic():
+        updated = OrderNumberSequence.objects.filter(day=day).update(last_value=F('last_value') + count)
+        if not updated:
+            try:
+                with transaction.atomic():
+                    OrderNumberSequence.objects.create(day=day, last_value=count)
+                return count
+            except IntegrityError:
+                # Another worker created today's row first
+                OrderNumberSequence.objects.filter(day=day).update(last_value=F('last_value') + count)
+        return OrderNumberSequence.objects.filter(day=day).values_list('last_value', flat=True).get()
+
+
+def next_order_number(day=None):
+    day = day or timezone.localdate()
+    if connection.in_atomic_block:
+        # A cached block could outlive a rollback of the caller's transaction
+        return format_order_number(day, allocate(day))
+
+    block_size = max(1, getattr(settings, 'ORDER_NUMBER_BLOCK_SIZE', 1))
+    with _lock:
+        block = _blocks.get(day)
+        if block is None or block[0] > block[1]:
+            last = allocate(day, block_size)
+            block = [last - block_size + 1, last]
+            _blocks.clear()  # earlier days can never be handed out again
+            _blocks[day] = block
+        value = block[0]
+        block[0] += 1
+    return format_order_number(day, value)
@@ -1,21 +1,71 @@
-import traceback
-from django.db import transaction
+import csv
+import io
+from django.conf import settings
+from django.core.files.storage import default_storage
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
-from .models import Order, OrderItem, Cart, CartItem
+from apps.inventory.reservations import InsufficientStock
+from apps.promotions.coupons import CouponError, check_coupon, compute_discount, get_coupon
+from apps.shipping.rates import quote_for
+from apps.payments.models import Payment
+from .models import Order, OrderItem, OrderStatusHistory, Cart, CartItem
+from .cart_store import CartStore
+from .checkout import load_cart_lines, place_order
+from .sequences import next_order_number
+
+# Largest batch accepted by the bulk transition endpoints
+MAX_BULK_ORDERS = 10000
 
 class OrderItemSerializer(serializers.ModelSerializer):
     class Meta:
         model = OrderItem
         fields = '__all__'
 
+class OrderStatusHistorySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = OrderStatusHistory
+        fields = ['status', 'note', 'created_at']
+
+class OrderPaymentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Payment
+        fields = ['id', 'method', 'status', 'amount', 'currency', 'created_at']
+
 class OrderSerializer(serializers.ModelSerializer):
+    """Full order; views prefetch items, status_history and payments (see apps.orders.views)."""
     items = OrderItemSerializer(many=True, read_only=True)
+    status_history = OrderStatusHistorySerializer(many=True, read_only=True)
+    payments = OrderPaymentSerializer(many=True, read_only=True)
     
     class Meta:
         model = Order
         fields = '__all__'
 
+class OrderListSerializer(serializers.ModelSerializer):
+    """Slim row for order lists; ``item_count`` and ``thumbnail`` are annotations (see apps.orders.views)."""
+    item_count = serializers.IntegerField(read_only=True)
+    thumbnail = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Order
+        fields = ['id', 'order_number', 'status', 'grand_total', 'item_count', 'thumbnail', 'created_at']
+
+    def get_thumbnail(self, obj):
+        # Absolute like ProductListSerializer.primary_image; the annotation is the stored file name
+        if not obj.thumbnail:
+            return None
+        url = default_storage.url(obj.thumbnail)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+class AdminOrderListSerializer(OrderListSerializer):
+    customer_email = serializers.CharField(read_only=True)
+    customer_name = serializers.CharField(read_only=True)
+    customer_phone = serializers.CharField(read_only=True)
+
+    class Meta(OrderListSerializer.Meta):
+        fields = OrderListSerializer.Meta.fields + ['customer_email', 'customer_name', 'customer_phone']
+
 class CartItemSerializer(serializers.ModelSerializer):
     product_name = serializers.ReadOnlyField(source='variant.product.name')
     line_total = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
@@ -33,62 +83,122 @@ class CartSerializer(serializers.ModelSerializer):
 
 class CheckoutSerializer(serializers.Serializer):
     shipping_address = serializers.JSONField(required=True)
-    shipping_method_id = serializers.CharField(required=False, default='standard')
+    # 'standard' (or blank) picks the cheapest method delivering to the address
+    shipping_method_id = serializers.CharField(required=False, allow_blank=True, default='standard')
     notes = serializers.CharField(required=False, allow_blank=True)
+    coupon_code = serializers.CharField(required=False, allow_blank=True)
+
+    def validate_shipping_address(self, value):
+        if not isinstance(value, dict) or not value.get('district'):
+            raise ValidationError("District is required")
+        return value
 
     def validate(self, data):
-        user = self.context['request'].user
-        cart = Cart.objects.filter(user=user).first()
-        
-        if not cart or cart.items.count() == 0:
+        store = CartStore.for_request(self.context['request'])
+        # Write the Redis cart through first so checkout prices exactly what the shopper sees
+        cart = store.persist()
+        lines = load_cart_lines(cart) if cart else []
+
+        if not lines:
             raise ValidationError({"detail": "Cart is empty"})
-        
+
+        district = data['shipping_address']['district']
+        weight = sum(((line.variant.weight or 0) * line.quantity for line in lines), 0)
+        method_id = data['shipping_method_id'] if data['shipping_method_id'] not in ('', 'standard') else None
+        data['shipping_quote'] = quote_for(district, weight, method_id)
+        if data['shipping_quote'] is None:
+            raise ValidationError({"shipping_method_id": f"No shipping method delivers to {district}"})
+
+        data['coupon'] = None
+        if data.get('coupon_code'):
+            coupon = get_coupon(data['coupon_code'])
+            if coupon is None:
+                raise ValidationError({"coupon_code": "Invalid code"})
+            subtotal = sum((line.line_total for line in lines), 0)
+            try:
+                check_coupon(coupon, subtotal, user=self.context['request'].user)
+            except CouponError as exc:
+                raise ValidationError({"coupon_code": str(exc)})
+            data['coupon'] = coupon
+
         data['cart'] = cart
+        data['store'] = store
+        data['lines'] = lines
         return data
 
-    @transaction.atomic
     def save(self, **kwargs):
-        user = self.context['request'].user
-        cart = self.validated_data['cart']
-        shipping_address = self.validated_data['shipping_address']
-        shipping_method = self.validated_data['shipping_method_id']
-        notes = self.validated_data.get('notes', '')
-
-        # In a real app, calculate shipping based on method
-        shipping_cost = 450 
-
-        # Create Order
-        order = Order.objects.create(
-            user=user,
-            status=Order.Status.PENDING,
-            shipping_address=shipping_address,
-            shipping_method=shipping_method,
-            shipping_cost=shipping_cost,
-            subtotal=cart.total,
-            grand_total=cart.total + shipping_cost,
-            notes=notes
-        )
-
-        order_items = []
-        for item in cart.items.all():
-            order_items.append(
-                OrderItem(
-                    order=order,
-                    variant=item.variant,
-                    product_snapshot={
-                        "name": item.variant.product.name,
-                        "sku": item.variant.sku,
-                    },
-                    quantity=item.quantity,
-                    unit_price=item.variant.effective_price,
-                    total_price=item.line_total
-                )
-            )
-            
-        # Bulk create order items
-        OrderItem.objects.bulk_create(order_items)
+        # Taken before the transaction so the counter row is never locked for the whole checkout
+        order_number = next_order_number()
 
-        # Clear cart
-        cart.items.all().delete()
+        shipping_quote = self.validated_data['shipping_quote']
+        shipping_cost = shipping_quote.rate
 
+        coupon = self.validated_data['coupon']
+        discount_total = 0
+        if coupon is not None:
+            subtotal = sum((line.line_total for line in self.validated_data['lines']), 0)
+            discount_total = compute_discount(coupon, subtotal, shipping_cost)
+
+        try:
+            order = place_order(
+                user=self.context['request'].user,
+                cart=self.validated_data['cart'],
+                lines=self.validated_data['lines'],
+                order_number=order_number,
+                shipping_address=self.validated_data['shipping_address'],
+                shipping_method=f'{shipping_quote.name} ({shipping_quote.carrier})',
+                shipping_cost=shipping_cost,
+                notes=self.validated_data.get('notes', ''),
+                coupon=coupon,
+                discount_total=discount_total,
+            )
+        except CouponError as exc:
+            raise ValidationError({"coupon_code": str(exc)})
+        except InsufficientStock as exc:
+            sku = next(
+                (line.variant.sku for line in self.validated_data['lines'] if line.variant.pk == exc.variant_id),
+                exc.variant_id,
+            )
+            raise ValidationError({"detail": f"Not enough stock for {sku}"})
+        self.validated_data['store'].clear()
         return order
+
+class BulkTransitionSerializer(serializers.Serializer):
+    """Orders to move to ``status``, by order number; ``tracking_numbers`` adds orders too."""
+    status = serializers.ChoiceField(choices=Order.Status.choices)
+    order_numbers = serializers.ListField(
+        child=serializers.CharField(max_length=20), required=False, default=list, max_length=MAX_BULK_ORDERS
+    )
+    tracking_numbers = serializers.DictField(child=serializers.CharField(max_length=200), required=False, default=dict)
+    note = serializers.CharField(required=False, allow_blank=True, default='')
+
+    def validate(self, data):
+        if not data['order_numbers'] and not data['tracking_numbers']:
+            raise ValidationError({"order_numbers": "No orders given"})
+        if len(data['tracking_numbers']) > MAX_BULK_ORDERS:
+            raise ValidationError({"tracking_numbers": f"At most {MAX_BULK_ORDERS} orders at a time"})
+        return data
+
+class TrackingUploadSerializer(serializers.Serializer):
+    """CSV with ``order_number`` and ``tracking_number`` columns; the orders are marked SHIPPED."""
+    file = serializers.FileField()
+    note = serializers.CharField(required=False, allow_blank=True, default='')
+
+    def validate_file(self, value):
+        try:
+            rows = list(csv.DictReader(io.TextIOWrapper(value, encoding='utf-8-sig')))
+        except (UnicodeDecodeError, csv.Error):
+            raise ValidationError("Not a UTF-8 CSV file")
+        if rows and not {'order_number', 'tracking_number'} <= set(rows[0]):
+            raise ValidationError("Expected order_number and tracking_number columns")
+        tracking_numbers = {
+            row['order_number'].strip(): (row['tracking_number'] or '').strip()
+            for row in rows if (row['order_number'] or '').strip()
+        }
+        if not tracking_numbers:
+            raise ValidationError("No rows")
+        if len(tracking_numbers) > MAX_BULK_ORDERS:
+            raise ValidationError(f"At most {MAX_BULK_ORDERS} orders at a time")
+        if any(len(number) > 200 for number in tracking_numbers.values()):
+            raise ValidationError("Tracking numbers are at most 200 characters")
+        return tracking_numbers
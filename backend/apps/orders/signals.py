@@ -0,0 +1,11 @@
+"""Order signals — record outbox events for status changes."""
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from .models import OrderStatusHistory
+from .outbox import emit
+
+
+@receiver(post_save, sender=OrderStatusHistory)
+def emit_status_changed(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw:
+        emit('order.status_changed', order_id=str(instance.order_id), status=instance.status)
@@ -0,0 +1,41 @@
+"""Orders Celery tasks."""
+from celery import shared_task
+from . import outbox
+from .cart_store import persist_dirty
+
+
+@shared_task
+def persist_dirty_carts(batch_size=500):
+    """Write carts changed in Redis through to orders_cart / orders_cart_item."""
+    return persist_dirty(batch_size=batch_size)
+
+
+@shared_task
+def dispatch_outbox(batch_size=200, max_batches=50):
+    """Publish pending outbox events to the workers, a batch at a time."""
+    total = 0
+    for _ in range(max_batches):
+        published = outbox.dispatch(batch_size=batch_size)
+        total += published
+        if published < batch_size:
+            break
+    return total
+
+
+@shared_task(bind=True, max_retries=5)
+def handle_outbox_events(self, topic, events):
+    """Run the subscriber for a batch of ``[event_id, payload]``; failed events are retried with backoff
+    and dead-lettered once the retries run out."""
+    failed = outbox.handle(topic, events)
+    if failed and self.request.retries >= self.max_retries:
+        outbox.mark_failed(failed)
+        return len(events) - len(failed)
+    if failed:
+        raise self.retry(args=[topic, failed], countdown=min(2 ** self.request.retries * 30, 600))
+    return len(events)
+
+
+@shared_task
+def purge_outbox(days=None):
+    """Nightly cleanup of dispatched outbox rows."""
+    return outbox.purge(days=days)
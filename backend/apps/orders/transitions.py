@@ -0,0 +1,102 @@
+"""Order status transitions — which moves are allowed and how they are applied in bulk.
+
+``TRANSITIONS`` lists where each status may go next; admin edits are checked against it
+(``check_transition``). ``bulk_transition`` moves many orders at once: per chunk it locks
+the rows, writes the new status (and tracking numbers, through a ``CASE``) with a single
+``UPDATE``, inserts the history rows and their outbox events with ``bulk_create`` and
+applies the dashboard deltas per bucket (``apply_status_changes``).
+
+Everything else follows asynchronously from the ``order.status_changed`` events: the
+stock reservation is released or committed and the customer is emailed (see
+``apps.orders.handlers``).
+"""
+from dataclasses import dataclass, field
+from django.db import transaction
+from django.db.models import Case, CharField, F, Value, When
+from django.utils import timezone
+from apps.analytics.rollups import apply_status_changes
+from .models import Order, OrderStatusHistory
+from .outbox import emit_many
+
+Status = Order.Status
+
+TRANSITIONS = {
+    Status.PENDING: (Status.CONFIRMED, Status.CANCELLED),
+    Status.CONFIRMED: (Status.PROCESSING, Status.CANCELLED, Status.REFUNDED),
+    Status.PROCESSING: (Status.SHIPPED, Status.CANCELLED, Status.REFUNDED),
+    Status.SHIPPED: (Status.DELIVERED, Status.REFUNDED),
+    Status.DELIVERED: (Status.REFUNDED,),
+    Status.CANCELLED: (),
+    Status.REFUNDED: (),
+}
+CHUNK_SIZE = 1000
+
+
+class InvalidTransition(Exception):
+    pass
+
+
+def can_transition(current, target):
+    return target in TRANSITIONS.get(current, ())
+
+
+def check_transition(current, target):
+    if not can_transition(current, target):
+        raise InvalidTransition(f'Cannot move an order from {current} to {target}')
+
+
+@dataclass
+class BulkResult:
+    transitioned: list = field(default_factory=list)
+    rejected: dict = field(default_factory=dict)
+
+
+def bulk_transition(status, order_numbers=(), tracking_numbers=None, user=None, note='', chunk_size=CHUNK_SIZE):
+    """Move the given orders (and every order in ``tracking_numbers``) to ``status``.
+
+    ``tracking_numbers`` maps order numbers to the tracking number to set with the move.
+    Orders that do not exist or cannot make the move are reported in ``rejected`` and
+    left untouched; the rest are moved in one transaction.
+    """
+    tracking_numbers = tracking_numbers or {}
+    numbers = list(dict.fromkeys([*order_numbers, *tracking_numbers]))
+    result = BulkResult()
+    with transaction.atomic():
+        for start in range(0, len(numbers), chunk_size):
+            _transition_chunk(numbers[start:start + chunk_size], status, tracking_numbers, user, note, result)
+    return result
+
+
+def _transition_chunk(numbers, status, tracking_numbers, user, note, result):
+    rows = list(
+        Order.objects.select_for_update().filter(order_number__in=numbers).order_by('pk')
+        .values_list('pk', 'order_number', 'status', 'grand_total', 'created_at')
+    )
+    found = {row[1] for row in rows}
+    for number in numbers:
+        if number not in found:
+            result.rejected[number] = 'Order not found'
+    movable = []
+    for row in rows:
+        if can_transition(row[2], status):
+            movable.append(row)
+        else:
+            result.rejected[row[1]] = f'Cannot move an order from {row[2]} to {status}'
+    if not movable:
+        return
+
+    changes = {'status': status, 'updated_at': timezone.now()}
+    tracked = [When(pk=pk, then=Value(tracking_numbers[number]))
+               for pk, number, *_ in movable if number in tracking_numbers]
+    if tracked:
+        changes['tracking_number'] = Case(*tracked, default=F('tracking_number'), output_field=CharField())
+    Order.objects.filter(pk__in=[row[0] for row in movable]).update(**changes)
+
+    # bulk_create skips the history post_save signal, so the outbox events are written here too
+    OrderStatusHistory.objects.bulk_create(
+        [OrderStatusHistory(order_id=pk, status=status, note=note, changed_by=user) for pk, *_ in movable],
+        batch_size=CHUNK_SIZE,
+    )
+    emit_many('order.status_changed', [{'order_id': str(pk), 'status': status} for pk, *_ in movable])
+    apply_status_changes([(pk, created_at, current, total) for pk, _, current, total, created_at in movable], status)
+    result.transitioned.extend(row[1] for row in movable)
@@ -1,17 +1,66 @@
+import uuid
+from django.db import transaction
+from django.db.models import F, IntegerField, OuterRef, Prefetch, Subquery, Sum, Value
+from django.db.models.fields.json import KT
+from django.db.models.functions import Coalesce, NullIf
 from rest_framework import viewsets, permissions, status
+from rest_framework.exceptions import ValidationError
+from utils.pagination import KeysetPagination
 from utils.permissions import IsAdminUser
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
-from .models import Order, Cart, CartItem
-from .serializers import OrderSerializer, CartSerializer, CartItemSerializer, CheckoutSerializer
+from .cart_store import CartStore
+from .models import Order, OrderItem, OrderStatusHistory
+from .serializers import (
+    AdminOrderListSerializer, BulkTransitionSerializer, CheckoutSerializer, OrderListSerializer, OrderSerializer,
+    TrackingUploadSerializer,
+)
+from .transitions import InvalidTransition, bulk_transition, check_transition
+
+
+def with_list_fields(queryset):
+    """Order rows for lists: scalar columns plus item count and thumbnail as correlated subqueries,
+    so a page is one query and no JSON column is loaded."""
+    items = OrderItem.objects.filter(order=OuterRef('pk')).order_by()
+    return queryset.only('id', 'order_number', 'status', 'grand_total', 'created_at').annotate(
+        item_count=Coalesce(
+            Subquery(items.values('order').annotate(total=Sum('quantity')).values('total'),
+                     output_field=IntegerField()),
+            0,
+        ),
+        thumbnail=Subquery(
+            items.filter(variant__product__primary_image__isnull=False)
+            .values('variant__product__primary_image__image')[:1]
+        ),
+    )
+
+
+def with_detail_relations(queryset):
+    return queryset.prefetch_related(
+        'items',
+        Prefetch('status_history', queryset=OrderStatusHistory.objects.order_by('-created_at')),
+        'payments',
+    )
+
 
 class OrderViewSet(viewsets.ModelViewSet):
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    ordering_fields = ['created_at']
 
     def get_queryset(self):
-        return self.queryset.filter(user=self.request.user)
+        queryset = self.queryset.filter(user=self.request.user)
+        if self.action == 'list':
+            return with_list_fields(queryset)
+        return with_detail_relations(queryset)
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return OrderListSerializer
+        return OrderSerializer
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -21,64 +70,114 @@ class OrderViewSet(viewsets.ModelViewSet):
         serializer = CheckoutSerializer(data=request.data, context={'request': request})
         serializer.is_valid(raise_exception=True)
         order = serializer.save()
-        response_serializer = OrderSerializer(order)
+        response_serializer = OrderSerializer(with_detail_relations(Order.objects.filter(pk=order.pk)).get())
         return Response(response_serializer.data, status=status.HTTP_201_CREATED)
 
 class CartViewSet(viewsets.ViewSet):
-    permission_classes = [permissions.IsAuthenticated]
+    """Cart for guests (by session) and signed-in shoppers, served from the Redis cart store."""
+    permission_classes = [permissions.AllowAny]
+
+    def get_store(self, create=False):
+        return CartStore.for_request(self.request, create=create)
 
-    def get_cart(self):
-        cart, created = Cart.objects.get_or_create(user=self.request.user)
-        return cart
+    def _parse(self, request, default_quantity=None):
+        variant_id = request.data.get('variant_id') or request.data.get('item_id')
+        try:
+            variant_id = str(uuid.UUID(str(variant_id)))
+            quantity = int(request.data.get('quantity', default_quantity))
+        except (TypeError, ValueError):
+            raise ValidationError({"detail": "A valid variant_id and quantity are required"})
+        return variant_id, quantity
 
     def list(self, request):
-        cart = self.get_cart()
-        serializer = CartSerializer(cart)
-        return Response(serializer.data)
+        store = self.get_store()
+        if store is None:
+            return Response({'items': [], 'total': '0', 'item_count': 0})
+        return Response(store.hydrate())
 
     @action(detail=False, methods=['post'])
     def add_item(self, request):
-        cart = self.get_cart()
-        variant_id = request.data.get('variant_id')
-        quantity = int(request.data.get('quantity', 1))
-        
-        item, created = CartItem.objects.get_or_create(cart=cart, variant_id=variant_id)
-        if not created:
-            item.quantity += quantity
-        else:
-            item.quantity = quantity
-        item.save()
-        
-        return Response(CartSerializer(cart).data)
+        variant_id, quantity = self._parse(request, default_quantity=1)
+        if quantity < 1:
+            raise ValidationError({"detail": "Quantity must be at least 1"})
+        store = self.get_store(create=True)
+        cart = store.hydrate(store.add(variant_id, quantity))
+        if not any(item['id'] == variant_id for item in cart['items']):
+            store.remove(variant_id)
+            return Response({"error": "Item not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(cart)
 
     @action(detail=False, methods=['post'])
     def update_item(self, request):
-        cart = self.get_cart()
-        item_id = request.data.get('item_id')
-        quantity = int(request.data.get('quantity'))
-        
-        try:
-            item = CartItem.objects.get(id=item_id, cart=cart)
-            if quantity > 0:
-                item.quantity = quantity
-                item.save()
-            else:
-                item.delete()
-        except CartItem.DoesNotExist:
-            return Response({"error": "Item not found"}, status=status.HTTP_404_NOT_FOUND)
-            
-        return Response(CartSerializer(cart).data)
+        variant_id, quantity = self._parse(request)
+        store = self.get_store(create=True)
+        return Response(store.hydrate(store.set_quantity(variant_id, quantity)))
 
     @action(detail=False, methods=['post'])
     def remove_item(self, request):
-        cart = self.get_cart()
-        item_id = request.data.get('item_id')
-        CartItem.objects.filter(id=item_id, cart=cart).delete()
-        return Response(CartSerializer(cart).data)
+        variant_id, _ = self._parse(request, default_quantity=0)
+        store = self.get_store(create=True)
+        return Response(store.hydrate(store.remove(variant_id)))
 
 class AdminOrderViewSet(viewsets.ModelViewSet):
     """Admin endpoint to manage all orders in the system."""
     queryset = Order.objects.all().order_by('-created_at')
     serializer_class = OrderSerializer
     permission_classes = [IsAdminUser]
+    pagination_class = KeysetPagination
+    ordering_fields = ['created_at']
+
+    def get_queryset(self):
+        if self.action == 'list':
+            return with_list_fields(self.queryset).annotate(
+                customer_email=Coalesce(F('user__email'), NullIf(F('guest_email'), Value(''))),
+                customer_name=KT('shipping_address__full_name'),
+                customer_phone=KT('shipping_address__phone'),
+            )
+        return with_detail_relations(self.queryset)
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return AdminOrderListSerializer
+        return OrderSerializer
+
+    def perform_update(self, serializer):
+        # History row (and with it the outbox event) commits together with the change
+        with transaction.atomic():
+            previous = Order.objects.select_for_update().values_list('status', flat=True).get(pk=serializer.instance.pk)
+            new_status = serializer.validated_data.get('status', previous)
+            if new_status != previous:
+                try:
+                    check_transition(previous, new_status)
+                except InvalidTransition as exc:
+                    raise ValidationError({"status": str(exc)})
+            order = serializer.save()
+            if new_status != previous:
+                OrderStatusHistory.objects.create(order=order, status=order.status, changed_by=self.request.user)
 
+    def _bulk_response(self, status_, result):
+        return Response({
+            'status': status_,
+            'transitioned': len(result.transitioned),
+            'rejected': [{'order_number': number, 'reason': reason} for number, reason in result.rejected.items()],
+        })
+
+    @action(detail=False, methods=['post'])
+    def bulk_transition(self, request):
+        serializer = BulkTransitionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        result = bulk_transition(
+            data['status'], data['order_numbers'], data['tracking_numbers'], user=request.user, note=data['note']
+        )
+        return self._bulk_response(data['status'], result)
+
+    @action(detail=False, methods=['post'], parser_classes=[MultiPartParser])
+    def upload_tracking(self, request):
+        serializer = TrackingUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        result = bulk_transition(
+            Order.Status.SHIPPED, tracking_numbers=serializer.validated_data['file'], user=request.user,
+            note=serializer.validated_data['note'],
+        )
+        return self._bulk_response(Order.Status.SHIPPED, result)
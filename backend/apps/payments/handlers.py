@@ -0,0 +1,18 @@
+"""Outbox subscribers for payment events (see apps.orders.outbox)."""
+from apps.orders.emails import queue_refund_email
+from apps.orders.outbox import subscriber
+from .models import Refund
+from .payhere import process_notification
+
+
+@subscriber('payment.notification_received')
+def settle_payhere_notification(payload):
+    process_notification(payload['notification_id'])
+
+
+@subscriber('refund.updated')
+def send_refund_email(payload):
+    refund = Refund.objects.select_related('payment__order__user').filter(pk=payload['refund_id']).first()
+    if refund is None:
+        return
+    queue_refund_email(refund, key=f"refund:{refund.pk}:{payload['status']}")
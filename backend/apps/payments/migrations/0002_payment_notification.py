@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-18 01:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentNotification',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('transaction_id', models.CharField(max_length=200)),
+                ('order_number', models.CharField(db_index=True, max_length=20)),
+                ('status_code', models.SmallIntegerField()),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('currency', models.CharField(max_length=10)),
+                ('payload', models.JSONField(default=dict)),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+            ],
+            options={
+                'db_table': 'payments_notification',
+                'indexes': [models.Index(fields=['processed_at', 'received_at'], name='payments_notif_pending_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='paymentnotification',
+            constraint=models.UniqueConstraint(fields=('transaction_id', 'status_code'), name='payments_notification_unique'),
+        ),
+    ]
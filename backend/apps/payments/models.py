@@ -61,3 +61,34 @@ class Refund(models.Model):
 
     def __str__(self):
         return f'Refund {self.id} — {self.amount} LKR ({self.status})'
+
+
+class PaymentNotification(models.Model):
+    """A verified PayHere server callback, stored before it is acknowledged.
+
+    Rows are processed asynchronously by ``apps.payments.payhere.process_notification``;
+    one row per (transaction, status code) makes gateway retries no-ops.
+    """
+    id = models.BigAutoField(primary_key=True)
+    transaction_id = models.CharField(max_length=200)
+    order_number = models.CharField(max_length=20, db_index=True)
+    status_code = models.SmallIntegerField()
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    currency = models.CharField(max_length=10)
+    payload = models.JSONField(default=dict)
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        db_table = 'payments_notification'
+        constraints = [
+            models.UniqueConstraint(fields=['transaction_id', 'status_code'], name='payments_notification_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['processed_at', 'received_at'], name='payments_notif_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f'PayHere {self.transaction_id} ({self.status_code}) for {self.order_number}'
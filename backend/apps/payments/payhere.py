@@ -0,0 +1,159 @@
+"""PayHere notifications — verify, record, then settle the order off the request path.
+
+The gateway's server callback only verifies the signature and inserts a
+``PaymentNotification`` together with its outbox event (``record_notification``), so
+the callback is acknowledged without touching the broker and the event cannot be lost.
+Retries of the same notification hit the unique (transaction, status code) constraint
+and are dropped.
+
+``process_notification`` settles one notification in a single transaction: the
+``Payment`` row, the order's status and history, and the stock reservation. Payment
+statuses only ever move forward (``STATUS_RANK``), so a late "pending" arriving after
+"success" changes nothing. A completed payment that cannot become a fulfilled sale (the
+order was cancelled, or its stock could not be deducted) opens a PENDING ``Refund``.
+"""
+import hashlib
+import hmac
+import logging
+from decimal import Decimal, InvalidOperation
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from apps.inventory.reservations import commit_order
+from apps.orders.models import Order, OrderStatusHistory
+from apps.orders.outbox import emit
+from .models import Payment, PaymentNotification, Refund
+
+logger = logging.getLogger(__name__)
+
+# PayHere status_code → Payment status
+STATUSES = {
+    2: Payment.Status.COMPLETED,
+    0: Payment.Status.PENDING,
+    -1: Payment.Status.CANCELLED,
+    -2: Payment.Status.FAILED,
+    -3: Payment.Status.REFUNDED,  # chargeback
+}
+# A payment never moves to a lower rank, whatever order notifications arrive in
+STATUS_RANK = {
+    Payment.Status.PENDING: 0,
+    Payment.Status.CANCELLED: 1,
+    Payment.Status.FAILED: 1,
+    Payment.Status.COMPLETED: 2,
+    Payment.Status.REFUNDED: 3,
+}
+
+
+class InvalidNotification(Exception):
+    pass
+
+
+def _md5(value):
+    return hashlib.md5(value.encode()).hexdigest().upper()
+
+
+def expected_signature(data, secret=None):
+    secret = settings.PAYHERE_MERCHANT_SECRET if secret is None else secret
+    return _md5(
+        f"{data.get('merchant_id', '')}{data.get('order_id', '')}{data.get('payhere_amount', '')}"
+        f"{data.get('payhere_currency', '')}{data.get('status_code', '')}{_md5(secret)}"
+    )
+
+
+def verify(data):
+    """Raise InvalidNotification unless ``data`` is a correctly signed notification for our merchant."""
+    if not settings.PAYHERE_MERCHANT_SECRET:
+        raise InvalidNotification('PayHere is not configured')
+    if data.get('merchant_id') != settings.PAYHERE_MERCHANT_ID:
+        raise InvalidNotification('Unknown merchant')
+    if not hmac.compare_digest(str(data.get('md5sig', '')).upper(), expected_signature(data)):
+        raise InvalidNotification('Invalid signature')
+    try:
+        status_code = int(data['status_code'])
+        amount = Decimal(data['payhere_amount'])
+    except (KeyError, TypeError, ValueError, InvalidOperation):
+        raise InvalidNotification('Malformed notification')
+    if status_code not in STATUSES or not data.get('payment_id') or not data.get('order_id'):
+        raise InvalidNotification('Malformed notification')
+    return status_code, amount
+
+
+def record_notification(data):
+    """Verify and store a callback, queueing it for processing; None for a duplicate."""
+    status_code, amount = verify(data)
+    try:
+        with transaction.atomic():
+            notification = PaymentNotification.objects.create(
+                transaction_id=data['payment_id'],
+                order_number=data['order_id'],
+                status_code=status_code,
+                amount=amount,
+                currency=data.get('payhere_currency', ''),
+                payload={key: value for key, value in data.items() if key != 'md5sig'},
+            )
+            emit('payment.notification_received', notification_id=notification.pk)
+    except IntegrityError:
+        return None
+    return notification
+
+
+def _settle(notification):
+    order = Order.objects.select_for_update().filter(order_number=notification.order_number).first()
+    if order is None:
+        return f'No order {notification.order_number}'
+
+    payment = (
+        Payment.objects.select_for_update().filter(order=order, transaction_id=notification.transaction_id).first()
+        or Payment(order=order, method=Payment.Method.PAYHERE, transaction_id=notification.transaction_id,
+                   amount=notification.amount, currency=notification.currency)
+    )
+    status = STATUSES[notification.status_code]
+    if status == Payment.Status.COMPLETED and (
+        notification.amount != order.grand_total or notification.currency != payment.currency
+    ):
+        return f'Paid {notification.amount} {notification.currency}, order total is {order.grand_total}'
+    if not payment._state.adding and STATUS_RANK[status] <= STATUS_RANK[payment.status]:
+        return ''
+
+    payment.status = status
+    payment.gateway_response = notification.payload
+    payment.save()
+
+    if status == Payment.Status.COMPLETED and order.status == Order.Status.PENDING:
+        order.status = Order.Status.CONFIRMED
+        order.save(update_fields=['status', 'updated_at'])
+        OrderStatusHistory.objects.create(
+            order=order, status=order.status, note=f'PayHere payment {notification.transaction_id} completed'
+        )
+        if not commit_order(order):
+            return _flag_for_refund(payment, 'Paid, but the stock could not be deducted')
+    elif status == Payment.Status.COMPLETED and order.status == Order.Status.CANCELLED:
+        return _flag_for_refund(payment, 'Paid after the order was cancelled')
+    return ''
+
+
+def _flag_for_refund(payment, reason):
+    """Open a PENDING refund for staff to review; returns ``reason`` as the notification error."""
+    Refund.objects.create(payment=payment, amount=payment.amount, reason=reason)
+    return f'{reason}; refund {payment.amount} pending review'
+
+
+def process_notification(notification_id):
+    """Apply one stored notification; a no-op once it has been processed."""
+    with transaction.atomic():
+        notification = (
+            PaymentNotification.objects.select_for_update()
+            .filter(pk=notification_id, processed_at__isnull=True)
+            .first()
+        )
+        if notification is None:
+            return False
+        error = _settle(notification)
+        if error:
+            logger.warning('PayHere notification %s not applied: %s', notification.pk, error)
+        notification.error = error
+        notification.attempts += 1
+        notification.processed_at = timezone.now()
+        notification.save(update_fields=['error', 'attempts', 'processed_at'])
+    return True
+
@@ -0,0 +1,19 @@
+"""Payment signals — record outbox events for refund changes."""
+from django.db.models.signals import pre_save, post_save
+from django.dispatch import receiver
+from apps.orders.outbox import emit
+from .models import Refund
+
+
+@receiver(pre_save, sender=Refund)
+def remember_previous_refund_status(sender, instance, **kwargs):
+    instance._previous_status = None
+    if not instance._state.adding:
+        instance._previous_status = Refund.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+
+
+@receiver(post_save, sender=Refund)
+def emit_refund_updated(sender, instance, raw=False, **kwargs):
+    if raw or instance.status == getattr(instance, '_previous_status', None):
+        return
+    emit('refund.updated', refund_id=str(instance.pk), status=instance.status)
@@ -1,5 +1,7 @@
-from rest_framework import viewsets, permissions
+from django.db import transaction
+from rest_framework import viewsets, permissions, status
 from .models import Payment, Refund
+from .payhere import InvalidNotification, record_notification
 from .serializers import PaymentSerializer, RefundSerializer
 
 class PaymentViewSet(viewsets.ModelViewSet):
@@ -17,11 +19,24 @@ class RefundViewSet(viewsets.ModelViewSet):
     serializer_class = RefundSerializer
     permission_classes = [permissions.IsAdminUser]
 
+    # Saves are atomic so the refund and its outbox event commit together
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            serializer.save()
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            serializer.save()
+
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
 def payhere_callback(request):
-    # This will be expanded with MD5 validation and order status updates
+    """PayHere server notification: verify and store it, then acknowledge; settled by a worker."""
+    try:
+        record_notification(request.data.dict() if hasattr(request.data, 'dict') else dict(request.data))
+    except InvalidNotification as exc:
+        return Response({"status": "rejected", "error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
     return Response({"status": "received"})
@@ -0,0 +1,96 @@
+"""Coupons — cached lookups by code and race-free redemption at checkout.
+
+Lookups are served from a per-code cache entry (misses included), so validating a
+code as the shopper types costs no database reads. Redemption is authoritative and
+happens inside the checkout transaction: ``used_count`` is bumped with a conditional
+``UPDATE ... WHERE used_count < max_uses`` and the ``CouponUsage`` row enforces one use
+per customer, so parallel checkouts can never take a coupon past its limit.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+from functools import partial
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from .models import Coupon, CouponUsage
+
+COUPON_KEY = 'promotions:coupon:{code}'
+COUPON_TIMEOUT = 60 * 10
+MISSING_TIMEOUT = 60
+MISSING = 'missing'
+CENT = Decimal('0.01')
+
+
+class CouponError(Exception):
+    pass
+
+
+def normalize_code(code):
+    return (code or '').strip()[:50]
+
+
+def _key(code):
+    return COUPON_KEY.format(code=normalize_code(code))
+
+
+def invalidate_coupon(code):
+    cache.delete(_key(code))
+
+
+def get_coupon(code):
+    """The coupon with ``code`` from cache (or one query on a miss); None if there is none."""
+    code = normalize_code(code)
+    if not code:
+        return None
+    cached = cache.get(_key(code))
+    if cached == MISSING:
+        return None
+    if cached is not None:
+        return cached
+    coupon = Coupon.objects.filter(code=code).first()
+    cache.set(_key(code), coupon or MISSING, COUPON_TIMEOUT if coupon else MISSING_TIMEOUT)
+    return coupon
+
+
+def check_coupon(coupon, subtotal=None, user=None):
+    """Raise CouponError unless ``coupon`` can be applied to ``user``'s order of ``subtotal``."""
+    valid, message = coupon.is_valid()
+    if not valid:
+        raise CouponError(message)
+    if subtotal is not None and subtotal < coupon.minimum_order_amount:
+        raise CouponError(f'Orders must be at least {coupon.minimum_order_amount} LKR to use this coupon')
+    if user is not None and CouponUsage.objects.filter(coupon=coupon, user=user).exists():
+        raise CouponError('You have already used this coupon')
+
+
+def compute_discount(coupon, subtotal, shipping_cost=Decimal('0')):
+    if coupon.type == Coupon.Type.PERCENTAGE:
+        discount = (subtotal * coupon.value / 100).quantize(CENT, rounding=ROUND_HALF_UP)
+    elif coupon.type == Coupon.Type.FIXED_AMOUNT:
+        discount = coupon.value
+    else:
+        discount = shipping_cost
+    return min(discount, subtotal + shipping_cost)
+
+
+def redeem(coupon, user, order):
+    """Take one use of ``coupon`` for ``order``; call inside the checkout transaction.
+
+    Raises CouponError when the limit is reached or the customer has already used it.
+    """
+    now = timezone.now()
+    available = Q(max_uses__isnull=True) | Q(used_count__lt=F('max_uses'))
+    within_window = Q(valid_until__isnull=True) | Q(valid_until__gte=now)
+    updated = Coupon.objects.filter(available, within_window, pk=coupon.pk, is_active=True,
+                                    valid_from__lte=now).update(used_count=F('used_count') + 1)
+    if not updated:
+        transaction.on_commit(partial(invalidate_coupon, coupon.code))
+        raise CouponError('Coupon has reached its maximum usage limit')
+    try:
+        with transaction.atomic():
+            CouponUsage.objects.create(coupon=coupon, user=user, order=order)
+    except IntegrityError:
+        raise CouponError('You have already used this coupon')
+    if coupon.max_uses:
+        # The cached used_count is now behind; reload it so exhaustion shows up promptly
+        transaction.on_commit(partial(invalidate_coupon, coupon.code))
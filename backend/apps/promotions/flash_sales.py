@@ -0,0 +1,118 @@
+"""Flash sales — the live and upcoming sale set, served from memory on the banner path.
+
+The set of active sales that are live or start within ``HORIZON`` is built in one
+query into a shared-cache blob, then copied into each process. The blob carries every
+sale's window and its sale price, so the live set at any moment is just a filter over
+it and no request ever has to read the database, even as a sale opens or closes.
+
+The blob is rebuilt when a ``FlashSale`` changes and by the scheduler
+(``apps.promotions.tasks``), which also queues a boundary task for each
+``starts_at``/``ends_at`` about to pass so prices flip on time.
+"""
+import threading
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from apps.catalog.pricing import discounted
+from .models import FlashSale
+
+LIVE_KEY = 'promotions:flash_sales:live'
+REBUILD_LOCK_KEY = 'promotions:flash_sales:rebuild'
+HORIZON = timedelta(days=1)
+# How long a process trusts its copy before re-reading the shared blob
+LOCAL_TIMEOUT = 5
+
+_local = {'blob': None, 'checked': 0.0}
+_lock = threading.Lock()
+
+
+def _serialize(sale):
+    product = sale.product
+    image = product.primary_image
+    return {
+        'id': str(sale.id),
+        'discount_percentage': sale.discount_percentage,
+        'starts_at': sale.starts_at.isoformat(),
+        'ends_at': sale.ends_at.isoformat(),
+        'product': {
+            'id': str(product.pk),
+            'name': product.name,
+            'slug': product.slug,
+            'image': f'{settings.MEDIA_URL}{image.image}' if image and image.image else None,
+            'base_price': str(product.base_price),
+            'sale_price': str(discounted(product.list_price, sale.discount_percentage)),
+        },
+    }
+
+
+def build_live_blob(now=None):
+    """Live and upcoming sales, soonest-ending first, in one query; stored in the shared cache.
+
+    Other processes pick up a rebuilt blob within ``LOCAL_TIMEOUT`` seconds.
+    """
+    now = now or timezone.now()
+    sales = (
+        FlashSale.objects.filter(
+            is_active=True, product__is_active=True, ends_at__gt=now, starts_at__lte=now + HORIZON
+        )
+        .select_related('product__primary_image')
+        .order_by('ends_at')
+    )
+    blob = {'built_at': now.isoformat(), 'valid_until': (now + HORIZON).isoformat(),
+            'sales': [_serialize(sale) for sale in sales]}
+    cache.set(LIVE_KEY, blob, None)
+    with _lock:
+        _local.update(blob=blob, checked=time.monotonic())
+    return blob
+
+
+def _get_blob(now):
+    with _lock:
+        blob, checked = _local['blob'], _local['checked']
+    if blob is not None and time.monotonic() - checked < LOCAL_TIMEOUT:
+        return blob
+
+    blob = cache.get(LIVE_KEY)
+    if blob is None or parse_datetime(blob['valid_until']) <= now:
+        # Only one process rebuilds; the others keep serving what they have
+        if cache.add(REBUILD_LOCK_KEY, 1, 30):
+            try:
+                return build_live_blob(now)
+            finally:
+                cache.delete(REBUILD_LOCK_KEY)
+        blob = blob or _local['blob'] or {'sales': [], 'valid_until': now.isoformat()}
+    with _lock:
+        _local.update(blob=blob, checked=time.monotonic())
+    return blob
+
+
+def live_sales(now=None):
+    """Sales live at ``now``, soonest-ending first."""
+    now = now or timezone.now()
+    return [
+        sale for sale in _get_blob(now)['sales']
+        if parse_datetime(sale['starts_at']) <= now < parse_datetime(sale['ends_at'])
+    ]
+
+
+def upcoming_sales(within, now=None):
+    """Sales opening in the next ``within`` (a timedelta), soonest first."""
+    now = now or timezone.now()
+    sales = [
+        sale for sale in _get_blob(now)['sales']
+        if now < parse_datetime(sale['starts_at']) <= now + within
+    ]
+    return sorted(sales, key=lambda sale: sale['starts_at'])
+
+
+def upcoming_boundaries(within, now=None):
+    """``[(moment, product_id), ...]`` for every start or end in ``(now, now + within]``."""
+    now = now or timezone.now()
+    end = now + within
+    active = FlashSale.objects.filter(is_active=True)
+    starts = active.filter(starts_at__gt=now, starts_at__lte=end).values_list('starts_at', 'product_id')
+    ends = active.filter(ends_at__gt=now, ends_at__lte=end).values_list('ends_at', 'product_id')
+    return sorted(set(starts) | set(ends))
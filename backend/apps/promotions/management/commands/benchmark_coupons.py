@@ -0,0 +1,111 @@
+"""
+benchmark_coupons.py — Fires parallel checkouts at one limited coupon.
+Usage: python manage.py benchmark_coupons [--redemptions 2000] [--workers 32] [--max-uses 100]
+Each worker thread redeems the coupon for a distinct customer inside its own transaction,
+then a second pass replays every customer to exercise the one-use-per-customer rule.
+The run checks that exactly ``--max-uses`` redemptions succeed and reports throughput
+and latency. Fixtures are committed for the run and deleted afterwards.
+"""
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, close_old_connections, transaction
+from django.utils import timezone
+from apps.accounts.models import CustomUser
+from apps.orders.models import Order
+from apps.promotions.coupons import CouponError, redeem
+from apps.promotions.models import Coupon, CouponUsage
+
+
+class Command(BaseCommand):
+    help = "Benchmark concurrent redemptions of one limited coupon (fixtures are deleted afterwards)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--redemptions', type=int, default=2000)
+        parser.add_argument('--workers', type=int, default=32)
+        parser.add_argument('--max-uses', type=int, default=100)
+
+    def handle(self, *args, **options):
+        total, workers, max_uses = options['redemptions'], options['workers'], options['max_uses']
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"🎟️  Coupon benchmark ({total} redemptions, {workers} workers, limit {max_uses})"
+        ))
+
+        tag = uuid.uuid4().hex[:8]
+        coupon = Coupon.objects.create(
+            code=f'BENCH-{tag}', type=Coupon.Type.PERCENTAGE, value=Decimal('10'),
+            max_uses=max_uses, valid_from=timezone.now() - timedelta(minutes=1),
+        )
+        users = CustomUser.objects.bulk_create([
+            CustomUser(email=f'bench-{tag}-{n}@example.com', first_name='Bench', last_name=str(n))
+            for n in range(total)
+        ])
+        # Saved one by one so the analytics rollups record them; deleting them afterwards
+        # subtracts exactly what was added (the worker threads rule out a rolled-back transaction)
+        orders = [
+            Order.objects.create(
+                order_number=f'BC{tag}{n:05d}', user=user, shipping_address={'district': 'Colombo'},
+                subtotal=Decimal('1000.00'), grand_total=Decimal('1000.00'),
+            )
+            for n, user in enumerate(users)
+        ]
+
+        def attempt(order):
+            started = time.perf_counter()
+            try:
+                with transaction.atomic():
+                    redeem(coupon, order.user, order)
+                outcome = 'redeemed'
+            except CouponError:
+                outcome = 'rejected'
+            except OperationalError:
+                outcome = 'error'
+            finally:
+                close_old_connections()
+            return outcome, (time.perf_counter() - started) * 1000
+
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(attempt, orders))
+            elapsed = time.perf_counter() - started
+
+            outcomes = [outcome for outcome, _ in results]
+            timings = sorted(timing for _, timing in results)
+            redeemed = outcomes.count('redeemed')
+            self.stdout.write(
+                f"  redeemed={redeemed}  rejected={outcomes.count('rejected')}  "
+                f"errors={outcomes.count('error')}  throughput={total / elapsed:.0f}/s"
+            )
+            self.stdout.write(
+                f"  p50={statistics.median(timings):.2f}ms  "
+                f"p95={timings[int(len(timings) * 0.95) - 1]:.2f}ms  max={timings[-1]:.2f}ms"
+            )
+
+            # Every customer who got the coupon tries again; none may succeed
+            winners = [order for order, (outcome, _) in zip(orders, results) if outcome == 'redeemed']
+            coupon.max_uses = None
+            coupon.save(update_fields=['max_uses'])
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                repeats = [outcome for outcome, _ in pool.map(attempt, winners)]
+
+            coupon.refresh_from_db()
+            usages = CouponUsage.objects.filter(coupon=coupon).count()
+            if redeemed != max_uses or coupon.used_count != max_uses or usages != max_uses \
+                    or repeats.count('redeemed'):
+                raise CommandError(
+                    f"Inconsistent coupon: used_count={coupon.used_count}, usages={usages}, "
+                    f"successful redemptions={redeemed}, repeat redemptions={repeats.count('redeemed')}"
+                )
+            self.stdout.write(self.style.SUCCESS(
+                f"  ✅ No over-redemption: {coupon.used_count}/{max_uses} uses, "
+                f"{len(repeats)} repeat attempts rejected"
+            ))
+        finally:
+            coupon.delete()
+            Order.objects.filter(pk__in=[order.pk for order in orders]).delete()
+            CustomUser.objects.filter(pk__in=[user.pk for user in users]).delete()
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 01:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('promotions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='flashsale',
+            index=models.Index(fields=['starts_at'], name='promotions__starts__b835c1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flashsale',
+            index=models.Index(fields=['ends_at'], name='promotions__ends_at_e10bd8_idx'),
+        ),
+    ]
@@ -64,6 +64,8 @@ class FlashSale(models.Model):
 
     class Meta:
         db_table = 'promotions_flash_sale'
+        # Boundary sweeps in apps.catalog.pricing look sales up by start and end time
+        indexes = [models.Index(fields=['starts_at']), models.Index(fields=['ends_at'])]
 
     def __str__(self):
         return f'Flash Sale: {self.product.name} ({self.discount_percentage}% off)'
@@ -71,4 +73,4 @@ class FlashSale(models.Model):
     @property
     def is_live(self):
         now = timezone.now()
-        return self.is_active and self.starts_at <= now <= self.ends_at
+        return self.is_active and self.starts_at <= now < self.ends_at
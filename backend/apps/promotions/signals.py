@@ -0,0 +1,40 @@
+"""Promotion signals — keep prices, the live flash-sale set and coupon lookups current."""
+from functools import partial
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from apps.catalog.pricing import reprice_products
+from .coupons import invalidate_coupon
+from .flash_sales import build_live_blob
+from .models import Coupon, FlashSale
+
+
+@receiver(pre_save, sender=FlashSale)
+def remember_previous_product(sender, instance, **kwargs):
+    instance._previous_product_id = None
+    if not instance._state.adding:
+        instance._previous_product_id = (
+            FlashSale.objects.filter(pk=instance.pk).values_list('product_id', flat=True).first()
+        )
+
+
+@receiver([post_save, post_delete], sender=FlashSale)
+def reprice_flash_sale_products(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    product_ids = {instance.product_id, getattr(instance, '_previous_product_id', None)} - {None}
+    transaction.on_commit(partial(reprice_products, product_ids))
+    transaction.on_commit(build_live_blob)
+
+
+@receiver(pre_save, sender=Coupon)
+def remember_previous_code(sender, instance, **kwargs):
+    instance._previous_code = None
+    if not instance._state.adding:
+        instance._previous_code = Coupon.objects.filter(pk=instance.pk).values_list('code', flat=True).first()
+
+
+@receiver([post_save, post_delete], sender=Coupon)
+def invalidate_coupon_lookup(sender, instance, **kwargs):
+    for code in {instance.code, getattr(instance, '_previous_code', None)} - {None}:
+        transaction.on_commit(partial(invalidate_coupon, code))
@@ -0,0 +1,40 @@
+"""Promotions Celery tasks — the flash-sale scheduler."""
+from datetime import timedelta
+from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from apps.catalog.pricing import reprice_products
+from apps.catalog.warmup import warm_products
+from .flash_sales import build_live_blob, upcoming_boundaries, upcoming_sales
+
+SCHEDULED_KEY = 'promotions:flash_sales:scheduled:{product_id}:{moment}'
+
+
+@shared_task
+def refresh_flash_sales():
+    """Scheduler tick: rebuild the live set, queue boundary tasks due before the next tick
+    and warm the caches of products whose sale opens within FLASH_SALE_PREWARM_SECONDS."""
+    now = timezone.now()
+    build_live_blob(now)
+
+    ahead = timedelta(seconds=settings.FLASH_SALE_SCHEDULE_AHEAD_SECONDS)
+    for moment, product_id in upcoming_boundaries(ahead, now):
+        key = SCHEDULED_KEY.format(product_id=product_id, moment=int(moment.timestamp()))
+        if cache.add(key, 1, int(ahead.total_seconds()) * 2):
+            apply_flash_sale_boundary.apply_async(args=[str(product_id)], eta=moment)
+
+    lead = timedelta(seconds=settings.FLASH_SALE_PREWARM_SECONDS)
+    opening = {sale['product']['id'] for sale in upcoming_sales(lead, now)}
+    if opening:
+        warm_products(opening)
+    return len(opening)
+
+
+@shared_task
+def apply_flash_sale_boundary(product_id):
+    """Runs at a sale's starts_at/ends_at: flip the price, publish the live set, re-warm caches."""
+    changed = reprice_products([product_id])
+    build_live_blob()
+    warm_products([product_id])
+    return len(changed)
@@ -1,6 +1,10 @@
+from decimal import Decimal, InvalidOperation
 from rest_framework import viewsets, permissions, status
-from rest_framework.decorators import api_view, permission_classes
+from django.utils import timezone
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
+from .coupons import CouponError, check_coupon, compute_discount, get_coupon
+from .flash_sales import live_sales
 from .models import Coupon, FlashSale
 from .serializers import CouponSerializer, FlashSaleSerializer
 
@@ -14,27 +18,47 @@ class FlashSaleViewSet(viewsets.ModelViewSet):
     serializer_class = FlashSaleSerializer
     
     def get_permissions(self):
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'live']:
             return [permissions.AllowAny()]
         return [permissions.IsAdminUser()]
 
+    def get_queryset(self):
+        # Shoppers only see sales that are still running or yet to start
+        if self.request.user.is_staff:
+            return self.queryset
+        return self.queryset.filter(is_active=True, ends_at__gt=timezone.now())
+
+    @action(detail=False, methods=['get'])
+    def live(self, request):
+        """Storefront banner: live sales from the in-memory set, no database reads."""
+        return Response({'server_time': timezone.now(), 'sales': live_sales()})
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def validate_coupon(request):
     code = request.query_params.get('code')
     if not code:
-        return Response({"valid": False, "error": "Code required"}, status=status.HTTP_400_BAD_MODULE)
-    
-    try:
-        coupon = Coupon.objects.get(code=code)
-        valid, message = coupon.is_valid()
-        if valid:
-            return Response({
-                "valid": True,
-                "code": coupon.code,
-                "type": coupon.type,
-                "value": coupon.value
-            })
-        return Response({"valid": False, "error": message})
-    except Coupon.DoesNotExist:
+        return Response({"valid": False, "error": "Code required"}, status=status.HTTP_400_BAD_REQUEST)
+
+    coupon = get_coupon(code)
+    if coupon is None:
         return Response({"valid": False, "error": "Invalid code"})
+
+    try:
+        subtotal = Decimal(request.query_params['subtotal']) if 'subtotal' in request.query_params else None
+    except InvalidOperation:
+        return Response({"valid": False, "error": "Invalid subtotal"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        check_coupon(coupon, subtotal, user=request.user)
+    except CouponError as exc:
+        return Response({"valid": False, "error": str(exc)})
+
+    data = {
+        "valid": True,
+        "code": coupon.code,
+        "type": coupon.type,
+        "value": coupon.value
+    }
+    if subtotal is not None and coupon.type != Coupon.Type.FREE_SHIPPING:
+        data["discount"] = compute_discount(coupon, subtotal)
+    return Response(data)
@@ -0,0 +1,40 @@
+"""
+rebuild_ratings.py — Recomputes ProductRating summaries from approved reviews.
+Usage: python manage.py rebuild_ratings
+Safe to re-run; use it to backfill or to repair drift after bulk edits.
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from apps.reviews.models import Review, ProductRating
+
+
+class Command(BaseCommand):
+    help = "Rebuild per-product rating summaries from approved reviews."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        rows = (
+            Review.objects.filter(is_approved=True)
+            .order_by()
+            .values('product_id')
+            .annotate(
+                review_count=Count('id'),
+                rating_total=Sum('rating'),
+                **{f'star_{star}': Count('id', filter=Q(rating=star)) for star in range(1, 6)},
+            )
+        )
+
+        summaries = []
+        for row in rows.iterator():
+            summary = ProductRating(**row)
+            summary.refresh_average()
+            summaries.append(summary)
+
+        with transaction.atomic():
+            ProductRating.objects.all().delete()
+            ProductRating.objects.bulk_create(summaries, batch_size=options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(f"✅  Rebuilt ratings for {len(summaries)} products."))
@@ -1,6 +1,7 @@
 """Reviews app models."""
 import uuid
-from django.db import models
+from decimal import Decimal
+from django.db import models, transaction
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
 
@@ -28,6 +29,64 @@ class Review(models.Model):
         return f'{self.rating}★ on {self.product.name} by {self.user.email}'
 
 
+class ProductRating(models.Model):
+    """Materialized rating summary per product, covering approved reviews only.
+
+    Kept up to date incrementally by the Review signals in ``apps.reviews.signals``;
+    ``manage.py rebuild_ratings`` recomputes it from scratch.
+    """
+    product = models.OneToOneField(
+        'catalog.Product', on_delete=models.CASCADE, primary_key=True, related_name='rating'
+    )
+    review_count = models.PositiveIntegerField(default=0)
+    rating_total = models.PositiveIntegerField(default=0)
+    avg_rating = models.DecimalField(max_digits=3, decimal_places=2, null=True, blank=True, db_index=True)
+    star_1 = models.PositiveIntegerField(default=0)
+    star_2 = models.PositiveIntegerField(default=0)
+    star_3 = models.PositiveIntegerField(default=0)
+    star_4 = models.PositiveIntegerField(default=0)
+    star_5 = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'reviews_product_rating'
+
+    def __str__(self):
+        return f'{self.avg_rating or "-"}★ ({self.review_count}) for product {self.product_id}'
+
+    @property
+    def histogram(self):
+        return {star: getattr(self, f'star_{star}') for star in range(1, 6)}
+
+    def refresh_average(self):
+        if self.review_count:
+            self.avg_rating = (Decimal(self.rating_total) / self.review_count).quantize(Decimal('0.01'))
+        else:
+            self.avg_rating = None
+
+    @classmethod
+    def apply_change(cls, product_id, added=None, removed=None):
+        """Add and/or remove one approved rating (1–5) from a product's summary."""
+        with transaction.atomic():
+            if added is None:
+                # Nothing to remove from if the summary is gone (e.g. product cascade delete)
+                summary = cls.objects.select_for_update().filter(product_id=product_id).first()
+                if summary is None:
+                    return None
+            else:
+                summary, _ = cls.objects.select_for_update().get_or_create(product_id=product_id)
+            for rating, step in ((added, 1), (removed, -1)):
+                if rating is None:
+                    continue
+                field = f'star_{rating}'
+                setattr(summary, field, max(0, getattr(summary, field) + step))
+                summary.review_count = max(0, summary.review_count + step)
+                summary.rating_total = max(0, summary.rating_total + step * rating)
+            summary.refresh_average()
+            summary.save()
+        return summary
+
+
 class ReviewImage(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     review = models.ForeignKey(Review, on_delete=models.CASCADE, related_name='images')
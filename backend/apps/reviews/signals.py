@@ -0,0 +1,37 @@
+"""Review signals — keep ProductRating in step with approved reviews."""
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .models import Review, ProductRating
+
+
+@receiver(pre_save, sender=Review)
+def remember_previous_rating(sender, instance, **kwargs):
+    instance._previous_rating = None
+    if not instance._state.adding:
+        instance._previous_rating = (
+            Review.objects.filter(pk=instance.pk)
+            .values('product_id', 'rating', 'is_approved')
+            .first()
+        )
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_rating', None)
+    old = previous['rating'] if previous and previous['is_approved'] else None
+    new = instance.rating if instance.is_approved else None
+
+    if previous and previous['product_id'] != instance.product_id:
+        if old is not None:
+            ProductRating.apply_change(previous['product_id'], removed=old)
+        old = None
+    if old != new:
+        ProductRating.apply_change(instance.product_id, added=new, removed=old)
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    if instance.is_approved:
+        ProductRating.apply_change(instance.product_id, removed=instance.rating)
@@ -0,0 +1,104 @@
+"""Shipping rates — quotes for an address from an in-memory district index.
+
+Zones list their districts in a JSON column, so finding the zone for a district would
+mean loading and scanning every zone. Instead the active zones and methods are read
+once into ``{district: [method, ...]}`` (``build_index``), shared through the cache and
+copied into each process; a quote is then a dictionary lookup plus arithmetic.
+
+Zone and method saves rebuild the index (``apps.shipping.signals``); other processes
+pick the new copy up within ``LOCAL_TIMEOUT`` seconds.
+"""
+import threading
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from django.core.cache import cache
+from .models import ShippingMethod
+
+INDEX_KEY = 'shipping:district_index'
+# How long a process trusts its copy before re-reading the shared index
+LOCAL_TIMEOUT = 5
+CENT = Decimal('0.01')
+
+_local = {'index': None, 'checked': 0.0}
+_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class Quote:
+    method_id: str
+    name: str
+    carrier: str
+    zone: str
+    rate: Decimal
+    estimated_days_min: int
+    estimated_days_max: int
+
+
+def normalize_district(district):
+    return ' '.join(str(district or '').split()).casefold()
+
+
+def build_index():
+    """``{district: [method, ...]}`` of every active method in an active zone, in one query."""
+    methods = (
+        ShippingMethod.objects.filter(is_active=True, zone__is_active=True)
+        .select_related('zone')
+        .order_by('base_rate', 'name')
+    )
+    index = {}
+    for method in methods:
+        entry = (
+            str(method.pk), method.name, method.carrier, method.zone.name,
+            method.base_rate, method.per_kg_rate, method.estimated_days_min, method.estimated_days_max,
+        )
+        for district in {normalize_district(district) for district in method.zone.districts or ()}:
+            if district:
+                index.setdefault(district, []).append(entry)
+    cache.set(INDEX_KEY, index, None)
+    with _lock:
+        _local.update(index=index, checked=time.monotonic())
+    return index
+
+
+def _get_index():
+    with _lock:
+        index, checked = _local['index'], _local['checked']
+    if index is not None and time.monotonic() - checked < LOCAL_TIMEOUT:
+        return index
+    index = cache.get(INDEX_KEY)
+    if index is None:
+        return build_index()
+    with _lock:
+        _local.update(index=index, checked=time.monotonic())
+    return index
+
+
+def quotes(district, weight_kg=0):
+    """Every method delivering to ``district`` priced for ``weight_kg``, cheapest first."""
+    weight_kg = Decimal(weight_kg)
+    results = [
+        Quote(method_id, name, carrier, zone, (base_rate + per_kg_rate * weight_kg).quantize(CENT),
+              days_min, days_max)
+        for method_id, name, carrier, zone, base_rate, per_kg_rate, days_min, days_max
+        in _get_index().get(normalize_district(district), ())
+    ]
+    return sorted(results, key=lambda quote: quote.rate)
+
+
+def quote_for(district, weight_kg=0, method_id=None):
+    """The quote for ``method_id`` (the cheapest when omitted); None if it doesn't deliver there."""
+    results = quotes(district, weight_kg)
+    if method_id is None:
+        return results[0] if results else None
+    return next((quote for quote in results if quote.method_id == str(method_id)), None)
+
+
+def cart_weight(quantities):
+    """Total weight in kg of ``{variant_id: quantity}`` in one query; variants without a weight count as 0."""
+    from apps.catalog.models import ProductVariant
+    quantities = {str(variant_id): quantity for variant_id, quantity in quantities.items()}
+    if not quantities:
+        return Decimal('0')
+    weights = ProductVariant.objects.filter(pk__in=list(quantities)).values_list('pk', 'weight')
+    return sum(((weight or 0) * quantities[str(pk)] for pk, weight in weights), Decimal('0'))
@@ -12,3 +12,19 @@ class ShippingZoneSerializer(serializers.ModelSerializer):
     class Meta:
         model = ShippingZone
         fields = '__all__'
+
+class QuoteSerializer(serializers.Serializer):
+    """One priced option (``apps.shipping.rates.Quote``), money as 2-dp strings like ``base_rate``."""
+    method_id = serializers.CharField()
+    name = serializers.CharField()
+    carrier = serializers.CharField()
+    zone = serializers.CharField()
+    rate = serializers.DecimalField(max_digits=10, decimal_places=2)
+    estimated_days_min = serializers.IntegerField()
+    estimated_days_max = serializers.IntegerField()
+
+class QuoteListSerializer(serializers.Serializer):
+    district = serializers.CharField()
+    # Same precision as ProductVariant.weight
+    weight_kg = serializers.DecimalField(max_digits=8, decimal_places=3)
+    quotes = QuoteSerializer(many=True)
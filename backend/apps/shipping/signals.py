@@ -0,0 +1,14 @@
+"""Shipping signals — rebuild the district index when zones or methods change."""
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import ShippingMethod, ShippingZone
+from .rates import build_index
+
+
+@receiver([post_save, post_delete], sender=ShippingZone)
+@receiver([post_save, post_delete], sender=ShippingMethod)
+def rebuild_district_index(sender, raw=False, **kwargs):
+    if raw:
+        return
+    transaction.on_commit(build_index)
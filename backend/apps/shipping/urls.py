@@ -7,5 +7,6 @@ router.register(r'zones', views.ShippingZoneViewSet)
 router.register(r'methods', views.ShippingMethodViewSet)
 
 urlpatterns = [
+    path('quote/', views.quote, name='shipping-quote'),
     path('', include(router.urls)),
 ]
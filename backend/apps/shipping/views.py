@@ -1,6 +1,14 @@
-from rest_framework import viewsets, permissions
+from decimal import Decimal, InvalidOperation
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from apps.orders.cart_store import CartStore
 from .models import ShippingZone, ShippingMethod
-from .serializers import ShippingZoneSerializer, ShippingMethodSerializer
+from .rates import cart_weight, quotes
+from .serializers import QuoteListSerializer, ShippingZoneSerializer, ShippingMethodSerializer
+
+# Largest weight ProductVariant.weight can hold
+MAX_WEIGHT_KG = Decimal('99999.999')
 
 class ShippingZoneViewSet(viewsets.ModelViewSet):
     queryset = ShippingZone.objects.all()
@@ -15,3 +23,29 @@ class ShippingMethodViewSet(viewsets.ModelViewSet):
         if self.action in ['list', 'retrieve']:
             return [permissions.AllowAny()]
         return [permissions.IsAdminUser()]
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def quote(request):
+    """Shipping options for ``?district=``, priced for ``?weight=`` (kg) or the shopper's cart."""
+    district = request.query_params.get('district')
+    if not district:
+        return Response({"error": "District required"}, status=status.HTTP_400_BAD_REQUEST)
+
+    if 'weight' in request.query_params:
+        try:
+            weight = Decimal(request.query_params['weight'])
+        except InvalidOperation:
+            weight = None
+        # NaN, Infinity and huge values parse, but break the rate bands and quantize
+        if weight is None or not weight.is_finite() or not 0 <= weight <= MAX_WEIGHT_KG:
+            return Response({"error": "Invalid weight"}, status=status.HTTP_400_BAD_REQUEST)
+    else:
+        store = CartStore.for_request(request)
+        weight = cart_weight(store.quantities()) if store else Decimal('0')
+
+    return Response(QuoteListSerializer({
+        "district": district,
+        "weight_kg": weight,
+        "quotes": quotes(district, weight),
+    }).data)
@@ -2,6 +2,7 @@
 Django Base Settings for In Sri Lanka E-Commerce Platform
 """
 import environ
+from celery.schedules import crontab
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
@@ -54,6 +55,7 @@ LOCAL_APPS = [
     'apps.reviews',
     'apps.shipping',
     'apps.analytics',
+    'apps.notifications',
 ]
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
@@ -128,6 +130,79 @@ CELERY_RESULT_BACKEND = env('REDIS_URL', default='redis://127.0.0.1:6379/0')
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'Asia/Colombo'
+CELERY_BEAT_SCHEDULE = {
+    'release-expired-stock-reservations': {
+        'task': 'apps.inventory.tasks.release_expired_reservations',
+        'schedule': 60.0,
+    },
+    'send-low-stock-alerts': {
+        'task': 'apps.inventory.tasks.send_low_stock_alerts',
+        'schedule': 60.0,
+    },
+    'checkpoint-stock-ledger': {
+        'task': 'apps.inventory.tasks.checkpoint_stock_ledger',
+        'schedule': crontab(minute=20),
+    },
+    'persist-dirty-carts': {
+        'task': 'apps.orders.tasks.persist_dirty_carts',
+        'schedule': 60.0,
+    },
+    'reprice-flash-sale-boundaries': {
+        'task': 'apps.catalog.tasks.reprice_flash_sale_boundaries',
+        'schedule': 30.0,
+    },
+    'refresh-flash-sales': {
+        'task': 'apps.promotions.tasks.refresh_flash_sales',
+        'schedule': 60.0,
+    },
+    'dispatch-outbox': {
+        'task': 'apps.orders.tasks.dispatch_outbox',
+        'schedule': 5.0,
+    },
+    'purge-outbox': {
+        'task': 'apps.orders.tasks.purge_outbox',
+        'schedule': crontab(hour=3, minute=45),
+    },
+    'send-queued-emails': {
+        'task': 'apps.notifications.tasks.send_queued_emails',
+        'schedule': 10.0,
+    },
+    'purge-sent-emails': {
+        'task': 'apps.notifications.tasks.purge_sent_emails',
+        'schedule': crontab(hour=4, minute=0),
+    },
+    'reconcile-analytics-rollups': {
+        'task': 'apps.analytics.tasks.reconcile_rollups',
+        'schedule': crontab(hour=3, minute=15),
+    },
+}
+
+# Order numbers reserved per worker in one counter update (see apps.orders.sequences)
+ORDER_NUMBER_BLOCK_SIZE = env.int('ORDER_NUMBER_BLOCK_SIZE', default=10)
+
+# Minutes a PENDING order holds its stock before the sweeper releases it
+STOCK_RESERVATION_TTL_MINUTES = env.int('STOCK_RESERVATION_TTL_MINUTES', default=30)
+
+# Idle carts drop out of Redis after this long; the database copy remains (see apps.orders.cart_store)
+CART_TTL_SECONDS = env.int('CART_TTL_SECONDS', default=60 * 60 * 24 * 30)
+
+# Seconds a rendered product detail document is kept (see apps.catalog.detail_cache)
+PRODUCT_DETAIL_CACHE_TIMEOUT = env.int('PRODUCT_DETAIL_CACHE_TIMEOUT', default=60 * 10)
+
+# Flash-sale scheduler: boundary tasks are queued this far ahead (must exceed the 60s tick)
+# and product caches are warmed this long before a sale opens
+FLASH_SALE_SCHEDULE_AHEAD_SECONDS = env.int('FLASH_SALE_SCHEDULE_AHEAD_SECONDS', default=150)
+FLASH_SALE_PREWARM_SECONDS = env.int('FLASH_SALE_PREWARM_SECONDS', default=120)
+
+# Dispatched outbox events are kept this long for inspection (see apps.orders.outbox)
+OUTBOX_RETENTION_DAYS = env.int('OUTBOX_RETENTION_DAYS', default=7)
+
+# Dashboard rollups: days rebuilt nightly, and how long hourly buckets are kept
+ANALYTICS_RECONCILE_DAYS = env.int('ANALYTICS_RECONCILE_DAYS', default=3)
+ANALYTICS_HOURLY_RETENTION_DAYS = env.int('ANALYTICS_HOURLY_RETENTION_DAYS', default=90)
+
+# Low-stock alert recipients; every active admin when empty (see apps.inventory.low_stock)
+STOCK_ALERT_EMAILS = env.list('STOCK_ALERT_EMAILS', default=[])
 
 # Django REST Framework
 REST_FRAMEWORK = {
@@ -185,6 +260,8 @@ STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# Public origin of this API, for media URLs in documents rendered without a request (cached product details)
+MEDIA_ORIGIN = env('MEDIA_ORIGIN', default='http://localhost:8000')
 
 # Internationalization
 LANGUAGE_CODE = 'en-us'
@@ -202,6 +279,10 @@ EMAIL_HOST_USER = env('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = env('EMAIL_HOST_PASSWORD', default='')
 EMAIL_USE_TLS = env.bool('EMAIL_USE_TLS', default=True)
 DEFAULT_FROM_EMAIL = env('DEFAULT_FROM_EMAIL', default='In Sri Lanka <noreply@insrilanka.lk>')
+EMAIL_TIMEOUT = env.int('EMAIL_TIMEOUT', default=30)
+# Mail worker pacing (per worker process) and how long sent emails are kept (see apps.notifications.mail)
+EMAIL_RATE_PER_MINUTE = env.int('EMAIL_RATE_PER_MINUTE', default=3000)
+EMAIL_QUEUE_RETENTION_DAYS = env.int('EMAIL_QUEUE_RETENTION_DAYS', default=14)
 
 # PayHere Settings
 PAYHERE_MERCHANT_ID = env('PAYHERE_MERCHANT_ID', default='')
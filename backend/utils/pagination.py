@@ -0,0 +1,138 @@
+"""Custom pagination for In Sri Lanka API."""
+import base64
+import binascii
+import json
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import UUID
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    return value
+
+
+class KeysetPagination(BasePagination):
+    """Keyset (cursor) pagination on the view's ordering with a primary-key tiebreaker.
+
+    Each page seeks past ``(ordering value, pk)`` of the previous page's last row, so deep
+    pages cost the same as the first and no ``OFFSET`` scan is needed. The total ``count``
+    is only computed when ``?with_count=true`` is passed. Requests that still send
+    ``?page=`` are served by ``PageNumberPagination`` for backwards compatibility.
+
+    The ordering field must be non-nullable and backed by an index ending in the pk.
+    """
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'with_count'
+    legacy_pagination_class = PageNumberPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.legacy = None
+        if 'page' in request.query_params:
+            self.legacy = self.legacy_pagination_class()
+            return self.legacy.paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.field, self.descending = self._get_ordering(queryset)
+        pk_name = queryset.model._meta.pk.name
+        direction = '-' if self.descending else ''
+        queryset = queryset.order_by(f'{direction}{self.field}', f'{direction}{pk_name}')
+
+        self.count = None
+        if request.query_params.get(self.count_query_param) in ('1', 'true', 'True'):
+            self.count = queryset.count()
+
+        cursor = self._decode_cursor(request)
+        if cursor is not None:
+            value, pk = cursor
+            op = 'lt' if self.descending else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'{self.field}__{op}': value}) | Q(**{self.field: value, f'{pk_name}__{op}': pk})
+            )
+
+        page_size = self._get_page_size(request)
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        self.page = rows[:page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        if self.legacy is not None:
+            return self.legacy.get_paginated_response(data)
+        payload = OrderedDict()
+        if self.count is not None:
+            payload['count'] = self.count
+        payload['next'] = self.get_next_link()
+        payload['previous'] = None
+        payload['results'] = data
+        return Response(payload)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        last = self.page[-1]
+        value = last
+        for attr in self.field.split('__'):
+            value = getattr(value, attr)
+        token = json.dumps([_encode_value(value), _encode_value(last.pk)])
+        cursor = base64.urlsafe_b64encode(token.encode()).decode()
+        url = self.request.build_absolute_uri()
+        return replace_query_param(remove_query_param(url, 'page'), self.cursor_query_param, cursor)
+
+    def _get_ordering(self, queryset):
+        ordering = list(queryset.query.order_by) or list(queryset.model._meta.ordering)
+        field = ordering[0] if ordering else queryset.model._meta.pk.name
+        if not isinstance(field, str):
+            raise TypeError('KeysetPagination only supports plain field orderings.')
+        return field.lstrip('-'), field.startswith('-')
+
+    def _decode_cursor(self, request):
+        raw = request.query_params.get(self.cursor_query_param)
+        if not raw:
+            return None
+        try:
+            value, pk = json.loads(base64.urlsafe_b64decode(raw.encode()).decode())
+        except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+            raise NotFound('Invalid cursor.')
+        return value, pk
+
+    def _get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'count': {'type': 'integer', 'nullable': True},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {'name': self.cursor_query_param, 'required': False, 'in': 'query',
+             'description': 'Opaque cursor from the previous page\'s `next` link.', 'schema': {'type': 'string'}},
+            {'name': self.page_size_query_param, 'required': False, 'in': 'query',
+             'description': 'Number of results per page.', 'schema': {'type': 'integer'}},
+            {'name': self.count_query_param, 'required': False, 'in': 'query',
+             'description': 'Include the exact total count.', 'schema': {'type': 'boolean'}},
+        ]
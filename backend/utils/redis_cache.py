@@ -0,0 +1,16 @@
+"""Raw Redis access behind the default cache for In Sri Lanka API."""
+from django.core.cache import cache
+
+
+def redis_client():
+    """The default cache's Redis client, or ``None`` when it is not django-redis (e.g. LocMemCache)."""
+    try:
+        from django_redis import get_redis_connection
+        return get_redis_connection('default')
+    except (ImportError, NotImplementedError):
+        return None
+
+
+def redis_key(name):
+    """``name`` with the cache's KEY_PREFIX and VERSION applied, which the raw client bypasses."""
+    return cache.make_key(name)
@@ -1,5 +1,5 @@
 import api from './client';
-import type { Product, Order, User, PaginatedResponse } from '@/types';
+import type { Product, Order, AdminOrderSummary, User, PaginatedResponse } from '@/types';
 
 export const adminApi = {
     // Products
@@ -20,7 +20,7 @@ export const adminApi = {
 
     // Orders
     getOrders: (params?: Record<string, string | number>) =>
-        api.get<PaginatedResponse<Order>>('/orders/admin/orders/', { params }),
+        api.get<PaginatedResponse<AdminOrderSummary>>('/orders/admin/orders/', { params }),
 
     getOrder: (id: string) =>
         api.get<Order>(`/orders/admin/orders/${id}/`),
@@ -2,7 +2,7 @@ import api from './client';
 export { adminApi } from './admin';
 import type {
     User, Address, PaginatedResponse,
-    Product, Category, Cart, Order, ShippingMethod, CouponResult, DashboardMetrics
+    Product, Category, Cart, Order, OrderSummary, ShippingMethod, CouponResult, DashboardMetrics
 } from '@/types';
 
 // ── Auth ─────────────────────────────────────────────────────
@@ -65,7 +65,7 @@ export const cartApi = {
 
 // ── Orders ───────────────────────────────────────────────────
 export const ordersApi = {
-    getOrders: () => api.get<Order[]>('/orders/'),
+    getOrders: () => api.get<PaginatedResponse<OrderSummary>>('/orders/'),
 
     getOrder: (id: string) => api.get<Order>(`/orders/${id}/`),
 
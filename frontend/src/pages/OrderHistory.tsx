@@ -2,7 +2,7 @@ import { useEffect, useState } from 'react';
 import { Helmet } from 'react-helmet-async';
 import { Link } from 'react-router-dom';
 import { ordersApi } from '@/api';
-import type { Order } from '@/types';
+import type { OrderSummary } from '@/types';
 
 const LKR = (n: number) =>
     new Intl.NumberFormat('si-LK', { style: 'currency', currency: 'LKR', maximumFractionDigits: 0 }).format(n);
@@ -13,12 +13,12 @@ const statusColor: Record<string, string> = {
 };
 
 export default function OrderHistory() {
-    const [orders, setOrders] = useState<Order[]>([]);
+    const [orders, setOrders] = useState<OrderSummary[]>([]);
     const [loading, setLoading] = useState(true);
 
     useEffect(() => {
         ordersApi.getOrders()
-            .then(({ data }) => setOrders(data))
+            .then(({ data }) => setOrders(data.results))
             .finally(() => setLoading(false));
     }, []);
 
@@ -42,7 +42,7 @@ export default function OrderHistory() {
                     </div>
                 ) : (
                     <div style={{ display: 'flex', flexDirection: 'column', gap: 16 }}>
-                        {orders.map((order: Order) => (
+                        {orders.map((order: OrderSummary) => (
                             <div key={order.id} className="card" style={{ padding: 24 }}>
                                 <div style={{ display: 'flex', justifyContent: 'space-between', alignItems: 'flex-start', flexWrap: 'wrap', gap: 12 }}>
                                     <div>
@@ -53,7 +53,7 @@ export default function OrderHistory() {
                                             {new Date(order.created_at).toLocaleDateString('en-LK', { dateStyle: 'long' })}
                                         </div>
                                         <div style={{ fontSize: '0.85rem', color: 'var(--color-text-muted)', marginTop: 2 }}>
-                                            {order.items.length} item{order.items.length !== 1 ? 's' : ''}
+                                            {order.item_count} item{order.item_count !== 1 ? 's' : ''}
                                         </div>
                                     </div>
                                     <div style={{ textAlign: 'right' }}>
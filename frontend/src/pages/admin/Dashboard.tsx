@@ -123,7 +123,7 @@ export default function Dashboard() {
                                         </div>
                                         <div style={{ flex: 1 }}>
                                             <div style={{ fontWeight: 600, color: 'var(--color-text)', fontSize: '0.95rem' }}>{product.name}</div>
-                                            <div style={{ fontSize: '0.8rem', color: 'var(--color-text-muted)' }}>{product.order_count} units sold</div>
+                                            <div style={{ fontSize: '0.8rem', color: 'var(--color-text-muted)' }}>{product.units} units sold · LKR {product.revenue.toLocaleString()}</div>
                                         </div>
                                     </div>
                                 ))
@@ -1,13 +1,13 @@
 import { useEffect, useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { adminApi } from '@/api';
-import type { Order } from '@/types';
+import type { AdminOrderSummary } from '@/types';
 import { Eye } from 'lucide-react';
 import toast from 'react-hot-toast';
 
 export default function AdminOrders() {
     const navigate = useNavigate();
-    const [orders, setOrders] = useState<Order[]>([]);
+    const [orders, setOrders] = useState<AdminOrderSummary[]>([]);
     const [loading, setLoading] = useState(true);
 
     const fetchOrders = async () => {
@@ -87,8 +87,8 @@ export default function AdminOrders() {
                                             #{order.order_number}
                                         </td>
                                         <td style={{ padding: '16px 24px' }}>
-                                            <div style={{ color: 'var(--color-text)', fontWeight: 500 }}>{order.shipping_address?.full_name}</div>
-                                            <div style={{ fontSize: '0.8rem', color: 'var(--color-text-muted)', marginTop: 2 }}>{order.shipping_address?.phone}</div>
+                                            <div style={{ color: 'var(--color-text)', fontWeight: 500 }}>{order.customer_name ?? order.customer_email}</div>
+                                            <div style={{ fontSize: '0.8rem', color: 'var(--color-text-muted)', marginTop: 2 }}>{order.customer_phone}</div>
                                         </td>
                                         <td style={{ padding: '16px 24px', color: 'var(--color-text-muted)' }}>
                                             {new Date(order.created_at).toLocaleDateString()}
@@ -173,6 +173,22 @@ export interface Order {
     payment_status: string | null;
 }
 
+export interface OrderSummary {
+    id: string;
+    order_number: string;
+    status: OrderStatus;
+    grand_total: number;
+    item_count: number;
+    thumbnail: string | null;
+    created_at: string;
+}
+
+export interface AdminOrderSummary extends OrderSummary {
+    customer_email: string | null;
+    customer_name: string | null;
+    customer_phone: string | null;
+}
+
 // ── Shipping Types ───────────────────────────────────────────
 export interface ShippingMethod {
     id: string;
@@ -215,5 +231,6 @@ export interface DashboardMetrics {
     total_customers: number;
     new_customers_30d: number;
     daily_sales: { date: string; revenue: number; orders: number }[];
-    top_products: { name: string; slug: string; order_count: number }[];
+    top_products: { name: string; slug: string; units: number; revenue: number }[];
+    top_products_window: number;
 }